@@ -0,0 +1,5 @@
+"""
+Nikaia Dashboard - Benchmarks
+Mesures de performance de la couche de données et des pages, sur une base
+PostgREST simulée en mémoire (voir benchmarks/standin.py).
+"""
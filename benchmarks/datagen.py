@@ -0,0 +1,354 @@
+"""
+Synthetic Data
+Génère des jeux de données réalistes (utilisateurs, projets, sous-projets, tâches,
+expériences, commentaires) selon des distributions configurables, et les écrit
+dans le stand-in ou dans Supabase par lots.
+
+Usage:
+    python -m benchmarks.datagen --tasks 10k --target standin
+    python -m benchmarks.datagen --tasks 10k --target supabase --batch-size 500
+    python -m benchmarks.datagen --tasks 100k --profile profile.json --seed 7
+    python -m benchmarks.datagen --tasks 10k --target json --output data.json
+
+--target standin inserts through the stand-in's REST API (constraints are
+checked); --target supabase writes to the project configured in .env;
+--target json writes the rows to a file the in-memory backend can load
+(DATA_BACKEND=memory MEMORY_DATA_FILE=data.json streamlit run app.py).
+A profile file is a JSON object overriding keys of DEFAULT_PROFILE.
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.standin import CHECKS  # noqa: E402
+
+# Tables in foreign key order
+TABLES = ('users', 'projects', 'subprojects', 'tasks', 'experiments', 'comments')
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    # Rows per task
+    'ratios': {'projects': 0.01, 'subprojects': 0.05, 'experiments': 0.5},
+    'users': {'min': 10, 'tasks_per_user': 200,
+              'roles': {'manager': 0.1, 'contributor': 0.7, 'viewer': 0.2}},
+    # Value weights of the CHECK-constrained columns ("table.column")
+    'weights': {
+        'projects.status': {'planning': 0.15, 'active': 0.5, 'on-hold': 0.1, 'completed': 0.15, 'archived': 0.1},
+        'subprojects.status': {'not-started': 0.2, 'in-progress': 0.5, 'blocked': 0.1, 'completed': 0.2},
+        'tasks.status': {'todo': 0.3, 'in-progress': 0.25, 'review': 0.1, 'done': 0.35},
+        'tasks.priority': {'low': 0.2, 'medium': 0.45, 'high': 0.25, 'urgent': 0.1},
+        'experiments.status': {'planned': 0.3, 'in_progress': 0.3, 'completed': 0.25,
+                               'cancelled': 0.05, 'validated': 0.1},
+        'experiments.priority': {'low': 0.2, 'medium': 0.5, 'high': 0.2, 'urgent': 0.1},
+    },
+    # Zipf exponent of the rows per user/subproject (0: uniform, higher: a few get most)
+    'skew': {'assignee': 1.1, 'subproject': 0.8},
+    'unassigned_share': 0.1,
+    # Days relative to today
+    'task_start_days': [-120, 60],
+    'task_duration_days': [1, 45],
+    'undated_task_share': 0.05,
+    'history_days': 700,
+    # Poisson means
+    'comments_per_task': 1.0,
+    'comments_per_experiment': 0.5,
+    # Long text fields of experiments (words)
+    'protocol_words': [150, 1200],
+    'observation_words': [0, 400],
+    'tags_per_experiment': [0, 5],
+}
+
+VOCABULARY = (
+    'sample buffer incubate centrifuge pellet supernatant lysate protein kinase inhibitor assay '
+    'plate well dilution concentration ic50 dose response cell line culture medium passage '
+    'confluence transfection western blot antibody primary secondary wash block membrane gel '
+    'electrophoresis pcr primer amplification sequencing plasmid vector clone colony selection '
+    'crystallization screening compound library synthesis purification hplc yield mass spectrometry '
+    'nmr solvent reaction temperature stirring overnight quench extraction chromatography fraction '
+    'control replicate triplicate baseline readout luminescence fluorescence absorbance normalize '
+    'xenograft tumor volume dosing cohort vehicle toxicity viability apoptosis proliferation'
+).split()
+
+TAGS = (
+    'oncology', 'kinase', 'in-vitro', 'in-vivo', 'screening', 'synthesis', 'hplc', 'pcr',
+    'western-blot', 'crystallography', 'toxicity', 'pk', 'formulation', 'biomarker', 'yk725',
+)
+
+
+def parse_scale(scale: str) -> int:
+    """Number of tasks for a scale such as '1k', '10k', '100k' or '2500'."""
+    scale = scale.strip().lower()
+    if scale.endswith('k'):
+        return int(float(scale[:-1]) * 1000)
+    if scale.endswith('m'):
+        return int(float(scale[:-1]) * 1_000_000)
+    return int(scale)
+
+
+def load_profile(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    DEFAULT_PROFILE, overridden by the keys of a JSON file.
+
+    Raises:
+        ValueError: If a weighted value isn't allowed by the schema's CHECK constraints
+    """
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    if path:
+        for key, value in json.loads(Path(path).read_text(encoding='utf-8')).items():
+            if isinstance(value, dict) and isinstance(profile.get(key), dict):
+                profile[key].update(value)
+            else:
+                profile[key] = value
+
+    for name, weights in profile['weights'].items():
+        table, column = name.split('.')
+        allowed = CHECKS.get(table, {}).get(column)
+        invalid = [value for value in weights if allowed is not None and value not in allowed]
+        if invalid:
+            raise ValueError(f"{name}: {invalid} not allowed by the schema (allowed: {list(allowed)})")
+    return profile
+
+
+class _Sampler:
+    """Random draws following the distributions of a profile."""
+
+    def __init__(self, rng: random.Random, profile: Dict[str, Any]):
+        self.rng = rng
+        self.profile = profile
+        self._weights = {
+            name: (list(weights), list(itertools.accumulate(weights.values())))
+            for name, weights in profile['weights'].items()
+        }
+
+    def weighted(self, name: str) -> str:
+        values, cumulative = self._weights[name]
+        return self.rng.choices(values, cum_weights=cumulative)[0]
+
+    def zipf(self, items: Sequence[Any], exponent: float):
+        """Picker returning items with probability proportional to 1 / rank^exponent."""
+        cumulative = list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, len(items) + 1)))
+        total = cumulative[-1]
+        return lambda: items[bisect.bisect(cumulative, self.rng.random() * total)]
+
+    def poisson(self, mean: float) -> int:
+        if mean <= 0:
+            return 0
+        limit, count, product = math.exp(-mean), 0, self.rng.random()
+        while product > limit:
+            count += 1
+            product *= self.rng.random()
+        return count
+
+    def between(self, bounds: Sequence[int]) -> int:
+        return self.rng.randint(bounds[0], bounds[1])
+
+    def text(self, bounds: Sequence[int]) -> Optional[str]:
+        words = self.between(bounds)
+        if not words:
+            return None
+        tokens = self.rng.choices(VOCABULARY, k=words)
+        sentences = [' '.join(tokens[i:i + 12]).capitalize() + '.' for i in range(0, words, 12)]
+        return '\n'.join(' '.join(sentences[i:i + 6]) for i in range(0, len(sentences), 6))
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def timestamp(self, start: datetime, days: int) -> str:
+        return (start + timedelta(seconds=self.rng.randrange(max(days, 1) * 86400))).isoformat()
+
+
+def generate(tasks: int, seed: int = 42, profile: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate related rows for every table, valid against the schema constraints.
+
+    Args:
+        tasks: Number of tasks (the other tables scale with the profile's ratios)
+        seed: Random seed (same seed and profile, same data)
+        profile: Distributions (see DEFAULT_PROFILE and load_profile)
+
+    Returns:
+        Rows per table name, in foreign key order
+    """
+    profile = profile or load_profile()
+    rng = random.Random(seed)
+    sample = _Sampler(rng, profile)
+    today = date.today()
+    history = profile['history_days']
+    origin = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=history)
+    ratios = profile['ratios']
+
+    user_count = max(profile['users']['min'], tasks // profile['users']['tasks_per_user'])
+    roles = profile['users']['roles']
+    users = []
+    for i in range(user_count):
+        created = sample.timestamp(origin, 30)
+        users.append({
+            'id': sample.uuid(), 'email': f'loadtest-{seed}-{i}@nikaia.bio', 'name': f'Load Test User {i}',
+            # The first user is always a manager so every page can be exercised
+            'role': 'manager' if i == 0 else rng.choices(list(roles), weights=list(roles.values()))[0],
+            'created_at': created, 'updated_at': created,
+        })
+    pick_user = sample.zipf([u['id'] for u in users], profile['skew']['assignee'])
+
+    projects = []
+    for i in range(max(1, int(tasks * ratios['projects']))):
+        created = sample.timestamp(origin, history)
+        projects.append({
+            'id': sample.uuid(), 'name': f'Project {i}', 'description': sample.text([10, 60]),
+            'status': sample.weighted('projects.status'), 'lead_id': pick_user(),
+            'start_date': created[:10], 'end_date': None, 'created_at': created, 'updated_at': created,
+        })
+
+    subprojects = []
+    for i in range(max(1, int(tasks * ratios['subprojects']))):
+        project = rng.choice(projects)
+        created = max(project['created_at'], sample.timestamp(origin, history))
+        subprojects.append({
+            'id': sample.uuid(), 'project_id': project['id'], 'name': f'Subproject {i}',
+            'description': sample.text([10, 40]), 'status': sample.weighted('subprojects.status'),
+            'lead_id': pick_user(), 'start_date': created[:10], 'end_date': None,
+            'created_at': created, 'updated_at': created,
+        })
+    pick_subproject = sample.zipf([s['id'] for s in subprojects], profile['skew']['subproject'])
+
+    task_rows = []
+    for i in range(tasks):
+        created = sample.timestamp(origin, history)
+        start = due = None
+        if rng.random() >= profile['undated_task_share']:
+            start_day = today + timedelta(days=sample.between(profile['task_start_days']))
+            start = start_day.isoformat()
+            due = (start_day + timedelta(days=sample.between(profile['task_duration_days']))).isoformat()
+        task_rows.append({
+            'id': sample.uuid(), 'subproject_id': pick_subproject(), 'title': f'Task {i}',
+            'description': sample.text([0, 80]),
+            'assignee_id': None if rng.random() < profile['unassigned_share'] else pick_user(),
+            'status': sample.weighted('tasks.status'), 'priority': sample.weighted('tasks.priority'),
+            'start_date': start, 'due_date': due,
+            'estimated_hours': rng.choice([None, 1, 2, 4, 8, 16]), 'actual_hours': None,
+            'created_at': created, 'updated_at': created,
+        })
+
+    experiments = []
+    for i in range(int(tasks * ratios['experiments'])):
+        created = sample.timestamp(origin, history)
+        status = sample.weighted('experiments.status')
+        planned = date.fromisoformat(created[:10]) + timedelta(days=rng.randint(0, 30))
+        started = planned + timedelta(days=rng.randint(0, 10)) if status != 'planned' else None
+        completed = started + timedelta(days=rng.randint(1, 20)) if status in ('completed', 'validated') else None
+        experiments.append({
+            'id': sample.uuid(), 'title': f'Experiment {i}: {" ".join(rng.choices(VOCABULARY, k=3))}',
+            'objective': sample.text([8, 30]), 'description': sample.text([20, 120]),
+            'protocol': sample.text(profile['protocol_words']),
+            'conditions': sample.text([0, 60]), 'observations': sample.text(profile['observation_words']),
+            'results_summary': sample.text([20, 150]) if completed else None,
+            'subproject_id': pick_subproject(), 'responsible_user_id': pick_user(), 'created_by': pick_user(),
+            'status': status, 'priority': sample.weighted('experiments.priority'),
+            'planned_date': planned.isoformat(), 'start_date': started.isoformat() if started else None,
+            'completion_date': completed.isoformat() if completed else None,
+            'deadline': (planned + timedelta(days=rng.randint(14, 90))).isoformat(),
+            'estimated_duration_hours': rng.choice([None, 2, 4, 8, 24, 48]),
+            'actual_duration_hours': rng.choice([2, 4, 8, 24]) if completed else None,
+            'tags': rng.sample(TAGS, sample.between(profile['tags_per_experiment'])),
+            'created_at': created, 'updated_at': created,
+        })
+
+    comments = []
+    for parent_table, parents, mean in (('task_id', task_rows, profile['comments_per_task']),
+                                        ('experiment_id', experiments, profile['comments_per_experiment'])):
+        for parent in parents:
+            for _ in range(sample.poisson(mean)):
+                created = max(parent['created_at'], sample.timestamp(origin, history))
+                comments.append({
+                    'id': sample.uuid(), 'task_id': None, 'experiment_id': None, parent_table: parent['id'],
+                    'user_id': pick_user(), 'content': sample.text([3, 60]),
+                    'created_at': created, 'updated_at': created,
+                })
+
+    return {
+        'users': users, 'projects': projects, 'subprojects': subprojects,
+        'tasks': task_rows, 'experiments': experiments, 'comments': comments,
+    }
+
+
+def seed(database, tasks: int, seed: int = 42,
+         profile: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate data and load it straight into a StandInDatabase (fast, no constraint checks)."""
+    data = generate(tasks, seed, profile)
+    for table, rows in data.items():
+        database.load(table, rows)
+    return data
+
+
+def insert_batched(client, data: Dict[str, List[Dict[str, Any]]], batch_size: int = 500) -> Dict[str, float]:
+    """
+    Insert generated rows through the REST API, in batches and foreign key order.
+
+    Args:
+        client: Supabase client (the real project or a stand-in client)
+        data: Rows per table, as returned by generate()
+        batch_size: Rows per insert request
+
+    Returns:
+        Seconds spent per table
+    """
+    from postgrest.types import ReturnMethod
+
+    timings = {}
+    for table in TABLES:
+        rows = data.get(table, [])
+        started = time.perf_counter()
+        for start in range(0, len(rows), batch_size):
+            client.table(table).insert(rows[start:start + batch_size], returning=ReturnMethod.minimal).execute()
+        timings[table] = time.perf_counter() - started
+        print(f"  {table:<12}{len(rows):>9} rows  {timings[table]:7.1f}s")
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic ELN data")
+    parser.add_argument('--tasks', default='1k', help="Number of tasks (1k, 10k, 100k...)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profile', help="JSON file overriding DEFAULT_PROFILE")
+    parser.add_argument('--target', choices=('standin', 'supabase', 'json'), default='standin',
+                        help="standin: validate against an in-memory stand-in; supabase: the project in .env; "
+                             "json: write the rows to --output")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--output', default='nikaia_data.json', help="File written by --target json")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = generate(parse_scale(args.tasks), args.seed, load_profile(args.profile))
+    print(f"Generated {sum(len(rows) for rows in data.values())} rows in {time.perf_counter() - started:.1f}s")
+
+    if args.target == 'json':
+        Path(args.output).write_text(json.dumps(data), encoding='utf-8')
+        print(f"Written to {args.output}")
+        return 0
+
+    if args.target == 'supabase':
+        from utils.supabase_client import get_supabase_client
+        client = get_supabase_client()
+    else:
+        from benchmarks.standin import StandInDatabase, create_client
+        client = create_client(StandInDatabase())
+
+    insert_batched(client, data, args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Legacy Stats
+Implémentations des statistiques du dashboard et de la préparation du Gantt
+d'avant leur vectorisation (boucles Python sur les lignes), gardées comme
+référence pour comparer temps et résultats avec les versions actuelles.
+
+Usage:
+    python -m benchmarks.run --scales 100k --only stats   # entrées [legacy] à côté des nouvelles
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+
+def compute_dashboard_stats(projects: List[Dict[str, Any]],
+                            subprojects: List[Dict[str, Any]],
+                            tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """crud.compute_dashboard_stats before the typed frames."""
+    total_projects = len(projects)
+    active_projects = len([p for p in projects if p['status'] == 'active'])
+
+    total_tasks = len(tasks)
+    completed_tasks = len([t for t in tasks if t['status'] == 'done'])
+    in_progress_tasks = len([t for t in tasks if t['status'] == 'in-progress'])
+    todo_tasks = len([t for t in tasks if t['status'] == 'todo'])
+
+    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+
+    high_priority = len([t for t in tasks if t['priority'] == 'high'])
+    urgent_priority = len([t for t in tasks if t['priority'] == 'urgent'])
+
+    today = datetime.now().date()
+    overdue_tasks = len([
+        t for t in tasks
+        if t.get('due_date') and datetime.fromisoformat(t['due_date'].replace('Z', '+00:00')).date() < today
+           and t['status'] != 'done'
+    ])
+
+    return {
+        'total_projects': total_projects,
+        'active_projects': active_projects,
+        'total_subprojects': len(subprojects),
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'in_progress_tasks': in_progress_tasks,
+        'todo_tasks': todo_tasks,
+        'completion_rate': completion_rate,
+        'high_priority_tasks': high_priority,
+        'urgent_priority_tasks': urgent_priority,
+        'overdue_tasks': overdue_tasks
+    }
+
+
+def compute_experiment_stats(experiments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """experiments_crud.compute_experiment_stats before the typed frames."""
+    by_status = {}
+    by_priority = {}
+
+    for exp in experiments:
+        status = exp.get('status', 'unknown')
+        priority = exp.get('priority', 'unknown')
+
+        by_status[status] = by_status.get(status, 0) + 1
+        by_priority[priority] = by_priority.get(priority, 0) + 1
+
+    return {
+        'total': len(experiments),
+        'planned': by_status.get('planned', 0),
+        'in_progress': by_status.get('in_progress', 0),
+        'completed': by_status.get('completed', 0),
+        'validated': by_status.get('validated', 0),
+        'cancelled': by_status.get('cancelled', 0),
+        'by_status': by_status,
+        'by_priority': by_priority
+    }
+
+
+def _count(rows: List[Dict[str, Any]], key: str, default: str) -> Dict[str, int]:
+    """Per-value counts, as the dashboard chart helpers computed them."""
+    counts = {}
+    for row in rows:
+        value = row.get(key, default)
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def upcoming_deadlines(tasks: List[Dict[str, Any]], days: int = 7) -> List[Dict[str, Any]]:
+    """Open tasks due in the next days, as show_upcoming_deadlines selected them."""
+    today = datetime.now().date()
+    next_week = today + timedelta(days=days)
+
+    upcoming = []
+    for task in tasks:
+        if task.get('due_date') and task['status'] != 'done':
+            due_date = datetime.fromisoformat(task['due_date'].replace('Z', '+00:00')).date()
+            if today <= due_date <= next_week:
+                upcoming.append({
+                    'title': task['title'],
+                    'due_date': due_date,
+                    'priority': task.get('priority', 'medium'),
+                    'assignee': task.get('assignee', {}).get('name', 'Unassigned') if task.get('assignee') else 'Unassigned'
+                })
+
+    upcoming.sort(key=lambda x: x['due_date'])
+    return upcoming
+
+
+def summarize_dashboard(tables: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    The figures dashboard_data.summarize_dashboard returns, computed the old way.
+
+    Args:
+        tables: projects, tasks and experiments rows
+        user_id: ID of the current user
+    """
+    tasks = tables['tasks']
+    exp_stats = compute_experiment_stats(tables['experiments'])
+
+    my_tasks = [t for t in tasks if t.get('assignee_id') == user_id]
+    my_tasks.sort(key=lambda t: (t.get('due_date') is None, t.get('due_date') or ''))
+
+    return {
+        'exp_stats': exp_stats,
+        'counts': {
+            'project_status': _count(tables['projects'], 'status', 'unknown'),
+            'task_status': _count(tasks, 'status', 'unknown'),
+            'task_priority': _count(tasks, 'priority', 'medium'),
+            'experiment_status': exp_stats['by_status'],
+        },
+        'upcoming': upcoming_deadlines(tasks),
+        'my_tasks': my_tasks,
+    }
+
+
+# =====================================================
+# TIMELINE
+# =====================================================
+
+def prepare_gantt_data(tasks: List[Dict[str, Any]]) -> pd.DataFrame:
+    """prepare_gantt_data of pages/5_timeline.py before the vectorization (Start/Finish as dates)."""
+    gantt_data = []
+
+    for task in tasks:
+        start_date = task.get('start_date')
+        due_date = task.get('due_date')
+
+        if not start_date or not due_date:
+            continue
+
+        try:
+            start = datetime.fromisoformat(start_date.replace('Z', '+00:00')).date()
+            end = datetime.fromisoformat(due_date.replace('Z', '+00:00')).date()
+        except Exception:
+            continue
+
+        task_name = task.get('title', 'Untitled')
+        assignee_name = task.get('assignee', {}).get('name', 'Unassigned') if task.get('assignee') else 'Unassigned'
+        priority = task.get('priority', 'medium')
+        status = task.get('status', 'todo')
+
+        project_name = 'N/A'
+        subproject_name = 'N/A'
+
+        if task.get('subproject'):
+            subproject_name = task['subproject'].get('name', 'N/A')
+            if task['subproject'].get('project'):
+                project_name = task['subproject']['project'].get('name', 'N/A')
+
+        color_map = {
+            'low': '#95E1D3',
+            'medium': '#FFE66D',
+            'high': '#FFB347',
+            'urgent': '#FF6B6B'
+        }
+
+        gantt_data.append({
+            'Task': task_name,
+            'Start': start,
+            'Finish': end,
+            'Assignee': assignee_name,
+            'Priority': priority,
+            'Status': status,
+            'Project': project_name,
+            'Subproject': subproject_name,
+            'Color': color_map.get(priority, '#95E1D3'),
+            'Duration': (end - start).days
+        })
+
+    return pd.DataFrame(gantt_data)
+
+
+def calendar_weeks(df: pd.DataFrame) -> List[Tuple[Any, str]]:
+    """
+    The calendar view's per-week markdown, built row by row as
+    show_task_calendar_view did (df from the legacy prepare_gantt_data).
+    """
+    df = df.copy()
+    df['Week'] = pd.to_datetime(df['Start']).dt.to_period('W')
+
+    weeks = []
+    for week, week_tasks in df.groupby('Week'):
+        lines = []
+        for _, task in week_tasks.iterrows():
+            priority_icons = {
+                'low': '🟢',
+                'medium': '🟡',
+                'high': '🟠',
+                'urgent': '🔴'
+            }
+
+            lines.append(f"""
+                **{priority_icons.get(task['Priority'], '⚪')} {task['Task']}**
+                👤 {task['Assignee']} | 📁 {task['Project']} | 📅 {task['Start']} → {task['Finish']} ({task['Duration']} days)
+            """)
+        weeks.append((week.start_time, ''.join(lines)))
+    return weeks
@@ -0,0 +1,410 @@
+"""
+Load Test
+Simule N utilisateurs concurrents : connexion via main.py, puis parcours
+Dashboard → Tasks → Kanban → Timeline → Experiments avec des actions sur chaque
+page. Rapporte la latence des reruns (p50/p95), les requêtes au backend par
+utilisateur-minute et la mémoire du processus serveur.
+
+Usage:
+    python -m benchmarks.loadtest --users 20 --iterations 3
+    python -m benchmarks.loadtest --users 50 --tasks 10k --think 1.0 --ramp 10
+    python -m benchmarks.loadtest --target supabase --users 5 --json load.json
+
+Each simulated user is a thread driving a Streamlit AppTest session on
+main.py; pages are opened as the multipage sidebar opens them (the nav
+buttons call st.switch_page, which Streamlit 1.28 doesn't have). All sessions
+share this process, hence the query cache and the Supabase client, as they
+share the Streamlit server in production.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import MagicMock
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from streamlit import config as streamlit_config, logger as streamlit_logger  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager  # noqa: E402
+from streamlit.runtime.media_file_manager import MediaFileManager  # noqa: E402
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage  # noqa: E402
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunner, ScriptRunnerEvent  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+from benchmarks import datagen  # noqa: E402
+from benchmarks.standin import StandInDatabase, install  # noqa: E402
+from utils.instrumentation import registry  # noqa: E402
+
+# Page names, as in the multipage sidebar
+JOURNEY = ('dashboard', 'tasks', 'kanban', 'timeline', 'experiments')
+
+
+class SessionScriptRunner(LocalScriptRunner):
+    """
+    Script runner resetting button triggers after each run, as the server does.
+
+    LocalScriptRunner keeps them set so tests can inspect them, which makes a
+    button handler calling st.rerun() rerun until the recursion limit.
+    """
+
+    _on_script_finished = ScriptRunner._on_script_finished
+
+
+class SessionAppTest(AppTest):
+    """
+    Browser session on main.py that can run concurrently with other sessions.
+
+    AppTest.run installs a mock Runtime before each run and removes it after,
+    which breaks the runs of other threads; here the runtime is installed
+    once by shared_runtime(). Pages are opened the way the multipage sidebar
+    does, by rerunning main.py with the page name. The script thread is
+    joined instead of polled every 100 ms, so latencies aren't rounded up,
+    and st.rerun() reruns count in the measured interaction.
+    """
+
+    def __init__(self, *, default_timeout: float):
+        super().__init__(str(ROOT / 'main.py'), default_timeout=default_timeout)
+        self.page_name = ''
+
+    def switch_page(self, page_name: str) -> 'SessionAppTest':
+        """Open a page of the app ('dashboard', 'tasks'...), keeping the session state."""
+        self.page_name = page_name
+        return self._run()
+
+    def _run(self, widget_state=None, timeout: Optional[float] = None) -> 'SessionAppTest':
+        runner = SessionScriptRunner(self._script_path, self.session_state)
+        runner.request_rerun(RerunData(widget_states=widget_state, page_name=self.page_name))
+        watchdog = threading.Timer(timeout or self.default_timeout, runner.request_stop)
+        watchdog.start()
+        try:
+            runner.start()
+            runner.join()
+        finally:
+            watchdog.cancel()
+        # After st.rerun() only the last run is displayed, as in a browser
+        messages = []
+        for event, data in zip(runner.events, runner.event_data):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                messages = []
+            elif event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG:
+                messages.append(data['forward_msg'])
+        self._tree = parse_tree_from_messages(messages)
+        self._tree._runner = self
+        self._pin_formatted_options()
+        return self
+
+    def _pin_formatted_options(self) -> None:
+        """
+        Select the displayed option of widgets using format_func.
+
+        AppTest 1.28 looks the raw value up among the formatted options when
+        it sends widget states back, which fails for these widgets; their
+        serialized state holds the selected option indexes.
+        """
+        widget_state = self.session_state._state._new_widget_state
+        for widget in [*self.selectbox, *self.radio, *self.multiselect]:
+            values = widget.value if isinstance(widget.value, list) else [widget.value]
+            if all(value is None or str(value) in widget.options for value in values):
+                continue
+            serialized = widget_state.get_serialized(widget.id)
+            if serialized is None:
+                continue
+            if isinstance(widget.value, list):
+                widget.set_value([widget.options[i] for i in serialized.int_array_value.data])
+            else:
+                widget.set_value(widget.options[serialized.int_value])
+
+
+@contextmanager
+def shared_runtime():
+    """Mock Streamlit Runtime shared by every SessionAppTest while the load runs."""
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    try:
+        yield runtime
+    finally:
+        Runtime._instance = None
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples the process RSS in the background while the load runs."""
+
+    def __init__(self, interval: float = 0.25):
+        super().__init__(name='loadtest-memory', daemon=True)
+        self.interval = interval
+        self.samples: List[int] = [rss_bytes()]
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.samples.append(rss_bytes())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self.samples.append(rss_bytes())
+
+
+class Recorder:
+    """Rerun latencies and errors per step, shared by the user threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, List[str]] = {}
+
+    def add(self, step: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.latencies.setdefault(step, []).append(seconds)
+            if error:
+                self.errors.setdefault(step, []).append(error)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+class SimulatedUser:
+    """
+    One browser session: logs in on main.py then walks the journey.
+
+    Args:
+        number: User number (prefixes its error messages)
+        email: Email used on the login form
+        recorder: Where rerun latencies are recorded
+        rng: Random source for the think time and the clicked elements
+        think: Mean pause between two interactions (seconds)
+        timeout: AppTest timeout of one rerun (seconds)
+    """
+
+    def __init__(self, number: int, email: str, recorder: Recorder, rng: random.Random,
+                 think: float, timeout: float):
+        self.number = number
+        self.email = email
+        self.recorder = recorder
+        self.rng = rng
+        self.think = think
+        self.timeout = timeout
+        self.app = SessionAppTest(default_timeout=timeout)
+
+    def _rerun(self, step: str, interact: Callable[[], Any]) -> bool:
+        """Run one interaction and record the duration of its rerun."""
+        if self.think:
+            time.sleep(self.rng.uniform(0, 2 * self.think))
+        started = time.perf_counter()
+        error = None
+        try:
+            interact()
+            if self.app.exception:
+                error = str(self.app.exception[0].value)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        self.recorder.add(step, time.perf_counter() - started, error and f"user {self.number}: {error}")
+        return error is None
+
+    def _button(self, prefix: str):
+        buttons = [b for b in self.app.button if b.key and b.key.startswith(prefix)]
+        return self.rng.choice(buttons) if buttons else None
+
+    def login(self) -> bool:
+        """Open main.py and submit the login form."""
+        app = self.app
+        if not self._rerun('login/open', app.run):
+            return False
+        app.text_input[0].input(self.email)
+        # AppTest 1.28 can't serialize the register form's format_func selectbox
+        # unless its value is one of the displayed options
+        for selectbox in app.selectbox:
+            selectbox.set_value(selectbox.options[0])
+        sign_in = next(b for b in app.button if b.label == 'Sign In')
+        if not self._rerun('login/submit', lambda: sign_in.click().run()):
+            return False
+        return 'user' in app.session_state
+
+    def visit(self, page: str) -> None:
+        """Open a page then perform its actions."""
+        app = self.app
+        if not self._rerun(f'{page}/open', lambda: app.switch_page(page)):
+            return
+
+        if page == 'dashboard':
+            refresh = self._button('refresh_dashboard')
+            if refresh:
+                self._rerun('dashboard/refresh', lambda: refresh.click().run())
+        elif page == 'tasks':
+            comments = self._button('comments_')
+            if comments:
+                self._rerun('tasks/comments', lambda: comments.click().run())
+            view = next((r for r in app.radio if r.key == 'tasks_view_mode'), None)
+            if view:
+                option = self.rng.choice(view.options)
+                self._rerun('tasks/view_mode', lambda: view.set_value(option).run())
+        elif page == 'kanban':
+            move = self._button(self.rng.choice(('right_', 'left_')))
+            if move:
+                self._rerun('kanban/move', lambda: move.click().run())
+        elif page == 'timeline':
+            view = next((s for s in app.selectbox if s.label == 'View'), None)
+            if view:
+                option = self.rng.choice(view.options)
+                self._rerun('timeline/view', lambda: view.set_value(option).run())
+        elif page == 'experiments':
+            details = self._button('view_btn_')
+            if details:
+                self._rerun('experiments/details', lambda: details.click().run())
+
+    def run(self, iterations: int) -> None:
+        if not self.login():
+            return
+        for _ in range(iterations):
+            for page in JOURNEY:
+                self.visit(page)
+
+
+def run_load(emails: List[str], users: int, iterations: int, think: float, ramp: float,
+             timeout: float, seed: int) -> Dict[str, Any]:
+    """
+    Run the simulated users concurrently and summarize the measurements.
+
+    Returns:
+        Report with per-step and overall latencies (ms), requests per
+        user-minute, errors and memory (MB)
+    """
+    recorder = Recorder()
+    sampler = MemorySampler()
+    sampler.start()
+    requests_before = registry.http_requests
+
+    def start_user(number: int) -> None:
+        if ramp:
+            time.sleep(ramp * number / users)
+        SimulatedUser(number, emails[number % len(emails)], recorder, random.Random(seed + number),
+                      think, timeout).run(iterations)
+
+    started = time.perf_counter()
+    with shared_runtime(), ThreadPoolExecutor(max_workers=users, thread_name_prefix='loadtest-user') as pool:
+        for future in [pool.submit(start_user, number) for number in range(users)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+
+    requests = registry.http_requests - requests_before
+    all_latencies = [s for values in recorder.latencies.values() for s in values]
+    mb = 1024 * 1024
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        return {
+            'reruns': len(values),
+            'p50_ms': percentile(values, 0.5) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'max_ms': max(values) * 1000,
+        }
+
+    return {
+        'users': users,
+        'iterations': iterations,
+        'elapsed_s': elapsed,
+        'reruns': summary(all_latencies) if all_latencies else {},
+        'steps': {step: summary(values) for step, values in sorted(recorder.latencies.items())},
+        'requests': requests,
+        'requests_per_user_minute': requests / users / (elapsed / 60),
+        'errors': {step: len(messages) for step, messages in recorder.errors.items()},
+        'first_errors': {step: messages[0] for step, messages in recorder.errors.items()},
+        'memory_mb': {
+            'start': sampler.samples[0] / mb,
+            'peak': max(sampler.samples) / mb,
+            'end': sampler.samples[-1] / mb,
+            'mean': statistics.fmean(sampler.samples) / mb,
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['users']} users x {report['iterations']} journeys in {report['elapsed_s']:.1f}s")
+    print(f"{'step':<24}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}")
+    for step, result in report['steps'].items():
+        print(f"{step:<24}{result['reruns']:>8}{result['p50_ms']:>10.0f}{result['p95_ms']:>10.0f}"
+              f"{result['max_ms']:>10.0f}{report['errors'].get(step, 0):>8}")
+    overall = report['reruns']
+    if overall:
+        print(f"{'all reruns':<24}{overall['reruns']:>8}{overall['p50_ms']:>10.0f}"
+              f"{overall['p95_ms']:>10.0f}{overall['max_ms']:>10.0f}{sum(report['errors'].values()):>8}")
+    print(f"\nBackend requests: {report['requests']} "
+          f"({report['requests_per_user_minute']:.1f} per user-minute)")
+    memory = report['memory_mb']
+    print(f"Server memory: {memory['start']:.0f} MB at start, {memory['peak']:.0f} MB peak, "
+          f"{memory['end']:.0f} MB at end")
+    for step, message in report['first_errors'].items():
+        print(f"  {step}: {message}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Nikaia dashboard multi-session load test")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument('--iterations', type=int, default=2, help="Journeys per user after login")
+    parser.add_argument('--think', type=float, default=0.5, help="Mean pause between interactions (seconds)")
+    parser.add_argument('--ramp', type=float, default=2.0, help="Seconds over which users start")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Timeout of one rerun (seconds)")
+    parser.add_argument('--target', choices=('standin', 'supabase'), default='standin',
+                        help="standin: synthetic in-memory data; supabase: the project in .env")
+    parser.add_argument('--tasks', default='1k', help="Stand-in size in tasks (1k, 10k...)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Write the report to this file")
+    args = parser.parse_args(argv)
+
+    # Streamlit warns about st.* calls made outside `streamlit run`
+    streamlit_config.set_option('global.showWarningOnDirectExecution', False)
+    streamlit_logger.set_log_level('error')
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.target == 'supabase':
+        from utils.crud import get_all_users
+        emails = [user['email'] for user in get_all_users()]
+    else:
+        database = StandInDatabase()
+        data = datagen.seed(database, datagen.parse_scale(args.tasks), args.seed)
+        install(database)
+        emails = [user['email'] for user in data['users']]
+    if not emails:
+        print("No users to log in with")
+        return 1
+
+    report = run_load(emails, args.users, args.iterations, args.think, args.ramp, args.timeout, args.seed)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Realtime Stand-in
+Serveur websocket local parlant le protocole Phoenix de Supabase Realtime : les
+changements de la base simulée (StandInDatabase) sont poussés aux abonnés, ce qui
+permet de tester le flux de changements (utils/realtime.py) sans projet Supabase.
+
+Usage:
+    python -m benchmarks.realtime_standin      # vérifie join + UPDATE de bout en bout
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimeStandIn:
+    """
+    Local Supabase Realtime server (Phoenix protocol over websockets).
+
+    Answers phx_join and heartbeats, and pushes a postgres_changes message to
+    every channel subscribed to the changed table. Its asyncio loop runs in a
+    daemon thread, so publish() can be called from synchronous code, e.g. as
+    a StandInDatabase listener.
+
+    Attributes:
+        url: Websocket URL, for ChangeFeed or SUPABASE_REALTIME_URL
+        joins: (topic, tables) of every channel joined so far
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.url = ''
+        self.joins: List[Dict[str, Any]] = []
+        self._channels: Dict[Any, Dict[str, Set[str]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Future] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self, timeout: float = 5.0) -> 'RealtimeStandIn':
+        """Start serving in a background thread and wait until it listens."""
+        self._thread = threading.Thread(target=self._run, name="realtime-standin", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Realtime stand-in did not start")
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close every connection and stop the server."""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set_result, None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _serve(self) -> None:
+        self._stopped = asyncio.get_running_loop().create_future()
+        async with websockets.serve(self._connection, self.host, self.port) as server:
+            port = server.sockets[0].getsockname()[1]
+            self.url = f"ws://{self.host}:{port}/realtime/v1/websocket"
+            self._ready.set()
+            await self._stopped
+
+    # -------------------------------------------------------------------------
+    # Protocol
+    # -------------------------------------------------------------------------
+
+    async def _connection(self, ws) -> None:
+        channels = self._channels.setdefault(ws, {})
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                topic, event, ref = message.get('topic'), message.get('event'), message.get('ref')
+                payload = message.get('payload') or {}
+
+                if event == 'phx_join':
+                    subscriptions = (payload.get('config') or {}).get('postgres_changes') or []
+                    channels[topic] = {s.get('table') for s in subscriptions}
+                    self.joins.append({'topic': topic, 'tables': sorted(channels[topic])})
+                    response = {'postgres_changes': [
+                        {'id': index, **subscription} for index, subscription in enumerate(subscriptions)
+                    ]}
+                    await ws.send(_message(topic, 'phx_reply', {'status': 'ok', 'response': response}, ref))
+                elif event == 'phx_leave':
+                    channels.pop(topic, None)
+                    await ws.send(_message(topic, 'phx_reply', {'status': 'ok', 'response': {}}, ref))
+                elif event == 'heartbeat':
+                    await ws.send(_message('phoenix', 'phx_reply', {'status': 'ok', 'response': {}}, ref))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._channels.pop(ws, None)
+
+    def publish(self, table: str, change_type: str, record: Dict[str, Any],
+                old_record: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Push a database change to the channels subscribed to its table.
+
+        Same signature as a StandInDatabase listener:
+        `database.listeners.append(server.publish)`.
+        """
+        if self._loop is None:
+            return
+        data = {
+            'schema': 'public',
+            'table': table,
+            'type': change_type,
+            'commit_timestamp': datetime.now(timezone.utc).isoformat(),
+            'record': record,
+            'old_record': old_record or {},
+            'errors': None,
+        }
+        self._loop.call_soon_threadsafe(asyncio.ensure_future, self._broadcast(table, data))
+
+    async def _broadcast(self, table: str, data: Dict[str, Any]) -> None:
+        for ws, channels in list(self._channels.items()):
+            for topic, tables in channels.items():
+                if table in tables:
+                    payload = {'data': data, 'ids': [0]}
+                    try:
+                        await ws.send(_message(topic, 'postgres_changes', payload, None))
+                    except websockets.ConnectionClosed:
+                        pass
+
+
+def _message(topic: str, event: str, payload: Dict[str, Any], ref: Optional[str]) -> str:
+    return json.dumps({'topic': topic, 'event': event, 'payload': payload, 'ref': ref}, default=str)
+
+
+# =====================================================
+# END-TO-END CHECK
+# =====================================================
+
+def _wait(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def check(timeout: float = 5.0) -> List[str]:
+    """
+    Drive a join and an UPDATE through the change feed.
+
+    An experiment is renamed directly in the stand-in database (as another
+    process would, without touching this process' cache): the change must
+    reach the cached experiment list through the websocket, with no new
+    HTTP request.
+
+    Returns:
+        Failed steps (empty when everything works)
+    """
+    from benchmarks import datagen
+    from benchmarks.standin import STANDIN_KEY, StandInDatabase, install
+    from utils.experiments_crud import get_all_experiments
+    from utils.realtime import ChangeFeed
+
+    database = StandInDatabase()
+    datagen.seed(database, 100)
+    install(database)
+
+    server = RealtimeStandIn().start()
+    database.listeners.append(server.publish)
+    feed = ChangeFeed(server.url, STANDIN_KEY)
+    failures = []
+    try:
+        experiment = get_all_experiments()[0]
+        feed.start()
+        if not feed.connected.wait(timeout):
+            return ["join: no phx_reply ok received"]
+        if not any('experiments' in join['tables'] for join in server.joins):
+            failures.append(f"join: experiments not subscribed ({server.joins})")
+
+        requests = len(database.requests)
+        title = f"{experiment['title']} (renamed)"
+        database.update_row('experiments', experiment['id'], {'title': title})
+
+        def renamed():
+            return any(row['id'] == experiment['id'] and row['title'] == title
+                       for row in get_all_experiments())
+
+        if not _wait(renamed, timeout):
+            failures.append("update: cached experiment list was not patched")
+        elif len(database.requests) != requests:
+            failures.append("update: the experiment list was reloaded instead of patched")
+    finally:
+        feed.stop()
+        server.stop()
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the realtime change feed against a local Realtime stand-in")
+    parser.add_argument('--timeout', type=float, default=5.0, help="Seconds to wait for each step")
+    args = parser.parse_args(argv)
+
+    # Streamlit warns about st.* calls made outside `streamlit run`
+    from streamlit import config as streamlit_config
+    streamlit_config.set_option('global.showWarningOnDirectExecution', False)
+    logging.basicConfig(level=logging.ERROR)
+
+    failures = check(args.timeout)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("OK join + UPDATE patched the cached experiments through the websocket")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
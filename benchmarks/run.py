@@ -0,0 +1,295 @@
+"""
+Benchmark Runner
+Chronomètre les fonctions CRUD, les statistiques, prepare_gantt_data et le rendu
+headless de chaque page, sur des données synthétiques servies par le stand-in.
+
+Usage:
+    python -m benchmarks.run                      # 1k and 10k tasks
+    python -m benchmarks.run --scales 1k,10k,100k --repeat 5
+    python -m benchmarks.run --only crud,stats --json results.json
+    python -m benchmarks.run --baseline results.json --threshold 1.25
+    python -m benchmarks.run --scales 100k --only stats   # vs the [legacy] loop implementations
+    DATA_BACKEND=replica python -m benchmarks.run   # reads served by utils/replica.py
+    DATA_BACKEND=memory python -m benchmarks.run    # every query served by MemoryRepository
+
+With --baseline the run exits with status 1 when a benchmark's median is
+more than threshold times slower than in the baseline file.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from streamlit import config as streamlit_config, logger as streamlit_logger  # noqa: E402
+
+from benchmarks import datagen  # noqa: E402
+from benchmarks.standin import StandInDatabase, install  # noqa: E402
+from utils.replica import replica, replica_enabled  # noqa: E402
+from utils.repository import MemoryRepository, data_backend, set_repository  # noqa: E402
+
+PAGES = (
+    'pages/1_dashboard.py',
+    'pages/2_projects.py',
+    'pages/3_tasks.py',
+    'pages/4_kanban.py',
+    'pages/5_timeline.py',
+    'pages/6_experiments.py',
+)
+
+Benchmark = Tuple[str, str, Callable[[], Any]]
+
+
+def _load_page_module(path: str):
+    """Import a page script as a module (its main() is not run)."""
+    spec = importlib.util.spec_from_file_location(f"bench_{Path(path).stem}", ROOT / path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def crud_benchmarks(data: Dict[str, List[Dict[str, Any]]]) -> List[Benchmark]:
+    """Every read and write of utils/crud.py and utils/experiments_crud.py."""
+    from utils import crud, experiments_crud as exp
+
+    manager = next(u for u in data['users'] if u['role'] == 'manager')
+    user_id = data['users'][-1]['id']
+    project_id = data['projects'][0]['id']
+    subproject_id = data['subprojects'][0]['id']
+    task = data['tasks'][len(data['tasks']) // 2]
+    experiment = data['experiments'][len(data['experiments']) // 2]
+    task_ids = [t['id'] for t in data['tasks'][:50]]
+    filters = {'statuses': ['todo', 'in-progress'], 'priorities': ['high', 'urgent'], 'search': '1'}
+
+    def task_lifecycle():
+        created = crud.create_task({'subproject_id': subproject_id, 'title': 'Benchmark task'})
+        crud.update_task(created['id'], {'status': 'in-progress'})
+        crud.delete_task(created['id'])
+
+    def experiment_lifecycle():
+        created = exp.create_experiment(
+            {'title': 'Benchmark experiment', 'objective': 'Timing', 'subproject_id': subproject_id,
+             'responsible_user_id': manager['id']}, manager)
+        exp.update_experiment(created['id'], {'status': 'in_progress'}, manager)
+        exp.delete_experiment(created['id'], manager)
+
+    def comment_lifecycle():
+        created = crud.create_comment({'task_id': task['id'], 'user_id': user_id, 'content': 'Benchmark'})
+        crud.delete_comment(created['id'])
+
+    def project_lifecycle():
+        created = crud.create_project({'name': 'Benchmark project', 'lead_id': manager['id']})
+        sub = crud.create_subproject({'project_id': created['id'], 'name': 'Benchmark subproject'})
+        crud.update_subproject(sub['id'], {'status': 'in-progress'})
+        crud.update_project(created['id'], {'status': 'active'})
+        crud.delete_subproject(sub['id'])
+        crud.delete_project(created['id'])
+
+    return [
+        ('crud', 'get_all_users', crud.get_all_users),
+        ('crud', 'get_user_by_id', lambda: crud.get_user_by_id(user_id)),
+        ('crud', 'get_all_projects', crud.get_all_projects),
+        ('crud', 'get_project_by_id', lambda: crud.get_project_by_id(project_id)),
+        ('crud', 'get_all_subprojects', crud.get_all_subprojects),
+        ('crud', 'get_subprojects_by_project', lambda: crud.get_subprojects_by_project(project_id)),
+        ('crud', 'get_all_tasks[summary]', lambda: crud.get_all_tasks('summary')),
+        ('crud', 'get_all_tasks[detail]', lambda: crud.get_all_tasks('detail')),
+        ('crud', 'get_tasks_by_subproject', lambda: crud.get_tasks_by_subproject(subproject_id)),
+        ('crud', 'get_tasks_by_status', lambda: crud.get_tasks_by_status('todo')),
+        ('crud', 'get_tasks_by_assignee', lambda: crud.get_tasks_by_assignee(user_id)),
+        ('crud', 'get_task_by_id', lambda: crud.get_task_by_id(task['id'])),
+        ('crud', 'get_filtered_tasks', lambda: crud.get_filtered_tasks(filters)),
+        ('crud', 'get_tasks_page', lambda: crud.get_tasks_page(25, None, filters)),
+        ('crud', 'get_comments_by_task', lambda: crud.get_comments_by_task(task['id'])),
+        ('crud', 'get_task_comments_page', lambda: crud.get_task_comments_page(task['id'])),
+        ('crud', 'update_tasks_status[50]', lambda: crud.update_tasks_status(task_ids, 'review')),
+        ('crud', 'task create/update/delete', task_lifecycle),
+        ('crud', 'comment create/delete', comment_lifecycle),
+        ('crud', 'project+subproject lifecycle', project_lifecycle),
+        ('crud', 'get_all_experiments', exp.get_all_experiments),
+        ('crud', 'get_all_experiments[search]', lambda: exp.get_all_experiments({'search': 'experiment 12'})),
+        ('crud', 'get_experiments_page', lambda: exp.get_experiments_page(None, 25)),
+        ('crud', 'get_experiment_by_id', lambda: exp.get_experiment_by_id(experiment['id'])),
+        ('crud', 'get_experiments_by_subproject', lambda: exp.get_experiments_by_subproject(subproject_id)),
+        ('crud', 'get_experiments_by_user', lambda: exp.get_experiments_by_user(user_id)),
+        ('crud', 'get_experiments_by_status', lambda: exp.get_experiments_by_status('planned')),
+        ('crud', 'get_experiment_comments', lambda: exp.get_experiment_comments(experiment['id'])),
+        ('crud', 'get_experiment_comments_page', lambda: exp.get_experiment_comments_page(experiment['id'])),
+        ('crud', 'experiment create/update/delete', experiment_lifecycle),
+    ]
+
+
+def stats_benchmarks(data: Dict[str, List[Dict[str, Any]]]) -> List[Benchmark]:
+    """
+    Dashboard KPIs, experiment KPIs, the dashboard frames and the Gantt data preparation.
+
+    Entries tagged [legacy] time the loop implementations that stats.py and
+    the timeline helpers replaced (benchmarks/legacy_stats.py) on the same
+    rows, for comparison.
+    """
+    from benchmarks import legacy_stats as legacy
+    from utils import crud, experiments_crud as exp, stats
+    from utils.dashboard_data import summarize_dashboard
+
+    timeline = _load_page_module('pages/5_timeline.py')
+    tasks = crud.get_all_tasks('summary')
+    projects, subprojects = crud.get_all_projects(), crud.get_all_subprojects()
+    experiments = exp.get_all_experiments()
+    frame = stats.tasks_frame(tasks)
+    tables = {'projects': projects, 'tasks': tasks, 'experiments': experiments}
+    user_id = data['users'][-1]['id']
+    gantt, legacy_gantt = timeline.prepare_gantt_data(tasks), legacy.prepare_gantt_data(tasks)
+
+    return [
+        ('stats', 'get_dashboard_stats', crud.get_dashboard_stats),
+        ('stats', 'compute_dashboard_stats', lambda: crud.compute_dashboard_stats(projects, subprojects, tasks)),
+        ('stats', 'compute_dashboard_stats[legacy]',
+         lambda: legacy.compute_dashboard_stats(projects, subprojects, tasks)),
+        ('stats', 'get_experiment_stats', exp.get_experiment_stats),
+        ('stats', 'compute_experiment_stats', lambda: exp.compute_experiment_stats(experiments)),
+        ('stats', 'compute_experiment_stats[legacy]', lambda: legacy.compute_experiment_stats(experiments)),
+        ('stats', 'tasks_frame', lambda: stats.tasks_frame(tasks)),
+        ('stats', 'upcoming_deadlines', lambda: stats.upcoming_deadlines(frame, tasks)),
+        ('stats', 'upcoming_deadlines[legacy]', lambda: legacy.upcoming_deadlines(tasks)),
+        ('stats', 'summarize_dashboard', lambda: summarize_dashboard(tables, user_id)),
+        ('stats', 'summarize_dashboard[legacy]', lambda: legacy.summarize_dashboard(tables, user_id)),
+        ('stats', 'prepare_gantt_data', lambda: timeline.prepare_gantt_data(tasks)),
+        ('stats', 'prepare_gantt_data[legacy]', lambda: legacy.prepare_gantt_data(tasks)),
+        ('stats', 'calendar_weeks', lambda: timeline.calendar_weeks(gantt)),
+        ('stats', 'calendar_weeks[legacy]', lambda: legacy.calendar_weeks(legacy_gantt)),
+    ]
+
+
+def page_benchmarks(data: Dict[str, List[Dict[str, Any]]]) -> List[Benchmark]:
+    """Headless render of each page (Streamlit AppTest) as a manager."""
+    from streamlit.testing.v1 import AppTest
+
+    manager = next(u for u in data['users'] if u['role'] == 'manager')
+
+    def render(path: str) -> Callable[[], Any]:
+        def run():
+            app = AppTest.from_file(str(ROOT / path), default_timeout=600)
+            app.session_state['user'] = manager
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].value)
+        return run
+
+    return [('page', Path(path).stem, render(path)) for path in PAGES]
+
+
+SUITES = {'crud': crud_benchmarks, 'stats': stats_benchmarks, 'page': page_benchmarks}
+
+
+def measure(fn: Callable[[], Any], repeat: int, database: StandInDatabase,
+            warm: bool) -> Dict[str, float]:
+    """Run fn repeat times; the query cache is cleared first unless warm."""
+    from utils.cache import query_cache
+
+    timings = []
+    requests_before = len(database.requests)
+    for _ in range(repeat):
+        if not warm:
+            query_cache.clear()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'requests': (len(database.requests) - requests_before) / repeat,
+    }
+
+
+def run(scales: List[str], suites: List[str], repeat: int, warm: bool) -> Dict[str, Dict[str, float]]:
+    """Run the suites at every scale; results are keyed 'scale/suite/name'."""
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in scales:
+        database = StandInDatabase()
+        started = time.perf_counter()
+        data = datagen.seed(database, datagen.parse_scale(scale))
+        client = install(database)
+        if data_backend() == 'memory':
+            # The stand-in is bypassed: the CRUD modules query the rows in process
+            set_repository(MemoryRepository(data))
+        elif replica_enabled():
+            # With DATA_BACKEND=replica reads are timed against the local copy
+            client.postgrest  # creating the REST session starts the replica
+            replica.reset()
+            replica.sync()
+        print(f"\n== {scale}: {sum(len(rows) for rows in data.values())} rows "
+              f"seeded in {time.perf_counter() - started:.1f}s ==")
+        print(f"{'benchmark':<44}{'median ms':>12}{'min ms':>10}{'requests':>10}")
+
+        for suite in suites:
+            for group, name, fn in SUITES[suite](data):
+                key = f"{scale}/{group}/{name}"
+                results[key] = measure(fn, repeat, database, warm)
+                result = results[key]
+                print(f"{group + '/' + name:<44}{result['median_ms']:>12.1f}"
+                      f"{result['min_ms']:>10.1f}{result['requests']:>10.1f}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Benchmarks whose median is more than threshold times the baseline's."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous and result['median_ms'] > previous['median_ms'] * threshold:
+            regressions.append(
+                f"{key}: {result['median_ms']:.1f} ms (baseline {previous['median_ms']:.1f} ms)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Nikaia dashboard benchmarks")
+    parser.add_argument('--scales', default='1k,10k', help="Comma separated task counts (1k, 10k, 100k...)")
+    parser.add_argument('--only', default=','.join(SUITES), help="Suites to run: crud, stats, page")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark (median reported)")
+    parser.add_argument('--warm', action='store_true', help="Keep the query cache between runs")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    # Streamlit warns about st.* calls made outside `streamlit run`
+    streamlit_config.set_option('global.showWarningOnDirectExecution', False)
+    streamlit_logger.set_log_level('error')
+    logging.basicConfig(level=logging.ERROR)
+
+    results = run(
+        [s for s in args.scales.split(',') if s],
+        [s for s in args.only.split(',') if s],
+        args.repeat,
+        args.warm,
+    )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text(encoding='utf-8')), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
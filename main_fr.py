@@ -12,6 +12,8 @@ from utils.auth import (
     is_authenticated,
     get_role_badge
 )
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page configuration
 st.set_page_config(
@@ -311,4 +313,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
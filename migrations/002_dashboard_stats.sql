@@ -0,0 +1,71 @@
+-- Migration 002: Dashboard statistics aggregated in the database
+-- Dashboard ELN - Performance: one small row instead of every project/subproject/task
+
+-- =============================================================================
+-- FUNCTION: get_dashboard_stats
+-- =============================================================================
+-- Returns all dashboard KPIs in a single row. p_today is passed by the
+-- application so "overdue" uses the same calendar day as the user.
+CREATE OR REPLACE FUNCTION get_dashboard_stats(p_today DATE DEFAULT CURRENT_DATE)
+RETURNS TABLE (
+  total_projects BIGINT,
+  active_projects BIGINT,
+  total_subprojects BIGINT,
+  total_tasks BIGINT,
+  completed_tasks BIGINT,
+  in_progress_tasks BIGINT,
+  todo_tasks BIGINT,
+  completion_rate NUMERIC,
+  high_priority_tasks BIGINT,
+  urgent_priority_tasks BIGINT,
+  overdue_tasks BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH project_stats AS (
+    SELECT
+      COUNT(*) AS total_projects,
+      COUNT(*) FILTER (WHERE status = 'active') AS active_projects
+    FROM projects
+  ),
+  subproject_stats AS (
+    SELECT COUNT(*) AS total_subprojects
+    FROM subprojects
+  ),
+  task_stats AS (
+    SELECT
+      COUNT(*) AS total_tasks,
+      COUNT(*) FILTER (WHERE status = 'done') AS completed_tasks,
+      COUNT(*) FILTER (WHERE status = 'in-progress') AS in_progress_tasks,
+      COUNT(*) FILTER (WHERE status = 'todo') AS todo_tasks,
+      COUNT(*) FILTER (WHERE priority = 'high') AS high_priority_tasks,
+      COUNT(*) FILTER (WHERE priority = 'urgent') AS urgent_priority_tasks,
+      COUNT(*) FILTER (WHERE due_date < p_today AND status <> 'done') AS overdue_tasks
+    FROM tasks
+  )
+  SELECT
+    p.total_projects,
+    p.active_projects,
+    s.total_subprojects,
+    t.total_tasks,
+    t.completed_tasks,
+    t.in_progress_tasks,
+    t.todo_tasks,
+    CASE WHEN t.total_tasks > 0
+      THEN t.completed_tasks * 100.0 / t.total_tasks
+      ELSE 0
+    END AS completion_rate,
+    t.high_priority_tasks,
+    t.urgent_priority_tasks,
+    t.overdue_tasks
+  FROM project_stats p, subproject_stats s, task_stats t;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_dashboard_stats(DATE) TO anon, authenticated;
+
+COMMENT ON FUNCTION get_dashboard_stats(DATE) IS 'Dashboard KPIs (projects, subprojects, tasks) aggregated server-side';
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
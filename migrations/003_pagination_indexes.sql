@@ -0,0 +1,14 @@
+-- Migration 003: Indexes for keyset pagination
+-- Dashboard ELN - Performance: task and experiment lists are paged on (created_at, id)
+
+-- =============================================================================
+-- INDEXES for keyset pagination (ORDER BY created_at DESC, id DESC)
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_tasks_created_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_created_id ON tasks(assignee_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_experiments_created_id ON experiments(created_at DESC, id DESC);
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
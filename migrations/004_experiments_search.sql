@@ -0,0 +1,79 @@
+-- Migration 004: Full-text search on experiments
+-- Dashboard ELN - Performance: indexed, ranked search instead of ILIKE scans
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- =============================================================================
+-- COLUMN: search_vector (weighted, maintained by PostgreSQL)
+-- =============================================================================
+-- 'simple' configuration: entries mix French and English, so words are
+-- indexed as written (lower-cased, no language-specific stemming).
+--   A: title
+--   B: objective, description
+--   C: protocol, conditions, observations, results_summary
+ALTER TABLE experiments
+  ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(objective, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(protocol, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(conditions, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(observations, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(results_summary, '')), 'C')
+  ) STORED;
+
+-- =============================================================================
+-- INDEXES
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_experiments_search_vector ON experiments USING GIN (search_vector);
+
+-- Trigram index for fuzzy / partial title matches (also serves title ILIKE)
+CREATE INDEX IF NOT EXISTS idx_experiments_title_trgm ON experiments USING GIN (title gin_trgm_ops);
+
+-- =============================================================================
+-- FUNCTION: search_experiments
+-- =============================================================================
+-- Returns the ids of matching experiments, best match first. An experiment
+-- matches when the full query matches (websearch syntax: "quoted phrase",
+-- -excluded, or), when every word matches as a prefix ("cryst" finds
+-- "crystallization"), or when its title is similar to the query (typos).
+CREATE OR REPLACE FUNCTION search_experiments(search_query TEXT, max_results INTEGER DEFAULT 200)
+RETURNS TABLE (
+  id UUID,
+  rank REAL
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT
+      websearch_to_tsquery('simple', search_query) AS full_query,
+      (
+        SELECT to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*', ' & '))
+        FROM unnest(tsvector_to_array(to_tsvector('simple', search_query))) AS lexeme
+      ) AS prefix_query
+  )
+  SELECT
+    e.id,
+    (
+      2 * coalesce(ts_rank(e.search_vector, q.full_query), 0) +
+      coalesce(ts_rank(e.search_vector, q.prefix_query), 0) +
+      similarity(e.title, search_query)
+    )::REAL AS rank
+  FROM experiments e, q
+  WHERE e.search_vector @@ q.full_query
+     OR e.search_vector @@ q.prefix_query
+     OR e.title % search_query
+  ORDER BY rank DESC, e.created_at DESC, e.id DESC
+  LIMIT max_results;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_experiments(TEXT, INTEGER) TO anon, authenticated;
+
+COMMENT ON COLUMN experiments.search_vector IS 'Weighted full-text document (title > objective/description > protocol/notes)';
+COMMENT ON FUNCTION search_experiments(TEXT, INTEGER) IS 'Ranked experiment ids for a free-text query (full-text, prefix and trigram matching)';
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
@@ -0,0 +1,25 @@
+-- Migration 005: Publish table changes to Supabase Realtime
+-- Dashboard ELN - Performance: the app patches its shared cache from row changes
+-- instead of re-reading whole tables
+
+-- =============================================================================
+-- PUBLICATION supabase_realtime (created by Supabase)
+-- =============================================================================
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['projects', 'subprojects', 'tasks', 'experiments', 'comments']
+  LOOP
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_publication_tables
+      WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = t
+    ) THEN
+      EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE public.%I', t);
+    END IF;
+  END LOOP;
+END $$;
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
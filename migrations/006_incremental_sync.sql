@@ -0,0 +1,98 @@
+-- Migration 006: updated_at watermarks and delete tombstones for incremental sync
+-- Dashboard ELN - Performance: refreshes fetch only the rows changed since the last sync
+
+-- =============================================================================
+-- COLUMN + TRIGGER: updated_at
+-- =============================================================================
+-- schema.sql already defines these; databases created before it (or from
+-- older scripts) may not have them. Everything below is idempotent and reuses
+-- the function and trigger names of schema.sql.
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['projects', 'subprojects', 'tasks', 'comments']
+  LOOP
+    EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()', t);
+    EXECUTE format('UPDATE %I SET updated_at = COALESCE(created_at, NOW()) WHERE updated_at IS NULL', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS update_%s_updated_at ON %I', t, t);
+    EXECUTE format(
+      'CREATE TRIGGER update_%s_updated_at BEFORE UPDATE ON %I '
+      'FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()', t, t
+    );
+  END LOOP;
+END $$;
+
+-- experiments keeps its own trigger (migrations/001_create_experiments.sql)
+
+-- =============================================================================
+-- INDEXES for "updated_at > watermark" queries
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects(updated_at);
+CREATE INDEX IF NOT EXISTS idx_subprojects_updated_at ON subprojects(updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks(updated_at);
+CREATE INDEX IF NOT EXISTS idx_comments_updated_at ON comments(updated_at);
+CREATE INDEX IF NOT EXISTS idx_experiments_updated_at ON experiments(updated_at);
+
+-- =============================================================================
+-- TABLE: deleted_rows (tombstones)
+-- =============================================================================
+-- A deleted row can't be found with updated_at: its id is recorded here so
+-- incremental syncs can drop it. Tombstones only need to outlive the longest
+-- gap between two syncs (the app does a full reload after 7 days), e.g.:
+--   DELETE FROM deleted_rows WHERE deleted_at < NOW() - INTERVAL '7 days';
+CREATE TABLE IF NOT EXISTS deleted_rows (
+  id BIGSERIAL PRIMARY KEY,
+  table_name TEXT NOT NULL,
+  row_id UUID NOT NULL,
+  deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_table_deleted_at ON deleted_rows(table_name, deleted_at);
+
+ALTER TABLE deleted_rows ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Enable read access for all users" ON deleted_rows;
+CREATE POLICY "Enable read access for all users" ON deleted_rows
+    FOR SELECT USING (true);
+
+-- SECURITY DEFINER: rows are recorded whatever the deleting role may insert
+CREATE OR REPLACE FUNCTION record_deleted_row()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO deleted_rows (table_name, row_id) VALUES (TG_TABLE_NAME, OLD.id);
+  RETURN OLD;
+END;
+$$;
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['projects', 'subprojects', 'tasks', 'comments', 'experiments']
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS record_%s_deleted ON %I', t, t);
+    EXECUTE format(
+      'CREATE TRIGGER record_%s_deleted AFTER DELETE ON %I '
+      'FOR EACH ROW EXECUTE FUNCTION record_deleted_row()', t, t
+    );
+  END LOOP;
+END $$;
+
+COMMENT ON TABLE deleted_rows IS 'Tombstones of deleted rows, read by incremental syncs';
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
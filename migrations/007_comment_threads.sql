@@ -0,0 +1,14 @@
+-- Migration 007: Indexes for comment counts and paginated comment threads
+-- Dashboard ELN - Performance: lists embed comments(count), threads are paged on (created_at, id)
+
+-- =============================================================================
+-- INDEXES for per-parent counts and keyset pagination (ORDER BY created_at DESC, id DESC)
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_comments_task_created_id
+  ON comments(task_id, created_at DESC, id DESC) WHERE task_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_comments_experiment_created_id
+  ON comments(experiment_id, created_at DESC, id DESC) WHERE experiment_id IS NOT NULL;
+
+-- =============================================================================
+-- END OF MIGRATION
+-- =============================================================================
@@ -7,15 +7,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
 from utils.auth import is_authenticated, get_current_user, logout_user, get_role_badge
-from utils.crud import (
-    get_dashboard_stats,
-    get_all_projects,
-    get_all_tasks,
-    get_tasks_by_assignee
-)
-from utils.experiments_crud import get_experiment_stats, get_all_experiments
+from utils.dashboard_data import load_dashboard_snapshot
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -110,19 +105,13 @@ def show_kpi_cards(stats, exp_stats):
         )
 
 
-def show_project_status_chart(projects):
-    """Display project status distribution chart."""
+def show_project_status_chart(status_counts):
+    """Display project status distribution chart (status counts from the dashboard snapshot)."""
 
-    if not projects:
+    if not status_counts:
         st.info("No projects to display")
         return
 
-    # Count projects by status
-    status_counts = {}
-    for project in projects:
-        status = project.get('status', 'unknown')
-        status_counts[status] = status_counts.get(status, 0) + 1
-
     # Create dataframe
     df = pd.DataFrame(list(status_counts.items()), columns=['Status', 'Count'])
 
@@ -151,19 +140,13 @@ def show_project_status_chart(projects):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_task_status_chart(tasks):
-    """Display task status distribution chart."""
+def show_task_status_chart(status_counts):
+    """Display task status distribution chart (status counts from the dashboard snapshot)."""
 
-    if not tasks:
+    if not status_counts:
         st.info("No tasks to display")
         return
 
-    # Count tasks by status
-    status_counts = {}
-    for task in tasks:
-        status = task.get('status', 'unknown')
-        status_counts[status] = status_counts.get(status, 0) + 1
-
     # Create dataframe
     df = pd.DataFrame(list(status_counts.items()), columns=['Status', 'Count'])
 
@@ -200,19 +183,13 @@ def show_task_status_chart(tasks):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_experiment_status_chart(experiments):
-    """Display experiment status distribution chart."""
+def show_experiment_status_chart(status_counts):
+    """Display experiment status distribution chart (status counts from the dashboard snapshot)."""
 
-    if not experiments:
+    if not status_counts:
         st.info("No experiments to display")
         return
 
-    # Count experiments by status
-    status_counts = {}
-    for exp in experiments:
-        status = exp.get('status', 'unknown')
-        status_counts[status] = status_counts.get(status, 0) + 1
-
     # Create dataframe
     df = pd.DataFrame(list(status_counts.items()), columns=['Status', 'Count'])
 
@@ -251,19 +228,13 @@ def show_experiment_status_chart(experiments):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_priority_distribution(tasks):
-    """Display task priority distribution."""
+def show_priority_distribution(priority_counts):
+    """Display task priority distribution (priority counts from the dashboard snapshot)."""
 
-    if not tasks:
+    if not priority_counts:
         st.info("No tasks to display")
         return
 
-    # Count tasks by priority
-    priority_counts = {}
-    for task in tasks:
-        priority = task.get('priority', 'medium')
-        priority_counts[priority] = priority_counts.get(priority, 0) + 1
-
     # Create dataframe
     df = pd.DataFrame(list(priority_counts.items()), columns=['Priority', 'Count'])
 
@@ -306,11 +277,9 @@ def show_priority_distribution(tasks):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def show_my_tasks_summary(user):
+def show_my_tasks_summary(my_tasks):
     """Display current user's task summary."""
 
-    my_tasks = get_tasks_by_assignee(user['id'])
-
     if not my_tasks:
         st.info("No tasks assigned")
         return
@@ -346,43 +315,18 @@ def show_my_tasks_summary(user):
             st.markdown(f"*... and {len(review) - 3} more*")
 
 
-def show_upcoming_deadlines(tasks):
-    """Display upcoming task deadlines."""
-
-    if not tasks:
-        return
+def show_upcoming_deadlines(upcoming):
+    """Display upcoming task deadlines (frame from the dashboard snapshot, soonest first)."""
 
     st.markdown("### 📅 Upcoming Deadlines (7 days)")
 
-    today = datetime.now().date()
-    next_week = today + timedelta(days=7)
-
-    # Filter tasks with upcoming deadlines
-    upcoming = []
-    for task in tasks:
-        if task.get('due_date') and task['status'] != 'done':
-            due_date = datetime.fromisoformat(task['due_date'].replace('Z', '+00:00')).date()
-            if today <= due_date <= next_week:
-                upcoming.append({
-                    'title': task['title'],
-                    'due_date': due_date,
-                    'priority': task.get('priority', 'medium'),
-                    'assignee': task.get('assignee', {}).get('name', 'Unassigned') if task.get('assignee') else 'Unassigned'
-                })
-
-    if not upcoming:
+    if upcoming.empty:
         st.info("No deadlines in the next 7 days")
         return
 
-    # Sort by due date
-    upcoming.sort(key=lambda x: x['due_date'])
-
     # Display as table
-    df = pd.DataFrame(upcoming)
-    df['due_date'] = df['due_date'].astype(str)
-
     st.dataframe(
-        df,
+        upcoming,
         column_config={
             'title': 'Task',
             'due_date': 'Due Date',
@@ -410,12 +354,11 @@ def main():
     if st.button("🔄 Refresh", key="refresh_dashboard"):
         st.rerun()
 
-    # Get data
-    stats = get_dashboard_stats()
-    projects = get_all_projects()
-    tasks = get_all_tasks()
-    exp_stats = get_experiment_stats()
-    experiments = get_all_experiments()
+    # Get data (each table fetched once, in parallel)
+    snapshot = load_dashboard_snapshot(user['id'])
+    stats = snapshot['stats']
+    exp_stats = snapshot['exp_stats']
+    counts = snapshot['counts']
 
     # KPI Cards
     show_kpi_cards(stats, exp_stats)
@@ -426,10 +369,10 @@ def main():
     col1, col2 = st.columns(2)
 
     with col1:
-        show_project_status_chart(projects)
+        show_project_status_chart(counts['project_status'])
 
     with col2:
-        show_task_status_chart(tasks)
+        show_task_status_chart(counts['task_status'])
 
     st.markdown("---")
 
@@ -437,10 +380,10 @@ def main():
     col1, col2 = st.columns(2)
 
     with col1:
-        show_priority_distribution(tasks)
+        show_priority_distribution(counts['task_priority'])
 
     with col2:
-        show_experiment_status_chart(experiments)
+        show_experiment_status_chart(counts['experiment_status'])
 
     st.markdown("---")
 
@@ -472,13 +415,16 @@ def main():
     st.markdown("---")
 
     # My tasks summary
-    show_my_tasks_summary(user)
+    show_my_tasks_summary(snapshot['my_tasks'])
 
     st.markdown("---")
 
     # Upcoming deadlines
-    show_upcoming_deadlines(tasks)
+    if snapshot['tasks']:
+        show_upcoming_deadlines(snapshot['upcoming'])
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -15,6 +15,8 @@ from utils.crud import (
     get_all_tasks,
     get_tasks_by_assignee
 )
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -393,4 +395,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -25,6 +25,9 @@ from utils.crud import (
     delete_subproject,
     get_all_users
 )
+from utils.batch import fetch_parallel
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -364,7 +367,13 @@ def main():
     show_sidebar()
 
     user = get_current_user()
-    users = get_all_users()
+
+    data = fetch_parallel({
+        'users': get_all_users,
+        'projects': get_all_projects
+    })
+    users = data['users'] or []
+    projects = data['projects'] or []
 
     # Header
     st.title("📁 Project Management")
@@ -386,9 +395,6 @@ def main():
 
         st.markdown("---")
 
-    # Get all projects
-    projects = get_all_projects()
-
     if not projects:
         st.info("No projects yet. Create one!")
         return
@@ -426,4 +432,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
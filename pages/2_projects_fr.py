@@ -25,6 +25,8 @@ from utils.crud import (
     delete_subproject,
     get_all_users
 )
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -418,4 +420,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
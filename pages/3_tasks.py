@@ -14,17 +14,30 @@ from utils.auth import (
     has_permission
 )
 from utils.crud import (
-    get_all_tasks,
-    get_tasks_by_assignee,
+    get_tasks_page,
+    get_task_by_id,
     create_task,
     update_task,
+    update_tasks_status,
     delete_task,
     get_all_subprojects,
     get_all_users,
-    get_comments_by_task,
+    get_task_comments_page,
     create_comment,
     delete_comment
 )
+from utils.batch import fetch_parallel
+from utils.pagination import (
+    PAGE_SIZE_OPTIONS,
+    DEFAULT_PAGE_SIZE,
+    get_page_cursor,
+    show_page_controls,
+    get_loaded_items,
+    show_load_more,
+    reset_loaded_items
+)
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -38,6 +51,10 @@ if not is_authenticated():
     st.warning("⚠️ Please log in")
     st.stop()
 
+STATUS_OPTIONS = ['todo', 'in-progress', 'review', 'done']
+PRIORITY_OPTIONS = ['low', 'medium', 'high', 'urgent']
+DEFAULT_STATUS_FILTER = ['todo', 'in-progress', 'review']
+
 
 def show_sidebar():
     """Display sidebar navigation."""
@@ -320,8 +337,11 @@ def show_task_card(task, users):
                     if delete_task(task['id']):
                         st.rerun()
 
-            if st.button("💬", key=f"comments_{task['id']}", use_container_width=True):
+            comment_count = task.get('comment_count')
+            comments_label = f"💬 {comment_count}" if comment_count else "💬"
+            if st.button(comments_label, key=f"comments_{task['id']}", use_container_width=True):
                 st.session_state.viewing_comments = task['id']
+                reset_loaded_items(comments_state_key(task['id']))
                 st.rerun()
 
         # Show comments if viewing
@@ -331,12 +351,23 @@ def show_task_card(task, users):
         st.markdown("---")
 
 
+def comments_state_key(task_id):
+    """Session state key of a task's loaded comments."""
+    return f"task_comments_{task_id}"
+
+
 def show_comments_section(task_id):
     """Display comments section for a task."""
 
     st.markdown("#### 💬 Comments")
 
-    comments = get_comments_by_task(task_id)
+    # Newest comments first, older ones on demand
+    state_key = comments_state_key(task_id)
+
+    def load_page(cursor):
+        return get_task_comments_page(task_id, cursor=cursor)
+
+    comments = get_loaded_items(state_key, load_page)
 
     # Add comment form
     if has_permission('create'):
@@ -352,6 +383,7 @@ def show_comments_section(task_id):
                     'content': content
                 }
                 if create_comment(comment_data):
+                    reset_loaded_items(state_key)
                     st.rerun()
 
     # Display comments
@@ -373,10 +405,13 @@ def show_comments_section(task_id):
                 if has_permission('delete', comment.get('user_id')):
                     if st.button("🗑️", key=f"delete_comment_{comment['id']}"):
                         if delete_comment(comment['id']):
+                            reset_loaded_items(state_key)
                             st.rerun()
 
             st.markdown("---")
 
+    show_load_more(state_key, load_page, "Load older comments")
+
 
 def show_tasks_table(tasks):
     """Display tasks in a filterable table."""
@@ -412,14 +447,88 @@ def show_tasks_table(tasks):
     )
 
 
+def move_selected_tasks():
+    """Button callback: move the selected tasks, then clear the selection."""
+    update_tasks_status(st.session_state['tasks_bulk_selection'], st.session_state['tasks_bulk_status'])
+    st.session_state['tasks_bulk_selection'] = []
+
+
+def show_bulk_move_section(tasks):
+    """Let the user pick several tasks of the page and change their status at once."""
+    movable = {t['id']: t['title'] for t in tasks if has_permission('update', t.get('assignee_id'))}
+    if not movable:
+        return
+
+    # Drop selections left over from another page or filter
+    st.session_state['tasks_bulk_selection'] = [
+        task_id for task_id in st.session_state.get('tasks_bulk_selection', []) if task_id in movable
+    ]
+
+    with st.expander("🔀 Move selected tasks", expanded=False):
+        col1, col2, col3 = st.columns([4, 2, 1])
+
+        with col1:
+            selected = st.multiselect(
+                "Tasks",
+                options=list(movable.keys()),
+                format_func=lambda x: movable[x],
+                key='tasks_bulk_selection'
+            )
+
+        with col2:
+            st.selectbox(
+                "New status",
+                options=STATUS_OPTIONS,
+                format_func=lambda x: {
+                    'todo': '📋 Todo',
+                    'in-progress': '🔄 In Progress',
+                    'review': '👁️ In Review',
+                    'done': '✅ Done'
+                }[x],
+                key='tasks_bulk_status'
+            )
+
+        with col3:
+            st.markdown("<br/>", unsafe_allow_html=True)
+            st.button(
+                "Move",
+                disabled=not selected,
+                on_click=move_selected_tasks,
+                use_container_width=True
+            )
+
+
 def main():
     """Main tasks page."""
 
     show_sidebar()
 
     user = get_current_user()
-    users = get_all_users()
-    subprojects = get_all_subprojects()
+
+    # Load everything the page needs in parallel. View, page size and filter
+    # widgets are keyed, so their current values are known before rendering
+    # and the filtering is done by the database.
+    view_mode = st.session_state.get('tasks_view_mode', 'all')
+    page_size = st.session_state.get('tasks_page_size', DEFAULT_PAGE_SIZE)
+    filters = {
+        'statuses': st.session_state.get('tasks_filter_status', DEFAULT_STATUS_FILTER),
+        'priorities': st.session_state.get('tasks_filter_priority', PRIORITY_OPTIONS),
+        'search': st.session_state.get('tasks_search', '').strip(),
+        'assignee_id': user['id'] if view_mode == 'my_tasks' else None
+    }
+    cursor = get_page_cursor('tasks_pagination', (view_mode, page_size, repr(filters)))
+    data = fetch_parallel({
+        'users': get_all_users,
+        'subprojects': get_all_subprojects,
+        # Cards show the description, the table doesn't
+        'tasks': lambda: get_tasks_page(
+            page_size, cursor, filters, 'summary' if view_mode == 'table' else 'detail'
+        )
+    })
+    users = data['users'] or []
+    subprojects = data['subprojects'] or []
+    page = data['tasks'] or {'items': [], 'next_cursor': None}
+    tasks = page['items']
 
     # Header
     st.title("✅ Task Management")
@@ -445,84 +554,88 @@ def main():
         st.warning("⚠️ No subprojects available. Create a project and subproject first.")
         return
 
-    # View selector
-    view_mode = st.radio(
-        "View",
-        options=['all', 'my_tasks', 'table'],
-        format_func=lambda x: {
-            'all': '📋 All Tasks',
-            'my_tasks': '👤 My Tasks',
-            'table': '📊 Table View'
-        }[x],
-        horizontal=True
-    )
+    # View selector and page size
+    col1, col2 = st.columns([4, 1])
 
-    # Get tasks based on view
-    if view_mode == 'my_tasks':
-        tasks = get_tasks_by_assignee(user['id'])
-        st.markdown(f"### 👤 My Tasks ({len(tasks)})")
-    else:
-        tasks = get_all_tasks()
-        st.markdown(f"### 📋 All Tasks ({len(tasks)})")
+    with col1:
+        view_mode = st.radio(
+            "View",
+            options=['all', 'my_tasks', 'table'],
+            format_func=lambda x: {
+                'all': '📋 All Tasks',
+                'my_tasks': '👤 My Tasks',
+                'table': '📊 Table View'
+            }[x],
+            horizontal=True,
+            key='tasks_view_mode'
+        )
 
-    if not tasks:
-        st.info("No tasks yet. Create one!")
-        return
+    with col2:
+        st.selectbox(
+            "Tasks per page",
+            options=PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+            key='tasks_page_size'
+        )
 
-    # Filters
+    # Filters (applied by the database query above)
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        filter_status = st.multiselect(
+        st.multiselect(
             "Filter by status",
-            options=['todo', 'in-progress', 'review', 'done'],
-            default=['todo', 'in-progress', 'review'],
+            options=STATUS_OPTIONS,
+            default=DEFAULT_STATUS_FILTER,
             format_func=lambda x: {
                 'todo': '📋 Todo',
                 'in-progress': '🔄 In Progress',
                 'review': '👁️ In Review',
                 'done': '✅ Done'
-            }[x]
+            }[x],
+            key='tasks_filter_status'
         )
 
     with col2:
-        filter_priority = st.multiselect(
+        st.multiselect(
             "Filter by priority",
-            options=['low', 'medium', 'high', 'urgent'],
-            default=['low', 'medium', 'high', 'urgent'],
+            options=PRIORITY_OPTIONS,
+            default=PRIORITY_OPTIONS,
             format_func=lambda x: {
                 'low': '🟢 Low',
                 'medium': '🟡 Medium',
                 'high': '🟠 High',
                 'urgent': '🔴 Urgent'
-            }[x]
+            }[x],
+            key='tasks_filter_priority'
         )
 
     with col3:
-        search = st.text_input("🔍 Search", placeholder="Task title...")
-
-    # Apply filters
-    filtered_tasks = [
-        t for t in tasks
-        if t['status'] in filter_status
-        and t['priority'] in filter_priority
-        and (not search or search.lower() in t['title'].lower())
-    ]
+        st.text_input("🔍 Search", placeholder="Task title...", key='tasks_search')
 
-    if not filtered_tasks:
-        st.warning("No tasks match the filters")
-        return
+    if view_mode == 'my_tasks':
+        st.markdown(f"### 👤 My Tasks ({len(tasks)} on this page)")
+    else:
+        st.markdown(f"### 📋 All Tasks ({len(tasks)} on this page)")
+
+    show_bulk_move_section(tasks)
 
     # Display tasks
-    if view_mode == 'table':
-        show_tasks_table(filtered_tasks)
+    if not tasks:
+        st.warning("No tasks match the filters")
+    elif view_mode == 'table':
+        show_tasks_table(tasks)
     else:
-        for task in filtered_tasks:
+        for task in tasks:
             if st.session_state.get('editing_task') == task['id']:
-                show_edit_task_modal(task, subprojects, users)
+                # Reload the full, current row before editing it
+                show_edit_task_modal(get_task_by_id(task['id']) or task, subprojects, users)
             else:
                 show_task_card(task, users)
 
+    show_page_controls('tasks_pagination', page['next_cursor'])
+
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -21,10 +21,13 @@ from utils.crud import (
     delete_task,
     get_all_subprojects,
     get_all_users,
-    get_comments_by_task,
+    get_task_comments_page,
     create_comment,
     delete_comment
 )
+from utils.pagination import get_loaded_items, show_load_more, reset_loaded_items
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -314,6 +317,7 @@ def show_task_card(task, users):
 
             if st.button("💬", key=f"comments_{task['id']}", use_container_width=True):
                 st.session_state.viewing_comments = task['id']
+                reset_loaded_items(comments_state_key(task['id']))
                 st.rerun()
 
         # Show comments if viewing
@@ -323,12 +327,23 @@ def show_task_card(task, users):
         st.markdown("---")
 
 
+def comments_state_key(task_id):
+    """Session state key of a task's loaded comments."""
+    return f"task_comments_{task_id}"
+
+
 def show_comments_section(task_id):
     """Display comments section for a task."""
 
     st.markdown("#### 💬 Commentaires")
 
-    comments = get_comments_by_task(task_id)
+    # Newest comments first, older ones on demand
+    state_key = comments_state_key(task_id)
+
+    def load_page(cursor):
+        return get_task_comments_page(task_id, cursor=cursor)
+
+    comments = get_loaded_items(state_key, load_page)
 
     # Add comment form
     if has_permission('create'):
@@ -344,6 +359,7 @@ def show_comments_section(task_id):
                     'content': content
                 }
                 if create_comment(comment_data):
+                    reset_loaded_items(state_key)
                     st.rerun()
 
     # Display comments
@@ -365,10 +381,13 @@ def show_comments_section(task_id):
                 if has_permission('delete', comment.get('user_id')):
                     if st.button("🗑️", key=f"delete_comment_{comment['id']}"):
                         if delete_comment(comment['id']):
+                            reset_loaded_items(state_key)
                             st.rerun()
 
             st.markdown("---")
 
+    show_load_more(state_key, load_page, "Charger les commentaires plus anciens")
+
 
 def show_tasks_table(tasks):
     """Display tasks in a filterable table."""
@@ -517,4 +536,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -3,6 +3,7 @@ Kanban Board Page
 Kanban board view with columns by status.
 """
 
+import time
 import streamlit as st
 from utils.auth import (
     is_authenticated,
@@ -12,10 +13,15 @@ from utils.auth import (
     has_permission
 )
 from utils.crud import (
-    get_all_tasks,
-    get_tasks_by_status,
-    update_task
+    get_filtered_tasks,
+    get_all_users,
+    save_task,
+    update_tasks_status
 )
+from utils.batch import fetch_parallel, run_in_background
+from utils.cache import query_cache
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -29,6 +35,25 @@ if not is_authenticated():
     st.warning("⚠️ Please log in")
     st.stop()
 
+PRIORITY_OPTIONS = ['low', 'medium', 'high', 'urgent']
+STATUS_LABELS = {
+    'todo': '📋 Todo',
+    'in-progress': '🔄 In Progress',
+    'review': '👁️ In Review',
+    'done': '✅ Done'
+}
+
+# The board is kept in session_state between reruns and reloaded after this
+# many seconds, when the filters change, or when tasks were written elsewhere
+BOARD_MAX_AGE_SECONDS = 60
+
+# While moves are being saved the page reruns on its own at this interval,
+# so a failed move is rolled back on screen without waiting for a click
+PENDING_POLL_SECONDS = 0.5
+
+MOVE_LEFT = {'in-progress': 'todo', 'review': 'in-progress', 'done': 'review'}
+MOVE_RIGHT = {'todo': 'in-progress', 'in-progress': 'review', 'review': 'done'}
+
 
 def show_sidebar():
     """Display sidebar navigation."""
@@ -66,7 +91,109 @@ def show_sidebar():
                 st.rerun()
 
 
-def show_task_card_kanban(task, column_status):
+def reconcile_board(board):
+    """
+    Settle the background writes that finished since the last rerun.
+
+    A failed write puts the task back in its previous column (unless it was
+    moved again meanwhile) and reports it.
+    """
+    for task_id, move in list(board['pending'].items()):
+        if not all(future.done() for future in move['futures']):
+            continue
+        del board['pending'][task_id]
+
+        generations = [future.result() for future in move['futures']]
+        board['writes'].update(g for g in generations if g is not None)
+        if generations[-1] is not None:
+            continue
+
+        task = board['tasks'].get(task_id)
+        if task and task['status'] == move['status']:
+            task['status'] = move['previous']
+        st.error(f"❌ Could not move '{move['title']}', it was moved back")
+
+    # Our own writes invalidated the tasks cache: not a reason to reload.
+    # Any other invalidation leaves a generation missing from board['writes'].
+    while board['generation'] + 1 in board['writes']:
+        board['generation'] += 1
+        board['writes'].remove(board['generation'])
+
+
+def load_board(filters):
+    """
+    Get the users and the board's tasks, reading the database only when needed.
+
+    Tasks are stored in session_state so moves can be applied locally.
+
+    Returns:
+        Tuple (users, tasks)
+    """
+    token = repr(filters)
+    board = st.session_state.get('kanban_board')
+
+    if board:
+        reconcile_board(board)
+
+    stale = (
+        board is None or
+        board['token'] != token or
+        time.monotonic() - board['loaded_at'] > BOARD_MAX_AGE_SECONDS or
+        board['generation'] != query_cache.generation('tasks')
+    )
+
+    # Never reload under pending moves, the reload could undo them on screen
+    if not stale or (board and board['pending']):
+        return get_all_users(), list(board['tasks'].values())
+
+    generation = query_cache.generation('tasks')
+    data = fetch_parallel({
+        'users': get_all_users,
+        'tasks': lambda: get_filtered_tasks(filters)
+    })
+    st.session_state['kanban_board'] = {
+        'token': token,
+        # Copies: statuses are changed in place and cached rows are read-only
+        'tasks': {t['id']: dict(t) for t in data['tasks'] or []},
+        'pending': {},
+        'generation': generation,
+        # Cache generations left by our own writes (see crud.save_task)
+        'writes': set(),
+        'loaded_at': time.monotonic()
+    }
+    return data['users'] or [], list(st.session_state['kanban_board']['tasks'].values())
+
+
+def save_status(task_id, new_status, after=None):
+    """
+    Write a task status, once the previous write of the same task is done.
+
+    Returns:
+        Tasks cache generation left by the write, None if it failed
+    """
+    if after is not None:
+        after.result()
+    return save_task(task_id, {'status': new_status})
+
+
+def move_task(task_id, new_status):
+    """Button callback: move the card right away and save the status in the background."""
+    board = st.session_state['kanban_board']
+    task = board['tasks'][task_id]
+    move = board['pending'].setdefault(task_id, {
+        'futures': [],
+        'previous': task['status'],
+        'title': task['title']
+    })
+
+    # Writes of a task are chained so the last click wins
+    after = move['futures'][-1] if move['futures'] else None
+    move['futures'].append(run_in_background(save_status, task_id, new_status, after))
+    move['status'] = new_status
+    task['status'] = new_status
+
+
+def show_task_card_kanban(task, column_status, bulk_mode=False):
     """Display task card in Kanban view."""
 
     priority_icons = {
@@ -108,33 +235,21 @@ def show_task_card_kanban(task, column_status):
         """, unsafe_allow_html=True)
 
         # Action buttons
-        if has_permission('update', task.get('assignee_id')):
+        if bulk_mode and has_permission('update', task.get('assignee_id')):
+            st.checkbox("Select", key=f"kanban_select_{task['id']}")
+        elif has_permission('update', task.get('assignee_id')):
             col1, col2, col3, col4 = st.columns(4)
 
-            # Move buttons based on current status
-            if column_status != 'todo':
+            # Move buttons based on current status (applied locally, saved in the background)
+            if column_status in MOVE_LEFT:
                 with col1:
-                    if st.button("⬅️", key=f"left_{task['id']}", help="Move left"):
-                        new_status = {
-                            'in-progress': 'todo',
-                            'review': 'in-progress',
-                            'done': 'review'
-                        }.get(column_status)
-                        if new_status:
-                            update_task(task['id'], {'status': new_status})
-                            st.rerun()
-
-            if column_status != 'done':
+                    st.button("⬅️", key=f"left_{task['id']}", help="Move left",
+                              on_click=move_task, args=(task['id'], MOVE_LEFT[column_status]))
+
+            if column_status in MOVE_RIGHT:
                 with col4:
-                    if st.button("➡️", key=f"right_{task['id']}", help="Move right"):
-                        new_status = {
-                            'todo': 'in-progress',
-                            'in-progress': 'review',
-                            'review': 'done'
-                        }.get(column_status)
-                        if new_status:
-                            update_task(task['id'], {'status': new_status})
-                            st.rerun()
+                    st.button("➡️", key=f"right_{task['id']}", help="Move right",
+                              on_click=move_task, args=(task['id'], MOVE_RIGHT[column_status]))
 
             with col2:
                 if st.button("👁️", key=f"view_{task['id']}", help="View details"):
@@ -144,7 +259,7 @@ def show_task_card_kanban(task, column_status):
         st.markdown("---")
 
 
-def show_kanban_column(title, status, tasks, icon, color):
+def show_kanban_column(title, status, tasks, icon, color, bulk_mode=False):
     """Display a Kanban column."""
 
     filtered_tasks = [t for t in tasks if t['status'] == status]
@@ -166,7 +281,42 @@ def show_kanban_column(title, status, tasks, icon, color):
         st.info("No tasks")
     else:
         for task in filtered_tasks:
-            show_task_card_kanban(task, status)
+            show_task_card_kanban(task, status, bulk_mode)
+
+
+def move_selected_tasks(task_ids):
+    """Button callback: move the selected tasks, then clear the selection."""
+    update_tasks_status(task_ids, st.session_state['kanban_bulk_status'])
+    for task_id in task_ids:
+        st.session_state[f"kanban_select_{task_id}"] = False
+
+
+def show_bulk_move_bar(tasks):
+    """Display the selection summary and the "move selected" action."""
+    selected_ids = [t['id'] for t in tasks if st.session_state.get(f"kanban_select_{t['id']}")]
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+
+    with col1:
+        st.markdown(f"**{len(selected_ids)} task(s) selected**")
+
+    with col2:
+        st.selectbox(
+            "Move to",
+            options=list(STATUS_LABELS.keys()),
+            format_func=lambda x: STATUS_LABELS[x],
+            key='kanban_bulk_status',
+            label_visibility="collapsed"
+        )
+
+    with col3:
+        st.button(
+            "Move selected",
+            disabled=not selected_ids,
+            on_click=move_selected_tasks,
+            args=(selected_ids,),
+            use_container_width=True
+        )
 
 
 def show_task_detail_modal(task):
@@ -214,50 +364,45 @@ def main():
     with col2:
         if st.button("🔄 Refresh", use_container_width=True):
             st.session_state.pop('viewing_task_kanban', None)
+            st.session_state.pop('kanban_board', None)
             st.rerun()
 
-    # Get all tasks
-    tasks = get_all_tasks()
-
-    if not tasks:
-        st.info("No tasks to display. Create tasks from the Tasks page!")
-        return
+    # Filter widgets are keyed: read their values first so the database
+    # returns only the matching tasks
+    filters = {
+        'priorities': st.session_state.get('kanban_filter_priority', PRIORITY_OPTIONS),
+        'assignee_ids': st.session_state.get('kanban_filter_assignee', [])
+    }
+    users, filtered_tasks = load_board(filters)
 
     # Filters
     col1, col2 = st.columns(2)
 
     with col1:
-        filter_priority = st.multiselect(
+        st.multiselect(
             "Filter by priority",
-            options=['low', 'medium', 'high', 'urgent'],
-            default=['low', 'medium', 'high', 'urgent'],
+            options=PRIORITY_OPTIONS,
+            default=PRIORITY_OPTIONS,
             format_func=lambda x: {
                 'low': '🟢 Low',
                 'medium': '🟡 Medium',
                 'high': '🟠 High',
                 'urgent': '🔴 Urgent'
-            }[x]
+            }[x],
+            key='kanban_filter_priority'
         )
 
     with col2:
-        filter_assignee = st.multiselect(
+        # None stands for unassigned tasks
+        assignee_names = {u['id']: u['name'] for u in users}
+        st.multiselect(
             "Filter by assignee",
-            options=list(set([
-                t.get('assignee', {}).get('name', 'Unassigned') if t.get('assignee') else 'Unassigned'
-                for t in tasks
-            ])),
-            default=[]
+            options=[None] + list(assignee_names.keys()),
+            format_func=lambda x: assignee_names.get(x, 'Unassigned'),
+            default=[],
+            key='kanban_filter_assignee'
         )
 
-    # Apply filters
-    filtered_tasks = [
-        t for t in tasks
-        if t['priority'] in filter_priority
-        and (not filter_assignee or (
-            t.get('assignee', {}).get('name', 'Unassigned') if t.get('assignee') else 'Unassigned'
-        ) in filter_assignee)
-    ]
-
     if not filtered_tasks:
         st.warning("No tasks match the filters")
         return
@@ -285,20 +430,28 @@ def main():
 
     st.markdown("---")
 
+    # Multi-select mode: tick cards, then move them all with one update
+    bulk_mode = False
+    if any(has_permission('update', t.get('assignee_id')) for t in filtered_tasks):
+        bulk_mode = st.toggle("☑️ Select multiple tasks", key='kanban_bulk_mode')
+        if bulk_mode:
+            show_bulk_move_bar(filtered_tasks)
+        st.markdown("---")
+
     # Kanban Board - 4 columns
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        show_kanban_column("Todo", "todo", filtered_tasks, "📋", "#FFEBEE")
+        show_kanban_column("Todo", "todo", filtered_tasks, "📋", "#FFEBEE", bulk_mode)
 
     with col2:
-        show_kanban_column("In Progress", "in-progress", filtered_tasks, "🔄", "#E3F2FD")
+        show_kanban_column("In Progress", "in-progress", filtered_tasks, "🔄", "#E3F2FD", bulk_mode)
 
     with col3:
-        show_kanban_column("In Review", "review", filtered_tasks, "👁️", "#FFF9C4")
+        show_kanban_column("In Review", "review", filtered_tasks, "👁️", "#FFF9C4", bulk_mode)
 
     with col4:
-        show_kanban_column("Done", "done", filtered_tasks, "✅", "#E8F5E9")
+        show_kanban_column("Done", "done", filtered_tasks, "✅", "#E8F5E9", bulk_mode)
 
     # Instructions
     st.markdown("---")
@@ -310,10 +463,11 @@ def main():
         - Use the ⬅️ and ➡️ buttons to move tasks between columns
         - ⬅️ : Move task to previous column
         - ➡️ : Move task to next column
+        - ☑️ : Turn on "Select multiple tasks", tick cards and move them all at once
 
         **Available actions:**
         - 👁️ : View full task details
-        - Status changes are automatically saved
+        - Cards move immediately, status changes are saved in the background
 
         **Columns:**
         1. **📋 Todo** : Tasks not yet started
@@ -327,6 +481,13 @@ def main():
         - **Viewers** can only view the board
         """)
 
+    # Check the moves being saved again shortly, even without interaction
+    if st.session_state['kanban_board']['pending']:
+        time.sleep(PENDING_POLL_SECONDS)
+        st.rerun()
+
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -16,6 +16,8 @@ from utils.crud import (
     get_tasks_by_status,
     update_task
 )
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -321,4 +323,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
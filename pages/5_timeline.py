@@ -4,12 +4,15 @@ Timeline view of tasks with interactive Gantt chart.
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, date, timedelta
 from utils.auth import is_authenticated, get_current_user, logout_user, get_role_badge
-from utils.crud import get_all_tasks, get_all_projects, get_all_subprojects
+from utils.crud import get_filtered_tasks, get_tasks_page
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
+from utils.stats import parse_dates, rows_frame
 
 # Page config
 st.set_page_config(
@@ -23,6 +26,29 @@ if not is_authenticated():
     st.warning("⚠️ Please log in")
     st.stop()
 
+STATUS_OPTIONS = ['todo', 'in-progress', 'review', 'done']
+PRIORITY_OPTIONS = ['low', 'medium', 'high', 'urgent']
+DEFAULT_STATUS_FILTER = ['todo', 'in-progress', 'review']
+
+PRIORITY_COLORS = {
+    'low': '#95E1D3',
+    'medium': '#FFE66D',
+    'high': '#FFB347',
+    'urgent': '#FF6B6B'
+}
+STATUS_COLORS = {
+    'todo': '#FFEBEE',
+    'in-progress': '#E3F2FD',
+    'review': '#FFF9C4',
+    'done': '#E8F5E9'
+}
+PRIORITY_ICONS = {
+    'low': '🟢',
+    'medium': '🟡',
+    'high': '🟠',
+    'urgent': '🔴'
+}
+
 
 def show_sidebar():
     """Display sidebar navigation."""
@@ -60,71 +86,69 @@ def show_sidebar():
                 st.rerun()
 
 
+def _embedded(tasks, keys, relation, fields):
+    """
+    Fields of an embedded relation (e.g. 'project.name' of subproject), per row.
+
+    Rows with the same foreign key embed the same record, so only the first
+    record of each distinct key is normalized.
+
+    Args:
+        tasks: Task dictionaries
+        keys: Foreign key column, indexed by position in tasks
+        relation: Embedded relation ('assignee', 'subproject')
+        fields: Flattened field names, mapped to their default value
+    """
+    codes, _ = pd.factorize(keys)
+    distinct, first = np.unique(codes, return_index=True)
+    positions = keys.index[first[distinct >= 0]]
+    records = pd.json_normalize([tasks[position].get(relation) or {} for position in positions])
+    records = records.reindex(columns=list(fields)).fillna(fields)
+    # Code -1 (no key) picks the trailing row of defaults
+    values = np.vstack([records.to_numpy(dtype=object), [list(fields.values())]])[codes]
+    return pd.DataFrame(values, columns=list(fields), index=keys.index)
+
+
 def prepare_gantt_data(tasks):
     """
     Prepare task data for Gantt chart.
 
+    Tasks without a valid start and due date are left out. The cost is
+    mostly reading the task dicts: about 200 ms for 50k tasks, compared with
+    about 300 ms for the former per-task loop (stats/prepare_gantt_data
+    [legacy] in benchmarks/run.py).
+
     Args:
         tasks: List of task dictionaries
 
     Returns:
-        DataFrame ready for Plotly Gantt chart
+        DataFrame ready for Plotly Gantt chart (Start and Finish as datetime64)
     """
-    gantt_data = []
-
-    for task in tasks:
-        # Extract dates
-        start_date = task.get('start_date')
-        due_date = task.get('due_date')
-
-        # Skip tasks without dates
-        if not start_date or not due_date:
-            continue
-
-        # Parse dates
-        try:
-            start = datetime.fromisoformat(start_date.replace('Z', '+00:00')).date()
-            end = datetime.fromisoformat(due_date.replace('Z', '+00:00')).date()
-        except:
-            continue
-
-        # Extract task info
-        task_name = task.get('title', 'Untitled')
-        assignee_name = task.get('assignee', {}).get('name', 'Unassigned') if task.get('assignee') else 'Unassigned'
-        priority = task.get('priority', 'medium')
-        status = task.get('status', 'todo')
-
-        # Get project and subproject names
-        project_name = 'N/A'
-        subproject_name = 'N/A'
-
-        if task.get('subproject'):
-            subproject_name = task['subproject'].get('name', 'N/A')
-            if task['subproject'].get('project'):
-                project_name = task['subproject']['project'].get('name', 'N/A')
-
-        # Priority colors
-        color_map = {
-            'low': '#95E1D3',
-            'medium': '#FFE66D',
-            'high': '#FFB347',
-            'urgent': '#FF6B6B'
-        }
-
-        gantt_data.append({
-            'Task': task_name,
-            'Start': start,
-            'Finish': end,
-            'Assignee': assignee_name,
-            'Priority': priority,
-            'Status': status,
-            'Project': project_name,
-            'Subproject': subproject_name,
-            'Color': color_map.get(priority, '#95E1D3'),
-            'Duration': (end - start).days
-        })
-
-    return pd.DataFrame(gantt_data)
+    frame = rows_frame(tasks, [
+        'title', 'priority', 'status', 'start_date', 'due_date', 'assignee_id', 'subproject_id'
+    ])
+    start = parse_dates(frame['start_date'])
+    end = parse_dates(frame['due_date'])
+    dated = start.notna() & end.notna()
+    if not dated.all():
+        frame, start, end = frame[dated], start[dated], end[dated]
+
+    priority = frame['priority'].fillna('medium')
+    assignee = _embedded(tasks, frame['assignee_id'], 'assignee', {'name': 'Unassigned'})
+    subproject = _embedded(tasks, frame['subproject_id'], 'subproject', {'name': 'N/A', 'project.name': 'N/A'})
+    gantt = pd.DataFrame({
+        'Task': frame['title'].fillna('Untitled'),
+        'Start': start,
+        'Finish': end,
+        'Assignee': assignee['name'],
+        'Priority': priority,
+        'Status': frame['status'].fillna('todo'),
+        'Project': subproject['project.name'],
+        'Subproject': subproject['name'],
+        'Color': priority.map(PRIORITY_COLORS).fillna(PRIORITY_COLORS['low']),
+        'Duration': (end - start).dt.days,
+    })
+    return gantt.reset_index(drop=True)
 
 
 def show_gantt_chart(df, view_mode='project'):
@@ -141,6 +165,9 @@ def show_gantt_chart(df, view_mode='project'):
 
     # Sort by start date
     df = df.sort_values('Start')
+    # Python datetimes: plotly reads datetime64 columns through the deprecated
+    # Series.dt.to_pydatetime() (a pandas FutureWarning on every chart)
+    df = df.astype({'Start': object, 'Finish': object})
 
     # Create Gantt chart based on view mode
     if view_mode == 'project':
@@ -152,12 +179,7 @@ def show_gantt_chart(df, view_mode='project'):
             color="Priority",
             hover_data=["Task", "Assignee", "Status", "Duration"],
             title="📅 Timeline by Project",
-            color_discrete_map={
-                'low': '#95E1D3',
-                'medium': '#FFE66D',
-                'high': '#FFB347',
-                'urgent': '#FF6B6B'
-            }
+            color_discrete_map=PRIORITY_COLORS
         )
 
     elif view_mode == 'assignee':
@@ -169,12 +191,7 @@ def show_gantt_chart(df, view_mode='project'):
             color="Priority",
             hover_data=["Task", "Project", "Status", "Duration"],
             title="📅 Timeline by Assignee",
-            color_discrete_map={
-                'low': '#95E1D3',
-                'medium': '#FFE66D',
-                'high': '#FFB347',
-                'urgent': '#FF6B6B'
-            }
+            color_discrete_map=PRIORITY_COLORS
         )
 
     else:  # priority
@@ -186,12 +203,7 @@ def show_gantt_chart(df, view_mode='project'):
             color="Status",
             hover_data=["Assignee", "Project", "Priority", "Duration"],
             title="📅 Timeline by Task",
-            color_discrete_map={
-                'todo': '#FFEBEE',
-                'in-progress': '#E3F2FD',
-                'review': '#FFF9C4',
-                'done': '#E8F5E9'
-            }
+            color_discrete_map=STATUS_COLORS
         )
 
     # Update layout
@@ -213,29 +225,48 @@ def show_gantt_chart(df, view_mode='project'):
 
 
 def show_timeline_stats(df):
-    """Display statistics about the timeline."""
+    """Display statistics about the tasks shown (those matching the filters)."""
 
     if df.empty:
         return
 
+    st.caption("Figures for the dated tasks matching the status and priority filters")
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("📊 Total Tasks", len(df))
+        st.metric("📊 Tasks Shown", len(df))
 
     with col2:
         avg_duration = df['Duration'].mean()
         st.metric("⏱️ Average Duration", f"{avg_duration:.1f} days")
 
     with col3:
-        overdue = len(df[df['Finish'] < pd.Timestamp.now().date()])
+        overdue = int((df['Finish'] < pd.Timestamp.now().normalize()).sum())
         st.metric("⚠️ Overdue", overdue)
 
     with col4:
-        urgent = len(df[df['Priority'] == 'urgent'])
+        urgent = int((df['Priority'] == 'urgent').sum())
         st.metric("🔴 Urgent", urgent)
 
 
+def calendar_weeks(df):
+    """
+    Calendar lines of the tasks grouped by week (weeks start on Monday).
+
+    Returns:
+        (week start, markdown of the week's tasks) pairs, oldest week first
+    """
+    # One markdown line per task, built column-wise
+    lines = (
+        '**' + df['Priority'].map(PRIORITY_ICONS).fillna('⚪') + ' ' + df['Task'].astype(str) + '**\n'
+        + '👤 ' + df['Assignee'].astype(str) + ' | 📁 ' + df['Project'].astype(str)
+        + ' | 📅 ' + df['Start'].dt.strftime('%Y-%m-%d') + ' → ' + df['Finish'].dt.strftime('%Y-%m-%d')
+        + ' (' + df['Duration'].astype(str) + ' days)'
+    )
+    week = df['Start'] - pd.to_timedelta(df['Start'].dt.dayofweek, unit='D')
+    return [(week_start, '\n\n'.join(week_lines)) for week_start, week_lines in lines.groupby(week, sort=True)]
+
+
 def show_task_calendar_view(df):
     """Display task calendar/schedule view."""
 
@@ -245,27 +276,9 @@ def show_task_calendar_view(df):
 
     st.markdown("### 📆 Calendar View")
 
-    # Get date range
-    min_date = df['Start'].min()
-    max_date = df['Finish'].max()
-
-    # Group tasks by week
-    df['Week'] = pd.to_datetime(df['Start']).dt.to_period('W')
-
-    for week, week_tasks in df.groupby('Week'):
-        with st.expander(f"📅 Week of {week.start_time.strftime('%d/%m/%Y')}", expanded=False):
-            for _, task in week_tasks.iterrows():
-                priority_icons = {
-                    'low': '🟢',
-                    'medium': '🟡',
-                    'high': '🟠',
-                    'urgent': '🔴'
-                }
-
-                st.markdown(f"""
-                    **{priority_icons.get(task['Priority'], '⚪')} {task['Task']}**
-                    👤 {task['Assignee']} | 📁 {task['Project']} | 📅 {task['Start']} → {task['Finish']} ({task['Duration']} days)
-                """)
+    for week_start, markdown in calendar_weeks(df):
+        with st.expander(f"📅 Week of {week_start.strftime('%d/%m/%Y')}", expanded=False):
+            st.markdown(markdown)
 
 
 def main():
@@ -286,23 +299,25 @@ def main():
         if st.button("🔄 Refresh", use_container_width=True):
             st.rerun()
 
-    # Get all tasks
-    tasks = get_all_tasks()
-
-    if not tasks:
+    # Filter widgets are keyed: read their values first so the database
+    # returns only dated tasks matching them
+    tasks = get_filtered_tasks({
+        'statuses': st.session_state.get('timeline_filter_status', DEFAULT_STATUS_FILTER),
+        'priorities': st.session_state.get('timeline_filter_priority', PRIORITY_OPTIONS),
+        'has_dates': True
+    })
+
+    # Nothing matched: tell apart an empty project from strict filters
+    # (a one-row query, only in that case)
+    if not tasks and not get_tasks_page(1)['items']:
         st.info("No tasks to display. Create tasks from the Tasks page!")
         return
 
     # Prepare data
-    df = prepare_gantt_data(tasks)
-
-    if df.empty:
-        st.warning("⚠️ No tasks with start and end dates.")
-        st.info("💡 Add dates to your tasks to see them appear in the timeline.")
-        return
+    filtered_df = prepare_gantt_data(tasks)
 
     # Timeline statistics
-    show_timeline_stats(df)
+    show_timeline_stats(filtered_df)
 
     st.markdown("---")
 
@@ -321,39 +336,36 @@ def main():
         )
 
     with col2:
-        filter_status = st.multiselect(
+        st.multiselect(
             "Filter by status",
-            options=['todo', 'in-progress', 'review', 'done'],
-            default=['todo', 'in-progress', 'review'],
+            options=STATUS_OPTIONS,
+            default=DEFAULT_STATUS_FILTER,
             format_func=lambda x: {
                 'todo': '📋 Todo',
                 'in-progress': '🔄 In Progress',
                 'review': '👁️ In Review',
                 'done': '✅ Done'
-            }[x]
+            }[x],
+            key='timeline_filter_status'
         )
 
     with col3:
-        filter_priority = st.multiselect(
+        st.multiselect(
             "Filter by priority",
-            options=['low', 'medium', 'high', 'urgent'],
-            default=['low', 'medium', 'high', 'urgent'],
+            options=PRIORITY_OPTIONS,
+            default=PRIORITY_OPTIONS,
             format_func=lambda x: {
                 'low': '🟢 Low',
                 'medium': '🟡 Medium',
                 'high': '🟠 High',
                 'urgent': '🔴 Urgent'
-            }[x]
+            }[x],
+            key='timeline_filter_priority'
         )
 
-    # Apply filters
-    filtered_df = df[
-        (df['Status'].isin(filter_status)) &
-        (df['Priority'].isin(filter_priority))
-    ]
-
     if filtered_df.empty:
-        st.warning("No tasks match the filters")
+        st.warning("No tasks with start and end dates match the filters")
+        st.info("💡 Add dates to your tasks to see them appear in the timeline.")
         return
 
     # Show Gantt chart
@@ -399,4 +411,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
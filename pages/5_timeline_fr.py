@@ -10,6 +10,8 @@ import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 from utils.auth import is_authenticated, get_current_user, logout_user, get_role_badge
 from utils.crud import get_all_tasks, get_all_projects, get_all_subprojects
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page config
 st.set_page_config(
@@ -399,4 +401,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
@@ -8,12 +8,12 @@ from datetime import datetime, date
 from utils.auth import is_authenticated, get_current_user, has_permission
 from utils.crud import get_all_subprojects, get_all_users
 from utils.experiments_crud import (
-    get_all_experiments,
+    get_experiments_page,
     get_experiment_by_id,
     create_experiment,
     update_experiment,
     delete_experiment,
-    get_experiment_comments,
+    get_experiment_comments_page,
     add_experiment_comment
 )
 from utils.permissions import (
@@ -22,6 +22,18 @@ from utils.permissions import (
     can_delete_experiment,
     can_comment_experiment
 )
+from utils.batch import fetch_parallel
+from utils.pagination import (
+    PAGE_SIZE_OPTIONS,
+    DEFAULT_PAGE_SIZE,
+    get_page_cursor,
+    show_page_controls,
+    get_loaded_items,
+    show_load_more,
+    reset_loaded_items
+)
+from utils.instrumentation import page_metrics
+from utils.profiling import profile_page
 
 # Page configuration
 st.set_page_config(
@@ -392,6 +404,8 @@ def show_experiment_card(experiment):
                 st.markdown(f"**Planned:** {experiment['planned_date']}")
             if experiment.get('deadline'):
                 st.markdown(f"**Deadline:** {experiment['deadline']}")
+            if experiment.get('comment_count'):
+                st.markdown(f"💬 {experiment['comment_count']}")
 
         with col3:
             # Action buttons based on permissions
@@ -412,10 +426,21 @@ def show_experiment_card(experiment):
 
             if st.button("👁️ Details", key=f"view_btn_{experiment['id']}", use_container_width=True):
                 st.session_state['viewing_experiment'] = experiment['id']
+                reset_loaded_items(comments_state_key(experiment['id']))
                 st.rerun()
 
 
-def show_experiment_detail(experiment):
+def comments_state_key(experiment_id):
+    """Session state key of an experiment's loaded comments."""
+    return f"exp_comments_{experiment_id}"
+
+
+def load_comments_page(experiment_id):
+    """Page loader of an experiment's comment thread (see utils.pagination.get_loaded_items)."""
+    return lambda cursor: get_experiment_comments_page(experiment_id, cursor=cursor)
+
+
+def show_experiment_detail(experiment, comments):
     """Display detailed view of an experiment."""
     st.markdown("---")
     st.markdown(f"## 🧪 {experiment['title']}")
@@ -506,8 +531,6 @@ def show_experiment_detail(experiment):
 
     with tab4:
         # Comments section
-        comments = get_experiment_comments(experiment['id'])
-
         if comments:
             for comment in comments:
                 with st.container():
@@ -517,6 +540,8 @@ def show_experiment_detail(experiment):
                         <br>{comment['content']}
                     </div>
                     """, unsafe_allow_html=True)
+            show_load_more(comments_state_key(experiment['id']), load_comments_page(experiment['id']),
+                           "Load older comments")
         else:
             st.info("No comments yet")
 
@@ -528,11 +553,26 @@ def show_experiment_detail(experiment):
                 if st.form_submit_button("💬 Add Comment"):
                     if comment_content:
                         if add_experiment_comment(experiment['id'], comment_content, current_user):
+                            reset_loaded_items(comments_state_key(experiment['id']))
                             st.rerun()
                     else:
                         st.error("Please enter a comment")
 
 
+def build_filters(status, priority, subproject_id, search):
+    """Build get_experiments_page filters from the filter widget values."""
+    filters = {}
+    if status != "All":
+        filters['status'] = status
+    if priority != "All":
+        filters['priority'] = priority
+    if subproject_id != "All":
+        filters['subproject_id'] = subproject_id
+    if search:
+        filters['search'] = search
+    return filters
+
+
 def main():
     """Main function for the experiments page."""
     show_sidebar()
@@ -542,9 +582,19 @@ def main():
 
     # Check if viewing a specific experiment
     if st.session_state.get('viewing_experiment'):
-        experiment = get_experiment_by_id(st.session_state['viewing_experiment'])
+        experiment_id = st.session_state['viewing_experiment']
+        state_key = comments_state_key(experiment_id)
+        queries = {'experiment': lambda: get_experiment_by_id(experiment_id)}
+        # The first page of comments is read with the experiment, older pages on demand
+        if state_key not in st.session_state:
+            queries['comments'] = lambda: get_experiment_comments_page(experiment_id)
+        data = fetch_parallel(queries)
+        if data.get('comments') is not None:
+            st.session_state[state_key] = data['comments']
+        experiment = data['experiment']
         if experiment:
-            show_experiment_detail(experiment)
+            comments = get_loaded_items(state_key, load_comments_page(experiment_id))
+            show_experiment_detail(experiment, comments)
         else:
             st.error("Experiment not found")
             st.session_state.pop('viewing_experiment', None)
@@ -557,6 +607,25 @@ def main():
         tab1 = st.tabs(["📋 Experiments List"])[0]
         tab2 = None
 
+    # Filters are keyed widgets: their current values are already in
+    # session_state, so the list can be fetched together with the subprojects
+    filters = build_filters(
+        st.session_state.get('exp_filter_status', "All"),
+        st.session_state.get('exp_filter_priority', "All"),
+        st.session_state.get('exp_filter_subproject', "All"),
+        st.session_state.get('exp_search', "")
+    )
+    page_size = st.session_state.get('exp_page_size', DEFAULT_PAGE_SIZE)
+    cursor = get_page_cursor('exp_pagination', (tuple(sorted(filters.items())), page_size))
+    data = fetch_parallel({
+        'subprojects': get_all_subprojects,
+        'users': get_all_users,
+        'experiments': lambda: get_experiments_page(filters, page_size, cursor)
+    })
+    subprojects = data['subprojects'] or []
+    page = data['experiments'] or {'items': [], 'next_cursor': None}
+    experiments = page['items']
+
     # TAB 1: Experiments List
     with tab1:
         # Filters
@@ -567,63 +636,65 @@ def main():
             filter_status = st.selectbox(
                 "Status",
                 options=["All"] + STATUS_OPTIONS,
-                format_func=lambda x: "All Statuses" if x == "All" else STATUS_LABELS.get(x, x)
+                format_func=lambda x: "All Statuses" if x == "All" else STATUS_LABELS.get(x, x),
+                key='exp_filter_status'
             )
 
         with col2:
             filter_priority = st.selectbox(
                 "Priority",
                 options=["All"] + PRIORITY_OPTIONS,
-                format_func=lambda x: "All Priorities" if x == "All" else PRIORITY_LABELS.get(x, x)
+                format_func=lambda x: "All Priorities" if x == "All" else PRIORITY_LABELS.get(x, x),
+                key='exp_filter_priority'
             )
 
         with col3:
-            subprojects = get_all_subprojects()
             subproject_options = {"All": "All Subprojects"}
             subproject_options.update({sp['id']: sp['name'] for sp in subprojects})
             filter_subproject = st.selectbox(
                 "Subproject",
                 options=list(subproject_options.keys()),
-                format_func=lambda x: subproject_options[x]
+                format_func=lambda x: subproject_options[x],
+                key='exp_filter_subproject'
             )
 
         with col4:
-            search_query = st.text_input("🔍 Search", placeholder="Search experiments...")
+            st.text_input("🔍 Search", placeholder="Search experiments...", key='exp_search')
 
-        # Refresh button
+        # Refresh button and page size
         col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
         with col1:
             if st.button("🔄 Refresh", use_container_width=True):
                 st.rerun()
-
-        # Build filters
-        filters = {}
-        if filter_status != "All":
-            filters['status'] = filter_status
-        if filter_priority != "All":
-            filters['priority'] = filter_priority
-        if filter_subproject != "All":
-            filters['subproject_id'] = filter_subproject
-        if search_query:
-            filters['search'] = search_query
-
-        # Load experiments
-        experiments = get_all_experiments(filters)
+        with col4:
+            st.selectbox(
+                "Experiments per page",
+                options=PAGE_SIZE_OPTIONS,
+                index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE),
+                key='exp_page_size'
+            )
 
         st.markdown("---")
 
         if not experiments:
             st.info("📭 No experiments found. Create one in the 'New Experiment' tab!")
         else:
-            st.markdown(f"### 📊 {len(experiments)} Experiment(s)")
+            st.markdown(f"### 📊 {len(experiments)} Experiment(s) on this page")
 
             for exp in experiments:
                 # Check if editing this experiment
+                # List rows only hold summary columns: the form needs the full row
+                full_exp = None
                 if st.session_state.get('editing_experiment') == exp['id']:
-                    show_edit_form(exp)
+                    full_exp = get_experiment_by_id(exp['id'])
+
+                if full_exp:
+                    show_edit_form(full_exp)
                 else:
                     show_experiment_card(exp)
 
+            show_page_controls('exp_pagination', page['next_cursor'])
+
     # TAB 2: Create Experiment
     if tab2 is not None:
         with tab2:
@@ -631,4 +702,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with page_metrics(__file__):
+        profile_page(globals())
+        main()
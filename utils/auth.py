@@ -5,9 +5,12 @@ Manages user authentication, registration and logout.
 
 from typing import Optional, Dict, Any
 import streamlit as st
-from .supabase_client import get_supabase_client
+from .cache import query_cache
+from .instrumentation import instrumented
+from .repository import USERS, get_repository
 
 
+@instrumented
 def login_user(email: str) -> Optional[Dict[str, Any]]:
     """
     Authenticate user by email (simplified auth for MVP).
@@ -24,13 +27,11 @@ def login_user(email: str) -> Optional[Dict[str, Any]]:
         >>>     st.session_state.user = user
     """
     try:
-        client = get_supabase_client()
-
         # Check if user exists
-        response = client.table('users').select('*').eq('email', email).execute()
+        users = get_repository().list(USERS, [('email', 'eq', email)], order=())
 
-        if response.data and len(response.data) > 0:
-            user_data = response.data[0]
+        if users:
+            user_data = users[0]
             return user_data
         else:
             return None
@@ -40,6 +41,7 @@ def login_user(email: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+@instrumented
 def register_user(email: str, name: str, role: str = 'contributor') -> Optional[Dict[str, Any]]:
     """
     Register a new user.
@@ -56,12 +58,12 @@ def register_user(email: str, name: str, role: str = 'contributor') -> Optional[
         >>> user = register_user("bob@biotech.fr", "Bob Martin", "contributor")
     """
     try:
-        client = get_supabase_client()
+        repository = get_repository()
 
         # Check if user already exists
-        existing = client.table('users').select('*').eq('email', email).execute()
+        existing = repository.list(USERS, [('email', 'eq', email)], 'id', order=())
 
-        if existing.data and len(existing.data) > 0:
+        if existing:
             st.warning(f"⚠️ User {email} already exists")
             return None
 
@@ -72,12 +74,9 @@ def register_user(email: str, name: str, role: str = 'contributor') -> Optional[
             'role': role
         }
 
-        response = client.table('users').insert(new_user).execute()
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-        else:
-            return None
+        created = repository.create(USERS, new_user)
+        query_cache.invalidate('users')
+        return created
 
     except Exception as e:
         st.error(f"❌ Registration error: {str(e)}")
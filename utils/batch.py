@@ -0,0 +1,106 @@
+"""
+Batch Fetch Module
+Exécute en parallèle des lectures Supabase indépendantes et mesure chacune d'elles.
+"""
+
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from .profiling import profile_section
+
+logger = logging.getLogger(__name__)
+
+# Shared by all sessions: queries are I/O bound, threads mostly wait on the network
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FETCH_MAX_WORKERS", "8")),
+    thread_name_prefix="nikaia-fetch"
+)
+
+
+class BatchResult(dict):
+    """
+    Results of fetch_parallel, keyed by query name.
+
+    Attributes:
+        timings: Wall time of each query in milliseconds
+        errors: Exception raised by each failed query (its result is None)
+        total_ms: Wall time of the whole batch in milliseconds
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.total_ms: float = 0.0
+
+
+def fetch_parallel(queries: Dict[str, Callable[[], Any]]) -> BatchResult:
+    """
+    Run independent queries concurrently and wait for all of them.
+
+    Each query runs with the caller's Streamlit script context, so CRUD
+    functions can still report errors with st.error(), and a copy of its
+    context variables (calls are attributed to the caller's page).
+
+    Args:
+        queries: Mapping of name -> zero-argument callable
+            (use a lambda or functools.partial to pass arguments)
+
+    Returns:
+        BatchResult mapping each name to its return value
+
+    Example:
+        >>> data = fetch_parallel({'users': get_all_users, 'tasks': get_all_tasks})
+        >>> data['tasks'], data.timings['tasks']
+    """
+    result = BatchResult()
+    ctx = get_script_run_ctx()
+    started = time.perf_counter()
+
+    def run(name: str, query: Callable[[], Any]):
+        add_script_run_ctx(ctx=ctx)
+        query_started = time.perf_counter()
+        try:
+            return query()
+        finally:
+            result.timings[name] = (time.perf_counter() - query_started) * 1000
+
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, run, name, query)
+        for name, query in queries.items()
+    }
+
+    with profile_section('fetch', 'fetch_parallel'):
+        for name, future in futures.items():
+            try:
+                result[name] = future.result()
+            except Exception as e:
+                logger.error(f"Batch query '{name}' failed: {str(e)}")
+                result.errors[name] = e
+                result[name] = None
+
+    result.total_ms = (time.perf_counter() - started) * 1000
+    logger.debug(
+        "Batch fetched in %.1f ms (%s)",
+        result.total_ms,
+        ", ".join(f"{name}={ms:.1f}ms" for name, ms in result.timings.items())
+    )
+    return result
+
+
+def run_in_background(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Start fn(*args, **kwargs) on the shared pool without waiting for it.
+
+    The call runs outside the Streamlit script, so it must not use st.*
+    (e.g. crud.save_task). Check the returned future on a
+    later rerun.
+
+    Returns:
+        Future holding fn's return value
+    """
+    return _executor.submit(fn, *args, **kwargs)
@@ -0,0 +1,320 @@
+"""
+Query Cache Module
+Cache mémoire partagé par toutes les sessions Streamlit du process, avec TTL par
+table et invalidation explicite après chaque écriture.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from .resilience import is_backend_unavailable, metrics
+
+logger = logging.getLogger(__name__)
+
+# Default time-to-live (seconds) per table, overridable with CACHE_TTL_<TABLE>
+DEFAULT_TTLS: Dict[str, float] = {
+    'users': 300.0,
+    'projects': 60.0,
+    'subprojects': 60.0,
+    'tasks': 30.0,
+    'experiments': 30.0,
+}
+DEFAULT_TTL = 30.0
+
+# Last successful load of this many queries is kept to be served while
+# Supabase is unavailable, even after expiry or invalidation
+STALE_MAX_ENTRIES = 256
+
+# Cached rows embed data from their parent tables (lead, assignee, project name...),
+# so a write on a parent table must also drop the cached children.
+TABLE_DEPENDENTS: Dict[str, Tuple[str, ...]] = {
+    'users': ('projects', 'subprojects', 'tasks', 'experiments'),
+    'projects': ('subprojects', 'tasks', 'experiments'),
+    'subprojects': ('tasks', 'experiments'),
+    # Task and experiment lists embed their comment_count
+    'comments': ('tasks', 'experiments'),
+}
+
+
+def _env_ttl(table: str) -> float:
+    """Read the TTL of a table from the environment, falling back to defaults."""
+    value = os.getenv(f"CACHE_TTL_{table.upper()}")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return DEFAULT_TTLS.get(table, DEFAULT_TTL)
+
+
+class FrozenRow(dict):
+    """
+    Read-only row handed out by the cache.
+
+    Cached rows are shared by every session: writing into one would change it
+    for all users. Any in-place edit raises TypeError; edit a copy instead
+    (dict(row) or {**row, ...}).
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Cached rows are shared between sessions and read-only, edit a copy (dict(row))")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    update = pop = popitem = setdefault = clear = _read_only
+
+    def __reduce__(self):
+        # Rebuilt from a plain dict: unpickling/deepcopy would go through __setitem__
+        return (FrozenRow, (dict(self),))
+
+
+def _freeze(value: Any) -> Any:
+    """Return value with its rows, and the records embedded in them, made read-only."""
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+    if isinstance(value, dict) and not isinstance(value, FrozenRow):
+        frozen = FrozenRow(value)
+        for k, v in value.items():
+            if isinstance(v, (dict, list)):
+                dict.__setitem__(frozen, k, _freeze(v))
+        return frozen
+    return value
+
+
+def _copy(value: Any) -> Any:
+    """
+    Return a shallow copy so callers can't reorder or extend the cached list,
+    or the lists of a cached dict (e.g. a page's items); rows are read-only.
+    """
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return {k: list(v) if isinstance(v, list) else v for k, v in value.items()}
+    return value
+
+
+class _Entry:
+    """A cached value with its expiry time."""
+
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """
+    Thread-safe TTL cache keyed by (table, key).
+
+    Attributes:
+        enabled: When False, every lookup goes straight to the loader
+        _entries: Cached values per (table, key)
+        _generations: Write counter per table, used to discard loads that
+            raced with an invalidation
+        _loading: Number of loads in progress per table
+        _last_known: Last loaded value per (table, key), served when the
+            backend is unavailable
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._entries: Dict[Tuple[str, Hashable], _Entry] = {}
+        self._generations: Dict[str, int] = {}
+        self._loading: Dict[str, int] = {}
+        self._last_known: 'OrderedDict[Tuple[str, Hashable], Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, table: str, key: Hashable, loader: Callable[[], Any],
+                    ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for (table, key), calling loader on a miss.
+
+        Exceptions raised by the loader are propagated and nothing is cached,
+        except when the backend is unavailable (see utils/resilience.py): the
+        last value loaded for (table, key), even expired, is returned instead.
+
+        Args:
+            table: Table the cached rows come from (drives TTL and invalidation)
+            key: Query identifier within the table
+            loader: Callable performing the actual query
+            ttl: Optional TTL override in seconds
+
+        Returns:
+            The cached or freshly loaded value: a new list (or dict) of
+            read-only rows (FrozenRow), shared with the other sessions
+        """
+        if not self.enabled:
+            return loader()
+
+        cache_key = (table, key)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry.expires_at > now:
+                return _copy(entry.value)
+            generation = self._generations.get(table, 0)
+            self._loading[table] = self._loading.get(table, 0) + 1
+
+        try:
+            value = loader()
+        except Exception as e:
+            if not is_backend_unavailable(e):
+                raise
+            with self._lock:
+                if cache_key not in self._last_known:
+                    raise
+                stale = self._last_known[cache_key]
+            metrics.increment('stale_served')
+            logger.warning(f"Serving last-known {table} data, Supabase unavailable: {str(e)}")
+            return _copy(stale)
+        finally:
+            with self._lock:
+                self._loading[table] -= 1
+
+        value = _freeze(value)
+        with self._lock:
+            self._last_known[cache_key] = value
+            self._last_known.move_to_end(cache_key)
+            while len(self._last_known) > STALE_MAX_ENTRIES:
+                self._last_known.popitem(last=False)
+
+            # A write invalidated the table while we were loading: serve the
+            # result to this caller but don't keep it.
+            if self._generations.get(table, 0) == generation:
+                expires_at = time.monotonic() + (ttl if ttl is not None else _env_ttl(table))
+                self._entries[cache_key] = _Entry(value, expires_at)
+
+        return _copy(value)
+
+    def invalidate(self, *tables: str) -> Dict[str, int]:
+        """
+        Drop cached entries of the given tables and of the tables embedding them.
+
+        Args:
+            *tables: Names of the tables that were written to
+
+        Returns:
+            New generation of each affected table (see generation()); each
+            invalidation leaves a table at a generation of its own
+        """
+        affected = self._expand(tables)
+        with self._lock:
+            for table in affected:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] in affected]:
+                del self._entries[cache_key]
+            return {table: self._generations[table] for table in affected}
+
+    def apply_row_change(self, table: str, change_type: str, record: Dict[str, Any],
+                         old_record: Optional[Dict[str, Any]] = None,
+                         structural_columns: Iterable[str] = ()) -> None:
+        """
+        Bring cached rows up to date with a change made in the database.
+
+        Only unfiltered lists (key 'all' or a tuple starting with 'all') are
+        patched in place; any other entry of the table (filtered lists,
+        aggregates) may no longer be right and is dropped.
+            - UPDATE: columns already present in the cached row are overwritten,
+              unless a structural column (foreign key of an embedded relation,
+              sort column) changed, then the list is dropped
+            - INSERT: the list is dropped (the new row lacks embedded relations)
+            - DELETE: the row is removed
+        Tables embedding this one are invalidated on every change, INSERT
+        included: their cached aggregates (e.g. dashboard_stats, cached with
+        the tasks) may count the rows of this table.
+
+        Args:
+            table: Table the change happened on
+            change_type: 'INSERT', 'UPDATE' or 'DELETE'
+            record: New row (empty for DELETE)
+            old_record: Previous row, at least its id
+            structural_columns: Columns whose change can't be patched in place
+        """
+        row_id = (record or {}).get('id') or (old_record or {}).get('id')
+        structural = tuple(structural_columns)
+        changed = False
+
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == table]:
+                key = cache_key[1]
+                patchable = key == 'all' or (isinstance(key, tuple) and key[:1] == ('all',))
+                rows = self._entries[cache_key].value
+
+                if not patchable or change_type == 'INSERT' or not isinstance(rows, list):
+                    del self._entries[cache_key]
+                    changed = True
+                    continue
+
+                index = next((i for i, row in enumerate(rows) if row.get('id') == row_id), None)
+                if index is None:
+                    continue
+
+                if change_type == 'DELETE':
+                    rows = rows[:index] + rows[index + 1:]
+                else:
+                    cached = rows[index]
+                    if any(column in record and record[column] != cached.get(column)
+                           for column in structural):
+                        del self._entries[cache_key]
+                        changed = True
+                        continue
+                    patched = _freeze({**cached, **{k: v for k, v in record.items() if k in cached}})
+                    if patched == cached:
+                        continue
+                    rows = rows[:index] + [patched] + rows[index + 1:]
+
+                # New list object: copies already handed out stay untouched
+                self._entries[cache_key].value = rows
+                changed = True
+
+            # Loads in progress may have read the row before the change
+            affected = {table} if (changed or self._loading.get(table, 0)) else set()
+            dependents = self._expand(TABLE_DEPENDENTS.get(table, ()))
+            for cache_key in [k for k in self._entries if k[0] in dependents]:
+                del self._entries[cache_key]
+            affected |= dependents
+
+            for name in affected:
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    def generation(self, table: str) -> int:
+        """
+        Return the write counter of a table.
+
+        It changes every time the table (or a table it embeds) is invalidated,
+        so callers keeping their own copy of rows can tell when to reload.
+        """
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def clear(self) -> None:
+        """Drop every cached entry, including the last-known values."""
+        with self._lock:
+            for table in {k[0] for k in self._entries}:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries.clear()
+            self._last_known.clear()
+
+    @staticmethod
+    def _expand(tables: Iterable[str]) -> Set[str]:
+        """Return the tables plus all their (transitive) dependents."""
+        affected: Set[str] = set()
+        pending = list(tables)
+        while pending:
+            table = pending.pop()
+            if table in affected:
+                continue
+            affected.add(table)
+            pending.extend(TABLE_DEPENDENTS.get(table, ()))
+        return affected
+
+
+# Process-wide instance shared by all sessions
+query_cache = QueryCache(enabled=os.getenv("CACHE_ENABLED", "true").lower() != "false")
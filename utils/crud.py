@@ -3,33 +3,46 @@ CRUD Operations Module
 Gère toutes les opérations Create, Read, Update, Delete pour les tables.
 """
 
+import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import streamlit as st
-from .supabase_client import get_supabase_client
+from .cache import query_cache
+from .instrumentation import instrumented
+from .resilience import is_backend_unavailable
+from .pagination import Cursor
+from .stats import dashboard_stats, projects_frame, tasks_frame
+from .repository import (
+    COMMENTS, PROJECTS, SUBPROJECTS, TASKS, USERS, Condition, get_repository
+)
+
+logger = logging.getLogger(__name__)
 
 
 # =====================================================
 # USERS CRUD
 # =====================================================
 
+def _fetch_all_users() -> List[Dict[str, Any]]:
+    """Query all users (uncached)."""
+    return get_repository().list(USERS)
+
+
+@instrumented
 def get_all_users() -> List[Dict[str, Any]]:
-    """Get all users from database."""
+    """Get all users from database (cached)."""
     try:
-        client = get_supabase_client()
-        response = client.table('users').select('*').order('name').execute()
-        return response.data if response.data else []
+        return query_cache.get_or_load('users', 'all', _fetch_all_users)
     except Exception as e:
         st.error(f"❌ Erreur lecture users: {str(e)}")
         return []
 
 
+@instrumented
 def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
     """Get user by ID."""
     try:
-        client = get_supabase_client()
-        response = client.table('users').select('*').eq('id', user_id).execute()
-        return response.data[0] if response.data else None
+        return get_repository().get(USERS, user_id)
     except Exception as e:
         st.error(f"❌ Erreur lecture user: {str(e)}")
         return None
@@ -39,52 +52,53 @@ def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
 # PROJECTS CRUD
 # =====================================================
 
+def _fetch_all_projects() -> List[Dict[str, Any]]:
+    """Query all projects with lead information (uncached)."""
+    return get_repository().list(PROJECTS)
+
+
+@instrumented
 def get_all_projects() -> List[Dict[str, Any]]:
-    """Get all projects with lead information."""
+    """Get all projects with lead information (cached)."""
     try:
-        client = get_supabase_client()
-        response = client.table('projects').select(
-            '*, lead:users!projects_lead_id_fkey(id, name, email)'
-        ).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return query_cache.get_or_load('projects', 'all', _fetch_all_projects)
     except Exception as e:
         st.error(f"❌ Erreur lecture projects: {str(e)}")
         return []
 
 
+@instrumented
 def get_project_by_id(project_id: str) -> Optional[Dict[str, Any]]:
     """Get project by ID with lead information."""
     try:
-        client = get_supabase_client()
-        response = client.table('projects').select(
-            '*, lead:users!projects_lead_id_fkey(id, name, email)'
-        ).eq('id', project_id).execute()
-        return response.data[0] if response.data else None
+        return get_repository().get(PROJECTS, project_id)
     except Exception as e:
         st.error(f"❌ Erreur lecture project: {str(e)}")
         return None
 
 
+@instrumented
 def create_project(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Create a new project."""
     try:
-        client = get_supabase_client()
-        response = client.table('projects').insert(data).execute()
-        if response.data:
+        created = get_repository().create(PROJECTS, data)
+        query_cache.invalidate('projects')
+        if created:
             st.success(f"✅ Projet '{data['name']}' créé avec succès!")
-            return response.data[0]
+            return created
         return None
     except Exception as e:
         st.error(f"❌ Erreur création project: {str(e)}")
         return None
 
 
+@instrumented
 def update_project(project_id: str, data: Dict[str, Any]) -> bool:
     """Update an existing project."""
     try:
-        client = get_supabase_client()
-        response = client.table('projects').update(data).eq('id', project_id).execute()
-        if response.data:
+        updated = get_repository().update(PROJECTS, [('id', 'eq', project_id)], data)
+        query_cache.invalidate('projects')
+        if updated:
             st.success("✅ Projet mis à jour avec succès!")
             return True
         return False
@@ -93,12 +107,13 @@ def update_project(project_id: str, data: Dict[str, Any]) -> bool:
         return False
 
 
+@instrumented
 def delete_project(project_id: str) -> bool:
     """Delete a project (cascades to subprojects and tasks)."""
     try:
-        client = get_supabase_client()
-        response = client.table('projects').delete().eq('id', project_id).execute()
-        if response.data:
+        deleted = get_repository().delete(PROJECTS, [('id', 'eq', project_id)])
+        query_cache.invalidate('projects')
+        if deleted:
             st.success("✅ Projet supprimé avec succès!")
             return True
         return False
@@ -111,52 +126,53 @@ def delete_project(project_id: str) -> bool:
 # SUBPROJECTS CRUD
 # =====================================================
 
+@instrumented
 def get_subprojects_by_project(project_id: str) -> List[Dict[str, Any]]:
     """Get all subprojects for a project."""
     try:
-        client = get_supabase_client()
-        response = client.table('subprojects').select(
-            '*, lead:users!subprojects_lead_id_fkey(id, name, email)'
-        ).eq('project_id', project_id).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return get_repository().list(SUBPROJECTS, [('project_id', 'eq', project_id)])
     except Exception as e:
         st.error(f"❌ Erreur lecture subprojects: {str(e)}")
         return []
 
 
+def _fetch_all_subprojects() -> List[Dict[str, Any]]:
+    """Query all subprojects with project and lead information (uncached)."""
+    return get_repository().list(SUBPROJECTS)
+
+
+@instrumented
 def get_all_subprojects() -> List[Dict[str, Any]]:
-    """Get all subprojects with project and lead information."""
+    """Get all subprojects with project and lead information (cached)."""
     try:
-        client = get_supabase_client()
-        response = client.table('subprojects').select(
-            '*, project:projects(id, name), lead:users!subprojects_lead_id_fkey(id, name, email)'
-        ).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return query_cache.get_or_load('subprojects', 'all', _fetch_all_subprojects)
     except Exception as e:
         st.error(f"❌ Erreur lecture subprojects: {str(e)}")
         return []
 
 
+@instrumented
 def create_subproject(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Create a new subproject."""
     try:
-        client = get_supabase_client()
-        response = client.table('subprojects').insert(data).execute()
-        if response.data:
+        created = get_repository().create(SUBPROJECTS, data)
+        query_cache.invalidate('subprojects')
+        if created:
             st.success(f"✅ Sous-projet '{data['name']}' créé avec succès!")
-            return response.data[0]
+            return created
         return None
     except Exception as e:
         st.error(f"❌ Erreur création subproject: {str(e)}")
         return None
 
 
+@instrumented
 def update_subproject(subproject_id: str, data: Dict[str, Any]) -> bool:
     """Update an existing subproject."""
     try:
-        client = get_supabase_client()
-        response = client.table('subprojects').update(data).eq('id', subproject_id).execute()
-        if response.data:
+        updated = get_repository().update(SUBPROJECTS, [('id', 'eq', subproject_id)], data)
+        query_cache.invalidate('subprojects')
+        if updated:
             st.success("✅ Sous-projet mis à jour avec succès!")
             return True
         return False
@@ -165,12 +181,13 @@ def update_subproject(subproject_id: str, data: Dict[str, Any]) -> bool:
         return False
 
 
+@instrumented
 def delete_subproject(subproject_id: str) -> bool:
     """Delete a subproject (cascades to tasks)."""
     try:
-        client = get_supabase_client()
-        response = client.table('subprojects').delete().eq('id', subproject_id).execute()
-        if response.data:
+        deleted = get_repository().delete(SUBPROJECTS, [('id', 'eq', subproject_id)])
+        query_cache.invalidate('subprojects')
+        if deleted:
             st.success("✅ Sous-projet supprimé avec succès!")
             return True
         return False
@@ -183,78 +200,195 @@ def delete_subproject(subproject_id: str) -> bool:
 # TASKS CRUD
 # =====================================================
 
+@instrumented
 def get_tasks_by_subproject(subproject_id: str) -> List[Dict[str, Any]]:
     """Get all tasks for a subproject."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').select(
-            '*, subproject:subprojects(id, name, project_id), assignee:users!tasks_assignee_id_fkey(id, name, email)'
-        ).eq('subproject_id', subproject_id).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return get_repository().list(TASKS, [('subproject_id', 'eq', subproject_id)], 'all')
     except Exception as e:
         st.error(f"❌ Erreur lecture tasks: {str(e)}")
         return []
 
 
-def get_all_tasks() -> List[Dict[str, Any]]:
-    """Get all tasks with subproject and assignee information."""
+def _fetch_all_tasks(projection: str = 'detail') -> List[Dict[str, Any]]:
+    """Query all tasks with subproject and assignee information (uncached)."""
+    return get_repository().list(TASKS, projection=projection)
+
+
+@instrumented
+def get_all_tasks(projection: str = 'detail') -> List[Dict[str, Any]]:
+    """Get all tasks with subproject and assignee information (cached per projection)."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').select(
-            '*, subproject:subprojects(id, name, project_id, project:projects(id, name)), assignee:users!tasks_assignee_id_fkey(id, name, email)'
-        ).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return query_cache.get_or_load(
+            'tasks', ('all', projection), lambda: _fetch_all_tasks(projection)
+        )
     except Exception as e:
         st.error(f"❌ Erreur lecture tasks: {str(e)}")
         return []
 
 
+@instrumented
 def get_tasks_by_status(status: str) -> List[Dict[str, Any]]:
     """Get all tasks with a specific status."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').select(
-            '*, subproject:subprojects(id, name, project_id, project:projects(id, name)), assignee:users!tasks_assignee_id_fkey(id, name, email)'
-        ).eq('status', status).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return get_repository().list(TASKS, [('status', 'eq', status)], 'all')
     except Exception as e:
         st.error(f"❌ Erreur lecture tasks: {str(e)}")
         return []
 
 
+@instrumented
 def get_tasks_by_assignee(assignee_id: str) -> List[Dict[str, Any]]:
     """Get all tasks assigned to a user."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').select(
-            '*, subproject:subprojects(id, name, project_id, project:projects(id, name)), assignee:users!tasks_assignee_id_fkey(id, name, email)'
-        ).eq('assignee_id', assignee_id).order('due_date').execute()
-        return response.data if response.data else []
+        return get_repository().list(
+            TASKS, [('assignee_id', 'eq', assignee_id)], 'all', order=[('due_date', False)]
+        )
+    except Exception as e:
+        st.error(f"❌ Erreur lecture tasks: {str(e)}")
+        return []
+
+
+@instrumented
+def get_task_by_id(task_id: str) -> Optional[Dict[str, Any]]:
+    """Get a single task with every column (e.g. to fill the edit form)."""
+    try:
+        return get_repository().get(TASKS, task_id, 'detail')
+    except Exception as e:
+        st.error(f"❌ Erreur lecture task: {str(e)}")
+        return None
+
+
+def _task_conditions(filters: Optional[Dict[str, Any]]) -> List[Condition]:
+    """
+    Translate task filters into repository conditions.
+
+    Args:
+        filters: Optional dictionary with filter criteria
+            - statuses: List of statuses (status IN ...)
+            - priorities: List of priorities (priority IN ...)
+            - assignee_id: Single assignee
+            - assignee_ids: List of assignees, None in the list matches unassigned tasks
+            - search: Case-insensitive substring of the title
+            - due_from / due_to: Inclusive due date range (date or ISO string)
+            - has_dates: Only tasks with both a start and a due date
+    """
+    if not filters:
+        return []
+
+    conditions: List[Condition] = []
+    if filters.get('statuses') is not None:
+        conditions.append(('status', 'in', filters['statuses']))
+    if filters.get('priorities') is not None:
+        conditions.append(('priority', 'in', filters['priorities']))
+    if filters.get('assignee_id'):
+        conditions.append(('assignee_id', 'eq', filters['assignee_id']))
+    if filters.get('assignee_ids'):
+        conditions.append(('assignee_id', 'in', list(filters['assignee_ids'])))
+    if filters.get('search'):
+        conditions.append(('title', 'ilike', f"%{filters['search']}%"))
+    if filters.get('due_from'):
+        conditions.append(('due_date', 'gte', str(filters['due_from'])))
+    if filters.get('due_to'):
+        conditions.append(('due_date', 'lte', str(filters['due_to'])))
+    if filters.get('has_dates'):
+        conditions += [('start_date', 'not.is', None), ('due_date', 'not.is', None)]
+
+    return conditions
+
+
+def _matches_nothing(filters: Optional[Dict[str, Any]]) -> bool:
+    """True when a filter is an empty IN list (e.g. every status unchecked)."""
+    return bool(filters) and any(
+        filters.get(key) is not None and len(filters[key]) == 0
+        for key in ('statuses', 'priorities')
+    )
+
+
+def _filters_key(filters: Optional[Dict[str, Any]]) -> tuple:
+    """Hashable cache key for a filters dictionary."""
+    return tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else str(v))
+        for k, v in (filters or {}).items()
+    ))
+
+
+@instrumented
+def get_filtered_tasks(filters: Optional[Dict[str, Any]] = None,
+                       projection: str = 'summary') -> List[Dict[str, Any]]:
+    """
+    Get tasks matching filters evaluated by the database (cached).
+
+    Args:
+        filters: See _task_conditions for the supported criteria
+        projection: 'summary' (no description) or 'detail'
+
+    Returns:
+        List of matching tasks (with comment_count), newest first
+    """
+    if _matches_nothing(filters):
+        return []
+
+    def fetch():
+        return get_repository().list(TASKS, _task_conditions(filters), projection, counts=True)
+
+    try:
+        return query_cache.get_or_load(
+            'tasks', ('filtered', projection, _filters_key(filters)), fetch
+        )
     except Exception as e:
         st.error(f"❌ Erreur lecture tasks: {str(e)}")
         return []
 
 
+@instrumented
+def get_tasks_page(page_size: int = 25, cursor: Optional[Cursor] = None,
+                   filters: Optional[Dict[str, Any]] = None,
+                   projection: str = 'summary') -> Dict[str, Any]:
+    """
+    Get one page of tasks, newest first, using keyset pagination on (created_at, id).
+
+    Args:
+        page_size: Number of tasks per page
+        cursor: next_cursor of the previous page, None for the first page
+        filters: See _task_conditions for the supported criteria
+        projection: 'summary' (no description) or 'detail'
+
+    Returns:
+        Dictionary with 'items' (tasks of the page, with comment_count) and 'next_cursor'
+    """
+    if _matches_nothing(filters):
+        return {'items': [], 'next_cursor': None}
+
+    try:
+        return get_repository().page(TASKS, _task_conditions(filters), page_size, cursor, projection, counts=True)
+    except Exception as e:
+        st.error(f"❌ Erreur lecture tasks: {str(e)}")
+        return {'items': [], 'next_cursor': None}
+
+
+@instrumented
 def create_task(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Create a new task."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').insert(data).execute()
-        if response.data:
+        created = get_repository().create(TASKS, data)
+        query_cache.invalidate('tasks')
+        if created:
             st.success(f"✅ Tâche '{data['title']}' créée avec succès!")
-            return response.data[0]
+            return created
         return None
     except Exception as e:
         st.error(f"❌ Erreur création task: {str(e)}")
         return None
 
 
+@instrumented
 def update_task(task_id: str, data: Dict[str, Any]) -> bool:
     """Update an existing task."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').update(data).eq('id', task_id).execute()
-        if response.data:
+        updated = get_repository().update(TASKS, [('id', 'eq', task_id)], data)
+        query_cache.invalidate('tasks')
+        if updated:
             st.success("✅ Tâche mise à jour avec succès!")
             return True
         return False
@@ -263,12 +397,60 @@ def update_task(task_id: str, data: Dict[str, Any]) -> bool:
         return False
 
 
+@instrumented
+def save_task(task_id: str, data: Dict[str, Any]) -> Optional[int]:
+    """
+    Update an existing task without displaying anything.
+
+    Errors are only logged, so the update can run outside the Streamlit
+    script, e.g. in a background thread.
+
+    Returns:
+        Generation of the tasks cache left by this write (see
+        QueryCache.generation), None when the task was not updated
+    """
+    try:
+        updated = get_repository().update(TASKS, [('id', 'eq', task_id)], data)
+    except Exception as e:
+        logger.error(f"Error updating task {task_id}: {str(e)}")
+        return None
+    generation = query_cache.invalidate('tasks')['tasks']
+    return generation if updated else None
+
+
+@instrumented
+def update_tasks_status(task_ids: List[str], status: str) -> int:
+    """
+    Move several tasks to the same status in a single request.
+
+    Args:
+        task_ids: IDs of the tasks to update
+        status: New status
+
+    Returns:
+        Number of tasks updated
+    """
+    if not task_ids:
+        return 0
+    try:
+        updated = get_repository().update(TASKS, [('id', 'in', list(task_ids))], {'status': status})
+        query_cache.invalidate('tasks')
+        count = len(updated)
+        if count:
+            st.success(f"✅ {count} tâche(s) mise(s) à jour")
+        return count
+    except Exception as e:
+        st.error(f"❌ Erreur mise à jour tasks: {str(e)}")
+        return 0
+
+
+@instrumented
 def delete_task(task_id: str) -> bool:
     """Delete a task."""
     try:
-        client = get_supabase_client()
-        response = client.table('tasks').delete().eq('id', task_id).execute()
-        if response.data:
+        deleted = get_repository().delete(TASKS, [('id', 'eq', task_id)])
+        query_cache.invalidate('tasks')
+        if deleted:
             st.success("✅ Tâche supprimée avec succès!")
             return True
         return False
@@ -281,39 +463,80 @@ def delete_task(task_id: str) -> bool:
 # COMMENTS CRUD
 # =====================================================
 
+COMMENTS_PAGE_SIZE = 20
+
+
+def fetch_comments_page(column: str, parent_id: str, page_size: int = COMMENTS_PAGE_SIZE,
+                        cursor: Optional[Cursor] = None) -> Dict[str, Any]:
+    """
+    Query one page of a comment thread, newest first (raises on errors).
+
+    Args:
+        column: 'task_id' or 'experiment_id'
+        parent_id: ID of the task or experiment
+        page_size: Number of comments per page
+        cursor: next_cursor of the previous page, None for the newest comments
+
+    Returns:
+        Dictionary with 'items' (comments with their user) and 'next_cursor'
+    """
+    return get_repository().page(COMMENTS, [(column, 'eq', parent_id)], page_size, cursor, 'all')
+
+
+@instrumented
 def get_comments_by_task(task_id: str) -> List[Dict[str, Any]]:
     """Get all comments for a task."""
     try:
-        client = get_supabase_client()
-        response = client.table('comments').select(
-            '*, user:users(id, name, email)'
-        ).eq('task_id', task_id).order('created_at', desc=True).execute()
-        return response.data if response.data else []
+        return get_repository().list(COMMENTS, [('task_id', 'eq', task_id)], 'all')
     except Exception as e:
         st.error(f"❌ Erreur lecture comments: {str(e)}")
         return []
 
 
+@instrumented
+def get_task_comments_page(task_id: str, page_size: int = COMMENTS_PAGE_SIZE,
+                           cursor: Optional[Cursor] = None) -> Dict[str, Any]:
+    """
+    Get one page of a task's comments, newest first (keyset pagination on (created_at, id)).
+
+    Args:
+        task_id: ID of the task
+        page_size: Number of comments per page
+        cursor: next_cursor of the previous page, None for the newest comments
+
+    Returns:
+        Dictionary with 'items' (comments of the page) and 'next_cursor'
+    """
+    try:
+        return fetch_comments_page('task_id', task_id, page_size, cursor)
+    except Exception as e:
+        st.error(f"❌ Erreur lecture comments: {str(e)}")
+        return {'items': [], 'next_cursor': None}
+
+
+@instrumented
 def create_comment(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Create a new comment."""
     try:
-        client = get_supabase_client()
-        response = client.table('comments').insert(data).execute()
-        if response.data:
+        created = get_repository().create(COMMENTS, data)
+        # Drops the task lists too (they carry comment counts)
+        query_cache.invalidate('comments')
+        if created:
             st.success("✅ Commentaire ajouté avec succès!")
-            return response.data[0]
+            return created
         return None
     except Exception as e:
         st.error(f"❌ Erreur création comment: {str(e)}")
         return None
 
 
+@instrumented
 def delete_comment(comment_id: str) -> bool:
     """Delete a comment."""
     try:
-        client = get_supabase_client()
-        response = client.table('comments').delete().eq('id', comment_id).execute()
-        if response.data:
+        deleted = get_repository().delete(COMMENTS, [('id', 'eq', comment_id)])
+        query_cache.invalidate('comments')
+        if deleted:
             st.success("✅ Commentaire supprimé avec succès!")
             return True
         return False
@@ -326,50 +549,46 @@ def delete_comment(comment_id: str) -> bool:
 # STATISTICS & ANALYTICS
 # =====================================================
 
+def compute_dashboard_stats(projects: List[Dict[str, Any]],
+                            subprojects: List[Dict[str, Any]],
+                            tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute dashboard statistics from already loaded rows (vectorized, see utils/stats.py)."""
+    return dashboard_stats(projects_frame(projects), len(subprojects), tasks_frame(tasks))
+
+
+def _fetch_dashboard_stats() -> Dict[str, Any]:
+    """
+    Query dashboard statistics aggregated by the database.
+
+    Uses the get_dashboard_stats aggregate (migrations/002_dashboard_stats.sql)
+    and falls back to computing them from full table reads if it isn't installed.
+    """
+    try:
+        rows = get_repository().aggregate(
+            'get_dashboard_stats', {'p_today': datetime.now().date().isoformat()}
+        )
+    except Exception as e:
+        if is_backend_unavailable(e):
+            raise
+        logger.warning(f"get_dashboard_stats RPC unavailable, computing client-side: {str(e)}")
+        return compute_dashboard_stats(get_all_projects(), get_all_subprojects(), get_all_tasks('summary'))
+
+    row = rows[0] if rows else {}
+    stats = {key: int(row.get(key) or 0) for key in (
+        'total_projects', 'active_projects', 'total_subprojects', 'total_tasks',
+        'completed_tasks', 'in_progress_tasks', 'todo_tasks', 'high_priority_tasks',
+        'urgent_priority_tasks', 'overdue_tasks'
+    )}
+    stats['completion_rate'] = float(row.get('completion_rate') or 0)
+    return stats
+
+
+@instrumented
 def get_dashboard_stats() -> Dict[str, Any]:
-    """Get aggregated statistics for dashboard."""
+    """Get aggregated statistics for dashboard (computed server-side, cached)."""
     try:
-        projects = get_all_projects()
-        subprojects = get_all_subprojects()
-        tasks = get_all_tasks()
-
-        # Calculate statistics
-        total_projects = len(projects)
-        active_projects = len([p for p in projects if p['status'] == 'active'])
-
-        total_tasks = len(tasks)
-        completed_tasks = len([t for t in tasks if t['status'] == 'done'])
-        in_progress_tasks = len([t for t in tasks if t['status'] == 'in-progress'])
-        todo_tasks = len([t for t in tasks if t['status'] == 'todo'])
-
-        # Task completion rate
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-
-        # Tasks by priority
-        high_priority = len([t for t in tasks if t['priority'] == 'high'])
-        urgent_priority = len([t for t in tasks if t['priority'] == 'urgent'])
-
-        # Overdue tasks
-        today = datetime.now().date()
-        overdue_tasks = len([
-            t for t in tasks
-            if t.get('due_date') and datetime.fromisoformat(t['due_date'].replace('Z', '+00:00')).date() < today
-               and t['status'] != 'done'
-        ])
-
-        return {
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'total_subprojects': len(subprojects),
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'todo_tasks': todo_tasks,
-            'completion_rate': completion_rate,
-            'high_priority_tasks': high_priority,
-            'urgent_priority_tasks': urgent_priority,
-            'overdue_tasks': overdue_tasks
-        }
+        # Cached with the tasks: writes on projects/subprojects invalidate tasks too
+        return query_cache.get_or_load('tasks', 'dashboard_stats', _fetch_dashboard_stats)
 
     except Exception as e:
         st.error(f"❌ Erreur calcul statistiques: {str(e)}")
@@ -0,0 +1,84 @@
+"""
+Dashboard Data Module
+Charge en une seule passe (et en parallèle) toutes les données du dashboard.
+"""
+
+from typing import Any, Dict
+from .batch import fetch_parallel
+from .crud import get_all_projects, get_all_tasks, get_dashboard_stats
+from .experiments_crud import get_all_experiments
+from .profiling import profile_section
+from .stats import (
+    count_by,
+    experiment_stats,
+    experiments_frame,
+    projects_frame,
+    tasks_of,
+    tasks_frame,
+    upcoming_deadlines
+)
+
+
+def load_dashboard_snapshot(user_id: str) -> Dict[str, Any]:
+    """
+    Load everything the dashboard renders, fetching each table exactly once.
+
+    Task and project KPIs come from the get_dashboard_stats aggregate, so
+    their cost doesn't grow with the number of tasks. The rows are loaded
+    once into typed frames (utils/stats.py) for the chart counts, the
+    experiment KPIs and the deadline lists.
+
+    Args:
+        user_id: ID of the current user (for the "My Tasks" summary)
+
+    Returns:
+        Dictionary with:
+            - projects, tasks, experiments: raw rows
+            - stats: task/project KPIs (see crud.get_dashboard_stats)
+            - exp_stats: experiment KPIs (see stats.experiment_stats)
+            - counts: rows per project status, task status, task priority
+              and experiment status, for the charts
+            - upcoming: open tasks due in the next days (see stats.upcoming_deadlines)
+            - my_tasks: tasks assigned to user_id, ordered by due date
+    """
+    data = fetch_parallel({
+        'stats': get_dashboard_stats,
+        'projects': get_all_projects,
+        # Summary projections: the dashboard never shows long text fields
+        'tasks': lambda: get_all_tasks('summary'),
+        'experiments': lambda: get_all_experiments(projection='summary'),
+    })
+    stats = data.pop('stats') or {}
+    tables = {name: rows or [] for name, rows in data.items()}
+    with profile_section('transform', 'summarize_dashboard'):
+        summary = summarize_dashboard(tables, user_id)
+    return {**tables, 'stats': stats, **summary}
+
+
+def summarize_dashboard(tables: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    Compute the dashboard figures derived from loaded rows.
+
+    Args:
+        tables: projects, tasks and experiments rows
+        user_id: ID of the current user
+
+    Returns:
+        exp_stats, counts, upcoming and my_tasks (see load_dashboard_snapshot)
+    """
+    tasks = tables['tasks']
+    projects = projects_frame(tables['projects'])
+    task_frame = tasks_frame(tasks)
+    exp_stats = experiment_stats(experiments_frame(tables['experiments']))
+
+    return {
+        'exp_stats': exp_stats,
+        'counts': {
+            'project_status': count_by(projects, 'status'),
+            'task_status': count_by(task_frame, 'status'),
+            'task_priority': count_by(task_frame, 'priority'),
+            'experiment_status': exp_stats['by_status'],
+        },
+        'upcoming': upcoming_deadlines(task_frame, tasks),
+        'my_tasks': tasks_of(task_frame, tasks, user_id),
+    }
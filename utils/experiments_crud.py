@@ -6,55 +6,69 @@ Dashboard ELN - Phase 1
 import streamlit as st
 import logging
 from typing import Dict, Any, List, Optional
-from utils.supabase_client import get_supabase_client
+from utils.cache import query_cache
+from utils.crud import COMMENTS_PAGE_SIZE, fetch_comments_page
+from utils.pagination import Cursor, split_page
+from utils.instrumentation import instrumented
+from utils.resilience import is_backend_unavailable
+from utils.repository import AnyOf, COMMENTS, EXPERIMENTS, Condition, get_repository
+from utils.stats import experiment_stats, experiments_frame
 from utils.permissions import (
     can_create_experiment,
-    can_edit_experiment,
-    can_delete_experiment
+    experiment_write_scope
 )
 
 logger = logging.getLogger(__name__)
 
 
-def get_all_experiments(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+# Best matches returned by a search (see migrations/004_experiments_search.sql)
+SEARCH_MAX_RESULTS = 200
+
+# Ids per `id=in.(...)` request, keeps URLs well below proxy limits
+ID_CHUNK_SIZE = 100
+
+
+def _fetch_all_experiments(projection: str) -> List[Dict[str, Any]]:
+    """Query all experiments with related data (uncached)."""
+    return get_repository().list(EXPERIMENTS, projection=projection, counts=True)
+
+
+@instrumented
+def get_all_experiments(filters: Optional[Dict[str, Any]] = None,
+                        projection: str = 'summary') -> List[Dict[str, Any]]:
     """
     Get all experiments with optional filters.
 
+    The unfiltered list is cached per projection (and kept up to date by the
+    realtime change feed when enabled); while Supabase is unavailable its
+    last-known value is served.
+
     Args:
         filters: Optional dictionary with filter criteria
             - status: Filter by status
             - subproject_id: Filter by subproject
             - responsible_user_id: Filter by responsible user
-            - search: Text search in title/description
+            - search: Full-text search (results ordered by relevance)
             - priority: Filter by priority
+        projection: 'summary' (list columns) or 'detail' (every column)
 
     Returns:
-        List of experiment dictionaries with related data
+        List of experiment dictionaries with related data (and comment_count,
+        except for the unfiltered list when incremental sync is enabled)
     """
     try:
-        client = get_supabase_client()
-        query = client.table('experiments').select(
-            '*, '
-            'subproject:subprojects!experiments_subproject_id_fkey(id, name, project_id, project:projects!subprojects_project_id_fkey(id, name)), '
-            'responsible:users!experiments_responsible_user_id_fkey(id, name, email), '
-            'creator:users!experiments_created_by_fkey(id, name, email)'
-        ).order('created_at', desc=True)
-
-        if filters:
-            if filters.get('status'):
-                query = query.eq('status', filters['status'])
-            if filters.get('subproject_id'):
-                query = query.eq('subproject_id', filters['subproject_id'])
-            if filters.get('responsible_user_id'):
-                query = query.eq('responsible_user_id', filters['responsible_user_id'])
-            if filters.get('priority'):
-                query = query.eq('priority', filters['priority'])
-            if filters.get('search'):
-                search_term = filters['search']
-                query = query.or_(f'title.ilike.%{search_term}%,description.ilike.%{search_term}%,objective.ilike.%{search_term}%')
-
-        response = query.execute()
-        return response.data if response.data else []
+        ranked_ids = _search_ranked_ids(filters)
+
+        if ranked_ids is not None:
+            return _fetch_ranked(filters, ranked_ids, projection)
+
+        conditions = _experiment_conditions(filters)
+        if not conditions:
+            return query_cache.get_or_load(
+                'experiments', ('all', projection), lambda: _fetch_all_experiments(projection)
+            )
+
+        return get_repository().list(EXPERIMENTS, conditions, projection, counts=True)
 
     except Exception as e:
         logger.error(f"Error fetching experiments: {str(e)}")
@@ -62,6 +76,138 @@ def get_all_experiments(filters: Optional[Dict[str, Any]] = None) -> List[Dict[s
         return []
 
 
+@instrumented
+def get_experiments_page(filters: Optional[Dict[str, Any]] = None, page_size: int = 25,
+                         cursor: Optional[Cursor] = None,
+                         projection: str = 'summary') -> Dict[str, Any]:
+    """
+    Get one page of experiments, newest first, using keyset pagination on (created_at, id).
+
+    With a search filter, pages follow relevance order instead and the cursor
+    is ('rank', id of the last experiment of the previous page).
+
+    The first page of the unfiltered list is cached, so it can still be
+    served (last-known) while Supabase is unavailable.
+
+    Args:
+        filters: Same filter criteria as get_all_experiments
+        page_size: Number of experiments per page
+        cursor: next_cursor of the previous page, None for the first page
+        projection: 'summary' (list columns) or 'detail' (every column)
+
+    Returns:
+        Dictionary with 'items' (experiments of the page, with comment_count) and 'next_cursor'
+    """
+    try:
+        ranked_ids = _search_ranked_ids(filters)
+
+        if ranked_ids is not None:
+            return _ranked_page(filters, ranked_ids, page_size, cursor, projection)
+
+        conditions = _experiment_conditions(filters)
+
+        def fetch():
+            return get_repository().page(EXPERIMENTS, conditions, page_size, cursor, projection, counts=True)
+
+        if not conditions and cursor is None:
+            return query_cache.get_or_load('experiments', ('first_page', projection, page_size), fetch)
+
+        return fetch()
+
+    except Exception as e:
+        logger.error(f"Error fetching experiments page: {str(e)}")
+        st.error(f"Erreur lors du chargement des expériences: {str(e)}")
+        return {'items': [], 'next_cursor': None}
+
+
+@instrumented
+def search_experiment_ids(search: str, max_results: int = SEARCH_MAX_RESULTS) -> Optional[List[str]]:
+    """
+    Search experiments with the full-text index, best match first.
+
+    Matches title, objective, description, protocol, conditions, observations
+    and results summary, including word prefixes and near-miss titles.
+
+    Args:
+        search: Free-text query (websearch syntax: "phrase", -word, or)
+        max_results: Maximum number of ids returned
+
+    Returns:
+        Ranked experiment ids, or None if the search_experiments function
+        isn't installed (callers then fall back to ILIKE filtering)
+    """
+    try:
+        rows = get_repository().aggregate(
+            'search_experiments', {'search_query': search, 'max_results': max_results}
+        )
+    except Exception as e:
+        if is_backend_unavailable(e):
+            raise
+        logger.warning(f"search_experiments RPC unavailable, using ILIKE search: {str(e)}")
+        return None
+
+    return [row['id'] for row in rows]
+
+
+def _search_ranked_ids(filters: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """Ranked ids for the search filter, None when not searching (or no index)."""
+    if not filters or not filters.get('search'):
+        return None
+    return search_experiment_ids(filters['search'])
+
+
+def _fetch_ranked(filters: Optional[Dict[str, Any]], ids: List[str],
+                  projection: str) -> List[Dict[str, Any]]:
+    """Fetch the experiments with the given ids that match the other filters, in the order of ids."""
+    other_filters = {key: value for key, value in (filters or {}).items() if key != 'search'}
+    conditions = _experiment_conditions(other_filters)
+    rows = []
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        rows.extend(get_repository().list(
+            EXPERIMENTS, conditions + [('id', 'in', chunk)], projection, order=(), counts=True
+        ))
+
+    position = {exp_id: index for index, exp_id in enumerate(ids)}
+    rows.sort(key=lambda row: position[row['id']])
+    return rows
+
+
+def _ranked_page(filters: Optional[Dict[str, Any]], ids: List[str], page_size: int,
+                 cursor: Optional[Cursor], projection: str) -> Dict[str, Any]:
+    """Get one page of search results in relevance order."""
+    start = 0
+    if cursor and cursor[1] in ids:
+        start = ids.index(cursor[1]) + 1
+
+    items = []
+    # Other filters may drop some of the ranked ids: keep reading until the page is full
+    while start < len(ids) and len(items) <= page_size:
+        batch = ids[start:start + page_size + 1 - len(items)]
+        items.extend(_fetch_ranked(filters, batch, projection))
+        start += len(batch)
+
+    return split_page(items, page_size, cursor_key=lambda row: ('rank', row['id']))
+
+
+def _experiment_conditions(filters: Optional[Dict[str, Any]]) -> List[Condition]:
+    """Translate experiment filters (see get_all_experiments) into repository conditions."""
+    conditions: List[Condition] = []
+
+    if filters:
+        for column in ('status', 'subproject_id', 'responsible_user_id', 'priority'):
+            if filters.get(column):
+                conditions.append((column, 'eq', filters[column]))
+        if filters.get('search'):
+            # Only reached when search_experiments isn't installed
+            pattern = f"%{filters['search']}%"
+            conditions.append(AnyOf(*((column, 'ilike', pattern)
+                                      for column in ('title', 'description', 'objective'))))
+
+    return conditions
+
+
+@instrumented
 def get_experiment_by_id(experiment_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a single experiment by ID with all related data.
@@ -73,15 +219,7 @@ def get_experiment_by_id(experiment_id: str) -> Optional[Dict[str, Any]]:
         Experiment dictionary or None if not found
     """
     try:
-        client = get_supabase_client()
-        response = client.table('experiments').select(
-            '*, '
-            'subproject:subprojects!experiments_subproject_id_fkey(id, name, project_id, project:projects!subprojects_project_id_fkey(id, name)), '
-            'responsible:users!experiments_responsible_user_id_fkey(id, name, email), '
-            'creator:users!experiments_created_by_fkey(id, name, email)'
-        ).eq('id', experiment_id).execute()
-
-        return response.data[0] if response.data else None
+        return get_repository().get(EXPERIMENTS, experiment_id, 'detail')
 
     except Exception as e:
         logger.error(f"Error fetching experiment {experiment_id}: {str(e)}")
@@ -89,6 +227,7 @@ def get_experiment_by_id(experiment_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+@instrumented
 def create_experiment(experiment_data: Dict[str, Any], user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Create a new experiment.
@@ -111,13 +250,13 @@ def create_experiment(experiment_data: Dict[str, Any], user: Dict[str, Any]) ->
     experiment_data['created_by'] = user['id']
 
     try:
-        client = get_supabase_client()
-        response = client.table('experiments').insert(experiment_data).execute()
+        created = get_repository().create(EXPERIMENTS, experiment_data)
+        query_cache.invalidate('experiments')
 
-        if response.data:
-            logger.info(f"Experiment created by user {user['id']}: {response.data[0]['id']}")
+        if created:
+            logger.info(f"Experiment created by user {user['id']}: {created['id']}")
             st.success(f"Expérience '{experiment_data['title']}' créée avec succès!")
-            return response.data[0]
+            return created
 
         return None
 
@@ -127,89 +266,121 @@ def create_experiment(experiment_data: Dict[str, Any], user: Dict[str, Any]) ->
         return None
 
 
+def _owned_experiment(experiment_id: str, user: Dict[str, Any],
+                      columns: Optional[List[str]]) -> List[Condition]:
+    """Conditions matching the experiment if one of the ownership columns is the user."""
+    conditions: List[Condition] = [('id', 'eq', experiment_id)]
+    if columns is None:
+        return conditions
+    if len(columns) == 1:
+        return conditions + [(columns[0], 'eq', user['id'])]
+    return conditions + [AnyOf(*((column, 'eq', user['id']) for column in columns))]
+
+
+def _experiment_exists(experiment_id: str) -> bool:
+    """Cheap existence check (id only, no joins)."""
+    return bool(get_repository().list(EXPERIMENTS, [('id', 'eq', experiment_id)], 'id',
+                                      order=(), relations=False))
+
+
+@instrumented
 def update_experiment(experiment_id: str, updates: Dict[str, Any], user: Dict[str, Any]) -> bool:
     """
     Update an existing experiment.
 
+    The ownership check is part of the UPDATE statement itself: contributors
+    only match experiments they created or are responsible for. The
+    experiment is only read again when nothing was updated, to tell
+    "not found" from "forbidden".
+
     Args:
         experiment_id: UUID of the experiment to update
         updates: Dictionary with fields to update
         user: Current user dictionary
 
     Returns:
-        True if update successful, False otherwise
+        True if update successful, False otherwise (e.g. experiment not found)
 
     Raises:
         PermissionError: If user doesn't have permission to edit
     """
-    # Get the experiment to check permissions
-    experiment = get_experiment_by_id(experiment_id)
-    if not experiment:
-        st.error("Expérience introuvable")
-        return False
-
-    if not can_edit_experiment(user, experiment):
+    scope = experiment_write_scope(user, 'edit')
+    if scope == []:
         st.error("Vous n'avez pas la permission de modifier cette expérience")
-        raise PermissionError("User cannot edit this experiment")
+        raise PermissionError("User cannot edit experiments")
 
     try:
-        client = get_supabase_client()
-        response = client.table('experiments').update(updates).eq('id', experiment_id).execute()
+        updated = get_repository().update(EXPERIMENTS, _owned_experiment(experiment_id, user, scope), updates)
 
-        if response.data:
+        if updated:
+            query_cache.invalidate('experiments')
             logger.info(f"Experiment {experiment_id} updated by user {user['id']}")
             st.success("Expérience mise à jour avec succès!")
             return True
 
-        return False
+        exists = _experiment_exists(experiment_id)
 
     except Exception as e:
         logger.error(f"Error updating experiment {experiment_id}: {str(e)}")
         st.error(f"Erreur lors de la mise à jour de l'expérience: {str(e)}")
         return False
 
+    if exists:
+        st.error("Vous n'avez pas la permission de modifier cette expérience")
+        raise PermissionError("User cannot edit this experiment")
+
+    st.error("Expérience introuvable")
+    return False
+
 
+@instrumented
 def delete_experiment(experiment_id: str, user: Dict[str, Any]) -> bool:
     """
     Delete an experiment.
 
+    Like update_experiment, contributors' ownership is checked by the DELETE
+    statement itself (only experiments they created).
+
     Args:
         experiment_id: UUID of the experiment to delete
         user: Current user dictionary
 
     Returns:
-        True if deletion successful, False otherwise
+        True if deletion successful, False otherwise (e.g. experiment not found)
 
     Raises:
         PermissionError: If user doesn't have permission to delete
     """
-    # Get the experiment to check permissions
-    experiment = get_experiment_by_id(experiment_id)
-    if not experiment:
-        st.error("Expérience introuvable")
-        return False
-
-    if not can_delete_experiment(user, experiment):
+    scope = experiment_write_scope(user, 'delete')
+    if scope == []:
         st.error("Vous n'avez pas la permission de supprimer cette expérience")
-        raise PermissionError("User cannot delete this experiment")
+        raise PermissionError("User cannot delete experiments")
 
     try:
-        client = get_supabase_client()
-        response = client.table('experiments').delete().eq('id', experiment_id).execute()
+        deleted = get_repository().delete(EXPERIMENTS, _owned_experiment(experiment_id, user, scope))
 
-        if response.data:
+        if deleted:
+            query_cache.invalidate('experiments')
             logger.info(f"Experiment {experiment_id} deleted by user {user['id']}")
             st.success("Expérience supprimée avec succès!")
             return True
 
-        return False
+        exists = _experiment_exists(experiment_id)
 
     except Exception as e:
         logger.error(f"Error deleting experiment {experiment_id}: {str(e)}")
         st.error(f"Erreur lors de la suppression de l'expérience: {str(e)}")
         return False
 
+    if exists:
+        st.error("Vous n'avez pas la permission de supprimer cette expérience")
+        raise PermissionError("User cannot delete this experiment")
+
+    st.error("Expérience introuvable")
+    return False
+
 
+@instrumented
 def get_experiments_by_subproject(subproject_id: str) -> List[Dict[str, Any]]:
     """
     Get all experiments for a specific subproject.
@@ -223,6 +394,7 @@ def get_experiments_by_subproject(subproject_id: str) -> List[Dict[str, Any]]:
     return get_all_experiments({'subproject_id': subproject_id})
 
 
+@instrumented
 def get_experiments_by_user(user_id: str) -> List[Dict[str, Any]]:
     """
     Get all experiments assigned to a specific user.
@@ -236,6 +408,7 @@ def get_experiments_by_user(user_id: str) -> List[Dict[str, Any]]:
     return get_all_experiments({'responsible_user_id': user_id})
 
 
+@instrumented
 def get_experiments_by_status(status: str) -> List[Dict[str, Any]]:
     """
     Get all experiments with a specific status.
@@ -249,6 +422,20 @@ def get_experiments_by_status(status: str) -> List[Dict[str, Any]]:
     return get_all_experiments({'status': status})
 
 
+def compute_experiment_stats(experiments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute experiment statistics from already loaded experiments.
+
+    Args:
+        experiments: List of experiment dictionaries
+
+    Returns:
+        Dictionary with experiment statistics
+    """
+    return experiment_stats(experiments_frame(experiments))
+
+
+@instrumented
 def get_experiment_stats() -> Dict[str, Any]:
     """
     Get statistics about experiments for dashboard KPIs.
@@ -257,44 +444,14 @@ def get_experiment_stats() -> Dict[str, Any]:
         Dictionary with experiment statistics
     """
     try:
-        experiments = get_all_experiments()
-
-        total = len(experiments)
-        by_status = {}
-        by_priority = {}
-
-        for exp in experiments:
-            status = exp.get('status', 'unknown')
-            priority = exp.get('priority', 'unknown')
-
-            by_status[status] = by_status.get(status, 0) + 1
-            by_priority[priority] = by_priority.get(priority, 0) + 1
-
-        return {
-            'total': total,
-            'planned': by_status.get('planned', 0),
-            'in_progress': by_status.get('in_progress', 0),
-            'completed': by_status.get('completed', 0),
-            'validated': by_status.get('validated', 0),
-            'cancelled': by_status.get('cancelled', 0),
-            'by_status': by_status,
-            'by_priority': by_priority
-        }
+        return compute_experiment_stats(get_all_experiments())
 
     except Exception as e:
         logger.error(f"Error getting experiment stats: {str(e)}")
-        return {
-            'total': 0,
-            'planned': 0,
-            'in_progress': 0,
-            'completed': 0,
-            'validated': 0,
-            'cancelled': 0,
-            'by_status': {},
-            'by_priority': {}
-        }
+        return compute_experiment_stats([])
 
 
+@instrumented
 def get_experiment_comments(experiment_id: str) -> List[Dict[str, Any]]:
     """
     Get all comments for a specific experiment.
@@ -306,18 +463,36 @@ def get_experiment_comments(experiment_id: str) -> List[Dict[str, Any]]:
         List of comment dictionaries
     """
     try:
-        client = get_supabase_client()
-        response = client.table('comments').select(
-            '*, user:users!comments_user_id_fkey(id, name, email)'
-        ).eq('experiment_id', experiment_id).order('created_at', desc=True).execute()
-
-        return response.data if response.data else []
+        return get_repository().list(COMMENTS, [('experiment_id', 'eq', experiment_id)], 'all')
 
     except Exception as e:
         logger.error(f"Error fetching comments for experiment {experiment_id}: {str(e)}")
         return []
 
 
+@instrumented
+def get_experiment_comments_page(experiment_id: str, page_size: int = COMMENTS_PAGE_SIZE,
+                                 cursor: Optional[Cursor] = None) -> Dict[str, Any]:
+    """
+    Get one page of an experiment's comments, newest first (keyset pagination on (created_at, id)).
+
+    Args:
+        experiment_id: UUID of the experiment
+        page_size: Number of comments per page
+        cursor: next_cursor of the previous page, None for the newest comments
+
+    Returns:
+        Dictionary with 'items' (comments of the page) and 'next_cursor'
+    """
+    try:
+        return fetch_comments_page('experiment_id', experiment_id, page_size, cursor)
+
+    except Exception as e:
+        logger.error(f"Error fetching comments for experiment {experiment_id}: {str(e)}")
+        return {'items': [], 'next_cursor': None}
+
+
+@instrumented
 def add_experiment_comment(experiment_id: str, content: str, user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Add a comment to an experiment.
@@ -331,19 +506,20 @@ def add_experiment_comment(experiment_id: str, content: str, user: Dict[str, Any
         Created comment dictionary or None on failure
     """
     try:
-        client = get_supabase_client()
         comment_data = {
             'experiment_id': experiment_id,
             'user_id': user['id'],
             'content': content
         }
 
-        response = client.table('comments').insert(comment_data).execute()
+        created = get_repository().create(COMMENTS, comment_data)
+        # Drops the experiment lists too (they carry comment counts)
+        query_cache.invalidate('comments')
 
-        if response.data:
+        if created:
             logger.info(f"Comment added to experiment {experiment_id} by user {user['id']}")
             st.success("Commentaire ajouté!")
-            return response.data[0]
+            return created
 
         return None
 
@@ -0,0 +1,356 @@
+"""
+Instrumentation Module
+Mesure chaque appel à la couche de données (latence, octets reçus, lignes, page
+appelante), exposée au format Prometheus et dans un panneau « query budget ».
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import pandas as pd
+import streamlit as st
+
+from . import resilience
+from .profiling import profile_section
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CallRecord:
+    """
+    Measurements of one call to an instrumented function.
+
+    Attributes:
+        function: Name of the function
+        page: Page whose script made the call ('unknown' outside pages)
+        seconds: Wall time of the call
+        rows: Rows returned (list length, page items, 1 for a single row)
+        bytes: Response bytes received from Supabase during the call
+        requests: HTTP requests sent during the call (retries included)
+        error: True if the call raised
+    """
+
+    __slots__ = ('function', 'page', 'seconds', 'rows', 'bytes', 'requests', 'error')
+
+    def __init__(self, function: str, page: str):
+        self.function = function
+        self.page = page
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.requests = 0
+        self.error = False
+
+
+# Instrumented calls in progress in the current thread/context (outermost first)
+_active_calls: ContextVar[Tuple[CallRecord, ...]] = ContextVar('nikaia_active_calls', default=())
+# Page being rendered and the calls made by the current rerun (see page_metrics)
+_current_page: ContextVar[str] = ContextVar('nikaia_current_page', default='unknown')
+_rerun_calls: ContextVar[Optional[List[CallRecord]]] = ContextVar('nikaia_rerun_calls', default=None)
+
+
+def _count_rows(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        items = result.get('items')
+        return len(items) if isinstance(items, list) else 1
+    return 0
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregates of the call records, rendered as Prometheus text.
+
+    Attributes:
+        calls: Number of calls per (function, page, status)
+        latency: [bucket counts..., sum, count] per function
+        rows / bytes / requests: Totals per function
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[str, List[float]] = {}
+        self.rows: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+        self.requests: Dict[str, int] = {}
+        self.http_requests = 0
+        self.http_bytes = 0
+
+    def observe(self, record: CallRecord) -> None:
+        """Add a finished call to the aggregates."""
+        status = 'error' if record.error else 'ok'
+        with self._lock:
+            key = (record.function, record.page, status)
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+            histogram = self.latency.setdefault(record.function, [0.0] * (len(LATENCY_BUCKETS) + 2))
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if record.seconds <= bound:
+                    histogram[index] += 1
+            histogram[-2] += record.seconds
+            histogram[-1] += 1
+
+            self.rows[record.function] = self.rows.get(record.function, 0) + record.rows
+            self.bytes[record.function] = self.bytes.get(record.function, 0) + record.bytes
+            self.requests[record.function] = self.requests.get(record.function, 0) + record.requests
+
+    def observe_http(self, requests: int = 0, received: int = 0) -> None:
+        """Count HTTP traffic, whether or not an instrumented call is running."""
+        with self._lock:
+            self.http_requests += requests
+            self.http_bytes += received
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family('nikaia_query_calls_total', 'counter', 'Data layer calls by function, page and status')
+            for (function, page, status), count in sorted(self.calls.items()):
+                lines.append(
+                    f'nikaia_query_calls_total{{function="{function}",page="{page}",status="{status}"}} {count}'
+                )
+
+            family('nikaia_query_duration_seconds', 'histogram', 'Data layer call latency')
+            for function, histogram in sorted(self.latency.items()):
+                for index, bound in enumerate(LATENCY_BUCKETS):
+                    lines.append(
+                        f'nikaia_query_duration_seconds_bucket{{function="{function}",le="{bound}"}} '
+                        f'{int(histogram[index])}'
+                    )
+                lines.append(
+                    f'nikaia_query_duration_seconds_bucket{{function="{function}",le="+Inf"}} {int(histogram[-1])}'
+                )
+                lines.append(f'nikaia_query_duration_seconds_sum{{function="{function}"}} {histogram[-2]:.6f}')
+                lines.append(f'nikaia_query_duration_seconds_count{{function="{function}"}} {int(histogram[-1])}')
+
+            for name, values, help_text in (
+                ('nikaia_query_rows_total', self.rows, 'Rows returned by data layer calls'),
+                ('nikaia_query_response_bytes_total', self.bytes, 'Response bytes received by data layer calls'),
+                ('nikaia_query_requests_total', self.requests, 'HTTP requests sent by data layer calls'),
+            ):
+                family(name, 'counter', help_text)
+                for function, value in sorted(values.items()):
+                    lines.append(f'{name}{{function="{function}"}} {value}')
+
+            family('nikaia_http_requests_total', 'counter', 'HTTP requests sent to the Supabase REST API')
+            lines.append(f'nikaia_http_requests_total {self.http_requests}')
+            family('nikaia_http_response_bytes_total', 'counter', 'Response bytes received from the Supabase REST API')
+            lines.append(f'nikaia_http_response_bytes_total {self.http_bytes}')
+
+        for name, value in resilience.metrics.snapshot().items():
+            family(f'nikaia_resilience_{name}_total', 'counter', f'Resilience counter: {name}')
+            lines.append(f'nikaia_resilience_{name}_total {value}')
+        family('nikaia_circuit_open', 'gauge', '1 while the Supabase circuit breaker is not closed')
+        lines.append(f"nikaia_circuit_open {0 if resilience.breaker.state == 'closed' else 1}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by all sessions
+registry = MetricsRegistry()
+
+
+def instrumented(fn: Callable) -> Callable:
+    """
+    Decorator recording latency, rows, response bytes and requests of each call.
+
+    Nested instrumented calls are measured too; bytes and requests count
+    for every call in progress, so totals of an outer call include them.
+    When the page is profiled (utils/profiling.py) the call counts as fetch.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        record = CallRecord(fn.__name__, _current_page.get())
+        token = _active_calls.set(_active_calls.get() + (record,))
+        started = time.perf_counter()
+        try:
+            with profile_section('fetch', fn.__name__):
+                result = fn(*args, **kwargs)
+            record.rows = _count_rows(result)
+            return result
+        except BaseException:
+            record.error = True
+            raise
+        finally:
+            record.seconds = time.perf_counter() - started
+            _active_calls.reset(token)
+            registry.observe(record)
+            rerun_calls = _rerun_calls.get()
+            if rerun_calls is not None and not _active_calls.get():
+                rerun_calls.append(record)
+
+    return wrapper
+
+
+class _CountingStream(httpx.SyncByteStream):
+    """Response body stream adding the bytes read to the calls in progress."""
+
+    def __init__(self, stream: httpx.SyncByteStream, calls: Tuple[CallRecord, ...]):
+        self._stream = stream
+        self._calls = calls
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            for call in self._calls:
+                call.bytes += len(chunk)
+            registry.observe_http(received=len(chunk))
+            yield chunk
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """httpx transport counting requests and response bytes (as sent on the wire)."""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        calls = _active_calls.get()
+        for call in calls:
+            call.requests += 1
+        registry.observe_http(requests=1)
+
+        response = self.transport.handle_request(request)
+        response.stream = _CountingStream(response.stream, calls)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+# =====================================================
+# PER-RERUN QUERY BUDGET
+# =====================================================
+
+def query_budget_panel_enabled() -> bool:
+    """True when QUERY_BUDGET_PANEL is set to true."""
+    return os.getenv("QUERY_BUDGET_PANEL", "false").lower() == "true"
+
+
+@contextmanager
+def page_metrics(page: str):
+    """
+    Attribute the data layer calls of a page run to that page.
+
+    Wraps a page's main(); with QUERY_BUDGET_PANEL=true the calls of the
+    rerun are then listed in the sidebar.
+
+    Args:
+        page: Page name or the page script's __file__
+    """
+    page_token = _current_page.set(Path(page).stem)
+    calls: List[CallRecord] = []
+    calls_token = _rerun_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_page.reset(page_token)
+        _rerun_calls.reset(calls_token)
+
+    if query_budget_panel_enabled():
+        show_query_budget(calls)
+
+
+def show_query_budget(calls: List[CallRecord]) -> None:
+    """
+    Display the data layer calls of this rerun in the sidebar.
+
+    QUERY_BUDGET_REQUESTS sets the number of HTTP requests above which the
+    panel shows a warning.
+    """
+    requests = sum(call.requests for call in calls)
+    received = sum(call.bytes for call in calls)
+    budget = int(os.getenv("QUERY_BUDGET_REQUESTS", "10"))
+
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏱️ Query budget")
+        st.caption(
+            f"{len(calls)} calls • {requests} requests • "
+            f"{received / 1024:.1f} KB • {sum(call.seconds for call in calls) * 1000:.0f} ms"
+        )
+        if requests > budget:
+            st.warning(f"{requests} requests this rerun (budget: {budget})")
+        if calls:
+            st.dataframe(pd.DataFrame([{
+                'call': call.function,
+                'ms': round(call.seconds * 1000, 1),
+                'req': call.requests,
+                'rows': call.rows,
+                'KB': round(call.bytes / 1024, 1),
+            } for call in calls]), hide_index=True, use_container_width=True)
+
+
+# =====================================================
+# PROMETHEUS ENDPOINT
+# =====================================================
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve GET /metrics on the given port (once per process).
+
+    Returns:
+        The server, or None if the port could not be bound
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+            except OSError as e:
+                logger.error(f"Could not start metrics server on port {port}: {str(e)}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="nikaia-metrics", daemon=True).start()
+            logger.info(f"Prometheus metrics served on :{port}/metrics")
+        return _server
+
+
+def metrics_port() -> Optional[int]:
+    """Port set in METRICS_PORT, None when unset (no metrics endpoint)."""
+    value = os.getenv("METRICS_PORT")
+    try:
+        return int(value) if value else None
+    except ValueError:
+        logger.warning(f"Ignoring invalid METRICS_PORT: {value}")
+        return None
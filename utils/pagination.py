@@ -0,0 +1,163 @@
+"""
+Pagination Module
+Pagination par curseur (keyset) sur (created_at, id), contrôles de navigation
+et listes chargées à la demande (« load more »).
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import streamlit as st
+
+# (created_at, id) of the last row of the previous page
+Cursor = Tuple[str, str]
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+
+
+def or_filter(query, expression: str):
+    """
+    Add a PostgREST `or=(...)` filter to a query.
+
+    postgrest-py only gained `or_()` in later releases, so fall back to
+    setting the query parameter directly.
+
+    Args:
+        query: postgrest-py filter request builder
+        expression: Comma separated conditions, e.g. "status.eq.todo,priority.eq.high"
+
+    Returns:
+        The query, for chaining
+    """
+    if hasattr(query, 'or_'):
+        return query.or_(expression)
+    query.params = query.params.add('or', f'({expression})')
+    return query
+
+
+def split_page(rows: List[Dict[str, Any]], page_size: int,
+               cursor_key: Optional[Callable[[Dict[str, Any]], Cursor]] = None) -> Dict[str, Any]:
+    """
+    Turn the rows of a keyset query into a page.
+
+    Args:
+        rows: Rows of a keyset query, with one extra row past the page
+            (see Repository.page in utils/repository.py)
+        page_size: Number of rows per page
+        cursor_key: Builds the cursor from the last row of the page
+            (default: its (created_at, id))
+
+    Returns:
+        Dictionary with:
+            - items: Rows of this page
+            - next_cursor: Cursor of the next page, None on the last page
+    """
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size and items:
+        last = items[-1]
+        next_cursor = cursor_key(last) if cursor_key else (last['created_at'], last['id'])
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+# =====================================================
+# PAGE NAVIGATION (session state + widgets)
+# =====================================================
+
+def get_page_cursor(state_key: str, reset_token: Any) -> Optional[Cursor]:
+    """
+    Get the cursor of the page currently displayed.
+
+    Navigation goes back to the first page whenever reset_token changes
+    (e.g. a filter or the page size changed).
+
+    Args:
+        state_key: Session state key holding the navigation of this list
+        reset_token: Any comparable value describing the current query
+
+    Returns:
+        Cursor to pass to the paginated query (None for the first page)
+    """
+    state = st.session_state.get(state_key)
+    if state is None or state['token'] != reset_token:
+        state = {'token': reset_token, 'cursors': [None]}
+        st.session_state[state_key] = state
+    return state['cursors'][-1]
+
+
+def show_page_controls(state_key: str, next_cursor: Optional[Cursor]) -> None:
+    """
+    Display Previous / Next buttons for a paginated list.
+
+    Args:
+        state_key: Session state key used with get_page_cursor()
+        next_cursor: Cursor returned with the current page
+    """
+    state = st.session_state[state_key]
+    page_number = len(state['cursors'])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if st.button("⬅️ Previous", key=f"{state_key}_prev", disabled=page_number == 1,
+                     use_container_width=True):
+            state['cursors'].pop()
+            st.rerun()
+
+    with col2:
+        st.markdown(f"<div style='text-align: center;'>Page {page_number}</div>", unsafe_allow_html=True)
+
+    with col3:
+        if st.button("Next ➡️", key=f"{state_key}_next", disabled=next_cursor is None,
+                     use_container_width=True):
+            state['cursors'].append(next_cursor)
+            st.rerun()
+
+
+# =====================================================
+# LAZY LISTS ("load more")
+# =====================================================
+
+def get_loaded_items(state_key: str, load_page: Callable[[Optional[Cursor]], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Get the items loaded so far of a list read page by page on demand.
+
+    The first page is loaded on the first call; show_load_more() appends
+    the next ones. Loaded pages stay in session state until reset_loaded_items().
+
+    Args:
+        state_key: Session state key holding the loaded items of this list
+        load_page: Returns the page ('items', 'next_cursor') after a cursor
+
+    Returns:
+        Items of every loaded page
+    """
+    if state_key not in st.session_state:
+        st.session_state[state_key] = load_page(None)
+    return st.session_state[state_key]['items']
+
+
+def show_load_more(state_key: str, load_page: Callable[[Optional[Cursor]], Dict[str, Any]],
+                   label: str = "Load more") -> None:
+    """
+    Display a button loading the next page of a list, if there is one.
+
+    Args:
+        state_key: Session state key used with get_loaded_items()
+        load_page: Same page loader as given to get_loaded_items()
+        label: Button label
+    """
+    state = st.session_state[state_key]
+    if state['next_cursor'] is None:
+        return
+    if st.button(label, key=f"{state_key}_more"):
+        page = load_page(state['next_cursor'])
+        st.session_state[state_key] = {
+            'items': state['items'] + page['items'],
+            'next_cursor': page['next_cursor'],
+        }
+        st.rerun()
+
+
+def reset_loaded_items(state_key: str) -> None:
+    """Forget the loaded pages of a list, so it is read again from the first page."""
+    st.session_state.pop(state_key, None)
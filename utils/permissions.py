@@ -3,7 +3,7 @@ Permissions module for Dashboard ELN
 Centralized permission checking for all modules
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 def can_create_experiment(user: Dict[str, Any]) -> bool:
@@ -68,6 +68,31 @@ def can_delete_experiment(user: Dict[str, Any], experiment: Dict[str, Any]) -> b
     return False
 
 
+def experiment_write_scope(user: Dict[str, Any], action: str) -> Optional[List[str]]:
+    """
+    Describe the experiments a user may edit or delete as ownership columns.
+    Same rules as can_edit_experiment / can_delete_experiment, in a form the
+    database can check while writing (no need to load the experiment first).
+
+    Args:
+        user: User dictionary with 'id' and 'role' keys
+        action: 'edit' or 'delete'
+
+    Returns:
+        None if the user may write any experiment, otherwise the columns of
+        which at least one must equal the user's id (empty list: no experiment)
+    """
+    if user.get('role') == 'manager':
+        return None
+
+    if user.get('role') == 'contributor':
+        if action == 'edit':
+            return ['responsible_user_id', 'created_by']
+        return ['created_by']
+
+    return []
+
+
 def can_view_experiment(user: Dict[str, Any], experiment: Optional[Dict[str, Any]] = None) -> bool:
     """
     Check if user can view experiments.
@@ -0,0 +1,226 @@
+"""
+Profiling Module
+Profilage optionnel du rendu des pages : temps passé par section (fetch /
+transform / render) et par helper, avec export cProfile ou pyinstrument.
+"""
+
+import cProfile
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('fetch', 'transform', 'render')
+
+
+def profiling_enabled() -> bool:
+    """True when PAGE_PROFILING=true or the page URL has ?profile=1."""
+    if os.getenv("PAGE_PROFILING", "false").lower() == "true":
+        return True
+    try:
+        values = st.experimental_get_query_params().get('profile', [])
+    except Exception:
+        return False
+    return any(value.lower() in ('1', 'true') for value in values)
+
+
+class PageProfile:
+    """
+    Wall time of one page run, split into sections.
+
+    Time is charged to the innermost running section only (exclusive
+    time): a data call made inside a show_* helper counts as fetch, not
+    render. Only the script thread is measured; fetch_parallel is timed as
+    a whole on that thread.
+
+    Attributes:
+        page: Page name
+        sections: Exclusive seconds per section
+        functions: (section, inclusive seconds, calls) per wrapped function
+        total: Wall time of main()
+    """
+
+    def __init__(self, page: str):
+        self.page = page
+        self.sections: Dict[str, float] = {name: 0.0 for name in SECTIONS}
+        self.functions: Dict[str, List] = {}
+        self.total = 0.0
+        self._thread = threading.get_ident()
+        self._stack: List[Tuple[str, float]] = []
+
+    def enter(self, section: str) -> bool:
+        """Start a section; False (nothing recorded) outside the script thread."""
+        if threading.get_ident() != self._thread:
+            return False
+        now = time.perf_counter()
+        if self._stack:
+            current, since = self._stack[-1]
+            self.sections[current] += now - since
+        self._stack.append((section, now))
+        return True
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        section, since = self._stack.pop()
+        self.sections[section] += now - since
+        if self._stack:
+            # The enclosing section resumes now
+            self._stack[-1] = (self._stack[-1][0], now)
+
+    def record_function(self, name: str, section: str, seconds: float) -> None:
+        entry = self.functions.setdefault(name, [section, 0.0, 0])
+        entry[1] += seconds
+        entry[2] += 1
+
+
+_profile: ContextVar[Optional[PageProfile]] = ContextVar('nikaia_page_profile', default=None)
+
+
+@contextmanager
+def profile_section(section: str, name: Optional[str] = None):
+    """
+    Charge the enclosed code to a section of the running page profile.
+
+    Does nothing when the page isn't being profiled.
+
+    Args:
+        section: 'fetch', 'transform' or 'render'
+        name: Optional label shown in the per-function breakdown
+    """
+    profile = _profile.get()
+    if profile is None or not profile.enter(section):
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.exit()
+        if name:
+            profile.record_function(name, section, time.perf_counter() - started)
+
+
+def _wrap(fn: Callable, section: str) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with profile_section(section, fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _start_dump():
+    """Start the optional per-rerun profiler (PROFILE_DUMP_DIR, PROFILE_ENGINE)."""
+    if not os.getenv("PROFILE_DUMP_DIR"):
+        return None
+    if os.getenv("PROFILE_ENGINE", "cprofile").lower() == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        except ImportError:
+            logger.warning("PROFILE_ENGINE=pyinstrument but pyinstrument is missing, using cProfile")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_dump(profiler: Any, page: str) -> Optional[Path]:
+    """Stop the profiler and write its output under PROFILE_DUMP_DIR."""
+    directory = Path(os.getenv("PROFILE_DUMP_DIR"))
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{page}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        path = directory / f"{stem}.prof"
+        profiler.dump_stats(str(path))
+    else:
+        profiler.stop()
+        path = directory / f"{stem}.html"
+        path.write_text(profiler.output_html(), encoding='utf-8')
+    return path
+
+
+def profile_page(namespace: Dict[str, Any], page: Optional[str] = None) -> None:
+    """
+    Profile the page defined in namespace when profiling is enabled.
+
+    Call with the page's globals() right before main(): main() becomes the
+    profiled root. Its own code (mostly widgets and layout) and the show_*
+    helpers count as render, the prepare_* helpers (and code wrapped in
+    profile_section('transform')) as transform, data layer calls as fetch.
+    The breakdown is shown in the sidebar after the page has rendered.
+
+    Args:
+        namespace: Globals of the page script
+        page: Page name, defaults to the script's file name
+    """
+    if not profiling_enabled() or 'main' not in namespace:
+        return
+
+    page = page or Path(namespace.get('__file__', 'page')).stem
+    for name, value in list(namespace.items()):
+        if name.startswith('show_') and callable(value):
+            namespace[name] = _wrap(value, 'render')
+        elif name.startswith('prepare_') and callable(value):
+            namespace[name] = _wrap(value, 'transform')
+
+    main = namespace['main']
+
+    @wraps(main)
+    def profiled_main(*args, **kwargs):
+        profile = PageProfile(page)
+        token = _profile.set(profile)
+        dump = _start_dump()
+        started = time.perf_counter()
+        completed = False
+        try:
+            with profile_section('render'):
+                result = main(*args, **kwargs)
+            completed = True
+            return result
+        finally:
+            profile.total = time.perf_counter() - started
+            _profile.reset(token)
+            if dump is not None:
+                path = _stop_dump(dump, page)
+                logger.info(f"Profile of {page} written to {path}")
+            logger.info(
+                f"Page {page} rendered in {profile.total * 1000:.0f} ms (" +
+                ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in profile.sections.items()) + ")"
+            )
+            if completed:
+                show_page_profile(profile)
+
+    namespace['main'] = profiled_main
+
+
+def show_page_profile(profile: PageProfile) -> None:
+    """Display the section and helper breakdown of a page run in the sidebar."""
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### 🔬 Page profile")
+        st.caption(f"{profile.page} • {profile.total * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame([
+            {'section': name, 'ms': round(seconds * 1000, 1),
+             '%': round(100 * seconds / profile.total, 1) if profile.total else 0.0}
+            for name, seconds in profile.sections.items()
+        ]), hide_index=True, use_container_width=True)
+        if profile.functions:
+            rows = sorted(profile.functions.items(), key=lambda item: item[1][1], reverse=True)
+            st.dataframe(pd.DataFrame([
+                {'function': name, 'section': section, 'ms': round(seconds * 1000, 1), 'calls': calls}
+                for name, (section, seconds, calls) in rows
+            ]), hide_index=True, use_container_width=True)
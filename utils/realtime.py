@@ -0,0 +1,260 @@
+"""
+Realtime Module
+Abonnement aux changements Postgres (Supabase Realtime) pour garder le cache
+partagé à jour, ligne par ligne, sans recharger les tables.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlencode, urlparse
+
+import websockets
+
+from .cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+REALTIME_TABLES = ('tasks', 'projects', 'subprojects', 'experiments', 'comments')
+
+# Columns whose change can't be patched into cached rows: foreign keys of the
+# relations embedded by the CRUD queries, and the column lists are sorted on
+STRUCTURAL_COLUMNS: Dict[str, tuple] = {
+    'projects': ('lead_id', 'created_at'),
+    'subprojects': ('project_id', 'lead_id', 'created_at'),
+    'tasks': ('subproject_id', 'assignee_id', 'created_at'),
+    'experiments': ('subproject_id', 'responsible_user_id', 'created_by', 'created_at'),
+    'comments': ('task_id', 'experiment_id', 'user_id', 'created_at'),
+}
+
+HEARTBEAT_SECONDS = 25.0
+RECONNECT_MIN_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+
+
+def realtime_url(supabase_url: str, api_key: str) -> str:
+    """
+    Build the Realtime websocket URL of a Supabase project.
+
+    SUPABASE_REALTIME_URL overrides it (e.g. benchmarks/realtime_standin.py).
+
+    Args:
+        supabase_url: Project URL (https://<ref>.supabase.co)
+        api_key: Project API key
+
+    Returns:
+        Websocket URL including the api key
+    """
+    base = os.getenv("SUPABASE_REALTIME_URL")
+    if not base:
+        parsed = urlparse(supabase_url)
+        scheme = 'wss' if parsed.scheme == 'https' else 'ws'
+        base = f"{scheme}://{parsed.netloc}/realtime/v1/websocket"
+    separator = '&' if '?' in base else '?'
+    return f"{base}{separator}{urlencode({'apikey': api_key, 'vsn': '1.0.0'})}"
+
+
+def apply_to_cache(table: str, change_type: str, record: Dict[str, Any],
+                   old_record: Dict[str, Any]) -> None:
+    """Default change handler: patch the process-wide query cache."""
+    query_cache.apply_row_change(
+        table, change_type, record, old_record,
+        structural_columns=STRUCTURAL_COLUMNS.get(table, ())
+    )
+
+
+class ChangeFeed:
+    """
+    Consumer of Postgres changes over the Supabase Realtime (Phoenix) protocol.
+
+    Runs its own asyncio loop in a daemon thread and reconnects with
+    exponential backoff. Every change is passed to on_change.
+
+    Attributes:
+        url: Websocket URL (see realtime_url)
+        api_key: Key sent as access token when joining the channel
+        tables: Tables to subscribe to (schema public)
+        on_change: Callable(table, change_type, record, old_record)
+        connect: Websocket factory used as `async with connect(url) as ws`,
+            defaults to websockets.connect (injectable for tests)
+        connected: Set while the channel is joined
+    """
+
+    def __init__(self, url: str, api_key: str, tables: Iterable[str] = REALTIME_TABLES,
+                 on_change: Callable[[str, str, Dict[str, Any], Dict[str, Any]], None] = apply_to_cache,
+                 connect: Optional[Callable[[str], Any]] = None,
+                 heartbeat_seconds: float = HEARTBEAT_SECONDS):
+        self.url = url
+        self.api_key = api_key
+        self.tables = tuple(tables)
+        self.on_change = on_change
+        self.connect = connect
+        self.heartbeat_seconds = heartbeat_seconds
+        self.topic = 'realtime:nikaia-cache'
+        self.connected = threading.Event()
+        self._ref = 0
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start consuming changes in a background thread."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="nikaia-realtime", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close the connection and wait for the background thread."""
+        self._stopping = True
+        if self._loop is not None and self._main is not None:
+            self._loop.call_soon_threadsafe(self._main.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.connected.clear()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._main = self._loop.create_task(self._run_forever())
+        try:
+            self._loop.run_until_complete(self._main)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._main = None
+
+    async def _run_forever(self) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        while not self._stopping:
+            try:
+                await self._session()
+                delay = RECONNECT_MIN_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Realtime connection lost: {str(e)}")
+            finally:
+                self.connected.clear()
+
+            if self._stopping:
+                break
+            # Changes may have been missed while disconnected
+            query_cache.invalidate(*self.tables)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    # -------------------------------------------------------------------------
+    # Protocol
+    # -------------------------------------------------------------------------
+
+    def _message(self, topic: str, event: str, payload: Dict[str, Any]) -> str:
+        self._ref += 1
+        return json.dumps({'topic': topic, 'event': event, 'payload': payload, 'ref': str(self._ref)})
+
+    def join_message(self) -> str:
+        """phx_join message subscribing to every change of the tables."""
+        return self._message(self.topic, 'phx_join', {
+            'config': {
+                'broadcast': {'self': False},
+                'presence': {'key': ''},
+                'postgres_changes': [
+                    {'event': '*', 'schema': 'public', 'table': table} for table in self.tables
+                ]
+            },
+            'access_token': self.api_key
+        })
+
+    async def _session(self) -> None:
+        connect = self.connect or websockets.connect
+
+        async with connect(self.url) as ws:
+            await ws.send(self.join_message())
+            heartbeat = asyncio.ensure_future(self._heartbeat(ws))
+            try:
+                async for raw in ws:
+                    self.handle_message(raw)
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            await ws.send(self._message('phoenix', 'heartbeat', {}))
+
+    def handle_message(self, raw: Any) -> None:
+        """
+        Process one message received from the server.
+
+        Args:
+            raw: JSON text (or bytes) of a Phoenix message
+        """
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed realtime message")
+            return
+
+        event = message.get('event')
+        payload = message.get('payload') or {}
+
+        if event == 'phx_reply' and message.get('topic') == self.topic:
+            if payload.get('status') == 'ok':
+                self.connected.set()
+            else:
+                logger.error(f"Realtime subscription refused: {payload.get('response')}")
+        elif event == 'postgres_changes':
+            data = payload.get('data') or {}
+            table = data.get('table')
+            change_type = data.get('type') or data.get('eventType')
+            if table in self.tables and change_type in ('INSERT', 'UPDATE', 'DELETE'):
+                try:
+                    self.on_change(table, change_type, data.get('record') or {}, data.get('old_record') or {})
+                except Exception as e:
+                    logger.error(f"Error applying realtime change on {table}: {str(e)}")
+                    query_cache.invalidate(table)
+        elif event in ('phx_error', 'phx_close') and message.get('topic') == self.topic:
+            raise ConnectionError(f"Realtime channel {event}")
+
+
+# Process-wide feed, started once by start_change_feed()
+_feed: Optional[ChangeFeed] = None
+_feed_lock = threading.Lock()
+
+
+def realtime_enabled() -> bool:
+    """True when SUPABASE_REALTIME_ENABLED is set to true."""
+    return os.getenv("SUPABASE_REALTIME_ENABLED", "false").lower() == "true"
+
+
+def start_change_feed(supabase_url: str, api_key: str) -> ChangeFeed:
+    """
+    Start the process-wide change feed (once) and return it.
+
+    Args:
+        supabase_url: Project URL
+        api_key: Project API key
+    """
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = ChangeFeed(realtime_url(supabase_url, api_key), api_key)
+            _feed.start()
+            logger.info("Realtime change feed started")
+        return _feed
+
+
+def get_change_feed() -> Optional[ChangeFeed]:
+    """Get the running change feed, None if realtime is disabled."""
+    return _feed
@@ -0,0 +1,826 @@
+"""
+Replica Module
+Réplique locale (SQLite embarqué) des tables de l'application : un thread de
+synchronisation incrémentale la tient à jour et les lectures y sont servies
+sans aller-retour réseau, tandis que les écritures partent vers Supabase.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from .cache import query_cache
+from .repository import FOREIGN_KEYS, like_regex
+from .sync import FULL_RESYNC_AFTER, SYNC_OVERLAP, _parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+REPLICATED_TABLES = ('users', 'projects', 'subprojects', 'tasks', 'experiments', 'comments')
+
+# Columns the application filters and sorts on (expression indexes)
+INDEXED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'users': ('email', 'name'),
+    'projects': ('created_at', 'lead_id'),
+    'subprojects': ('created_at', 'project_id', 'lead_id'),
+    'tasks': ('created_at', 'subproject_id', 'assignee_id', 'status', 'due_date'),
+    'experiments': ('created_at', 'subproject_id', 'responsible_user_id', 'created_by', 'status'),
+    'comments': ('created_at', 'task_id', 'experiment_id', 'user_id'),
+}
+
+# Rows per request when reading from Supabase (PostgREST max-rows is 1000 by default)
+SYNC_PAGE_SIZE = 1000
+
+# Maximum bound parameters per IN (...) lookup
+LOOKUP_CHUNK = 500
+
+_COLUMN = re.compile(r'^\w+$')
+_COMPARISONS = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def replica_enabled() -> bool:
+    """True when DATA_BACKEND is set to replica."""
+    return os.getenv("DATA_BACKEND", "supabase").lower() == "replica"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class Unsupported(Exception):
+    """The request uses a PostgREST feature the replica doesn't implement."""
+
+
+# =====================================================
+# POSTGREST QUERY TRANSLATION
+# =====================================================
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == ',' and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    if current or parts:
+        parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+
+def _column(name: str) -> str:
+    """SQL expression of a column of the stored JSON rows."""
+    if not _COLUMN.match(name):
+        raise Unsupported(f"column {name!r}")
+    return 'id' if name == 'id' else f"json_extract(data, '$.{name}')"
+
+
+def _number(literal: str) -> Optional[float]:
+    """Numeric value of a filter operand (booleans are stored as 0/1), None for text."""
+    if literal in ('true', 'false'):
+        return 1 if literal == 'true' else 0
+    try:
+        return float(literal)
+    except ValueError:
+        return None
+
+
+def _pg_like(value: Any, pattern: str, case_sensitive: int) -> Optional[int]:
+    """LIKE/ILIKE with PostgreSQL semantics ('*' wildcard, Unicode case folding)."""
+    if value is None:
+        return None
+    return int(like_regex(pattern, bool(case_sensitive)).match(str(value)) is not None)
+
+
+def _condition(column: str, expression: str) -> Tuple[str, List[Any]]:
+    """
+    Translate a filter such as ('status', 'in.(todo,done)') to SQL.
+
+    Supports eq, neq, gt, gte, lt, lte, like, ilike, is, in and not.<op>.
+    """
+    negate = expression.startswith('not.')
+    if negate:
+        expression = expression[4:]
+    operator, _, operand = expression.partition('.')
+    target = _column(column)
+
+    if operator in _COMPARISONS:
+        sql_operator, literal = _COMPARISONS[operator], _unquote(operand)
+        number = _number(literal)
+        if number is None:
+            sql, params = f"{target} {sql_operator} ?", [literal]
+        else:
+            # Numbers and booleans are stored typed, other values as text
+            sql = (f"(CASE WHEN typeof({target}) IN ('integer', 'real') "
+                   f"THEN {target} {sql_operator} ? ELSE {target} {sql_operator} ? END)")
+            params = [number, literal]
+    elif operator in ('like', 'ilike'):
+        sql, params = f"pg_like({target}, ?, ?)", [_unquote(operand), int(operator == 'like')]
+    elif operator == 'is':
+        values = {'null': f"{target} IS NULL", 'true': f"{target} = 1", 'false': f"{target} = 0"}
+        if operand.lower() not in values:
+            raise Unsupported(f"is.{operand}")
+        sql, params = values[operand.lower()], []
+    elif operator == 'in' and operand.startswith('(') and operand.endswith(')'):
+        literals = [_unquote(item) for item in _split_top_level(operand[1:-1])]
+        if not literals:
+            return ('1' if negate else '0'), []
+        placeholders = ', '.join('?' * len(literals))
+        numbers = [_number(literal) for literal in literals]
+        if all(number is None for number in numbers):
+            sql, params = f"{target} IN ({placeholders})", literals
+        else:
+            sql = (f"(CASE WHEN typeof({target}) IN ('integer', 'real') "
+                   f"THEN {target} IN ({placeholders}) ELSE {target} IN ({placeholders}) END)")
+            params = numbers + literals
+    else:
+        raise Unsupported(f"operator {operator!r}")
+
+    return (f"NOT ({sql})" if negate else sql), params
+
+
+def _logic(expression: str, conjunction: str) -> Tuple[str, List[Any]]:
+    """Translate an or=(...) / and=(...) expression to SQL."""
+    if not (expression.startswith('(') and expression.endswith(')')):
+        raise Unsupported(f"{conjunction}={expression}")
+    clauses, params = [], []
+    for item in _split_top_level(expression[1:-1]):
+        negate = item.startswith('not.')
+        body = item[4:] if negate else item
+        match = re.match(r'^(and|or)(\(.*\))$', body, re.DOTALL)
+        if match:
+            sql, item_params = _logic(match.group(2), match.group(1))
+        else:
+            column, _, rest = body.partition('.')
+            sql, item_params = _condition(column, rest)
+        clauses.append(f"NOT ({sql})" if negate else f"({sql})")
+        params.extend(item_params)
+    if not clauses:
+        return '1', []
+    return f" {conjunction.upper()} ".join(clauses), params
+
+
+def _order(expression: str) -> str:
+    """Translate order=col.desc.nullslast,... with PostgreSQL's default NULL placement."""
+    terms = []
+    for item in _split_top_level(expression):
+        column, *modifiers = item.split('.')
+        direction = 'DESC' if 'desc' in modifiers else 'ASC'
+        nulls = 'FIRST' if direction == 'DESC' else 'LAST'
+        if 'nullsfirst' in modifiers:
+            nulls = 'FIRST'
+        elif 'nullslast' in modifiers:
+            nulls = 'LAST'
+        if set(modifiers) - {'asc', 'desc', 'nullsfirst', 'nullslast'}:
+            raise Unsupported(f"order={expression}")
+        terms.append(f"{_column(column)} {direction} NULLS {nulls}")
+    return ', '.join(terms)
+
+
+class _Field:
+    """One item of a select clause: a column, '*', or an embedded relation."""
+
+    __slots__ = ('name', 'alias', 'hint', 'children')
+
+    def __init__(self, name: str, alias: Optional[str] = None, hint: Optional[str] = None,
+                 children: Optional[List['_Field']] = None):
+        self.name = name
+        self.alias = alias or name
+        self.hint = hint
+        self.children = children
+
+
+@lru_cache(maxsize=128)
+def _parse_select(text: str) -> Tuple[_Field, ...]:
+    """Parse a select clause, e.g. '*, lead:users!projects_lead_id_fkey(id, name), comments(count)'."""
+    fields = []
+    for item in _split_top_level(text or '*'):
+        alias = None
+        match = re.match(r'^(\w+):(.*)$', item)
+        if match:
+            alias, item = match.group(1), match.group(2).strip()
+        if '(' in item and item.endswith(')'):
+            head, inner = item[:item.index('(')], item[item.index('(') + 1:-1]
+            table, _, hint = head.partition('!')
+            if table not in FOREIGN_KEYS or hint == 'inner':
+                raise Unsupported(f"embed {head!r}")
+            fields.append(_Field(table, alias, hint or None, list(_parse_select(inner))))
+        else:
+            name = item.split('::')[0]
+            if name != '*' and not _COLUMN.match(name):
+                raise Unsupported(f"select {item!r}")
+            fields.append(_Field(name, alias))
+    return tuple(fields)
+
+
+def _relation(table: str, field: _Field) -> Tuple[str, bool]:
+    """Resolve an embed to (foreign key column, many-to-one)."""
+    target = field.name
+
+    def hinted(owner: str) -> Optional[str]:
+        if field.hint and field.hint.startswith(f'{owner}_') and field.hint.endswith('_fkey'):
+            return field.hint[len(owner) + 1:-len('_fkey')]
+        return field.hint if field.hint in FOREIGN_KEYS[owner] else None
+
+    # Many-to-one: this table references the target
+    candidates = [c for c, (t, _) in FOREIGN_KEYS[table].items() if t == target]
+    column = hinted(table) if field.hint else None
+    if column in candidates or (not field.hint and len(candidates) == 1):
+        return column or candidates[0], True
+
+    # One-to-many: the target references this table
+    candidates = [c for c, (t, _) in FOREIGN_KEYS[target].items() if t == table]
+    column = hinted(target) if field.hint else None
+    if column in candidates or (not field.hint and len(candidates) == 1):
+        return column or candidates[0], False
+
+    raise Unsupported(f"relation {table} -> {target} ({field.hint})")
+
+
+def _stored_columns(table: str, fields: Iterable[_Field], extra: Tuple[str, ...] = ()) -> Optional[List[str]]:
+    """Columns to decode from the stored rows to project fields (None: the whole row)."""
+    columns = list(extra)
+    for field in fields:
+        if field.children is not None:
+            column, to_one = _relation(table, field)
+            columns.append(column if to_one else 'id')
+        elif field.name == '*':
+            return None
+        else:
+            columns.append(field.name)
+    return list(dict.fromkeys(columns))
+
+
+def _chunks(values: List[Any], size: int = LOOKUP_CHUNK) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _response(request: httpx.Request, body: str, count: int) -> httpx.Response:
+    content_range = f"0-{count - 1}/*" if count else "*/*"
+    return httpx.Response(
+        200,
+        content=body.encode('utf-8'),
+        headers={'content-type': 'application/json; charset=utf-8', 'content-range': content_range},
+        request=request,
+    )
+
+
+# =====================================================
+# REPLICA
+# =====================================================
+
+class Replica:
+    """
+    SQLite copy of the replicated tables, answering PostgREST reads.
+
+    Each table is stored as (id, data) with the row as JSON, so the schema
+    follows Supabase without migrations; the columns the application filters
+    and sorts on have expression indexes. A background thread keeps the copy
+    current with the same updated_at watermarks and deleted_rows tombstones
+    as utils/sync.py (migrations/006_incremental_sync.sql), and reloads
+    everything every FULL_RESYNC_AFTER (users have no delete trigger, their
+    deletions are only seen then).
+
+    Reads are served locally once the first sync has completed; until then,
+    and for anything the translation doesn't support, they go to Supabase.
+
+    Attributes:
+        path: SQLite database file
+        interval: Seconds between two background syncs
+        ready: True once the copy has been synced at least once
+    """
+
+    def __init__(self, path: str, interval: float = 15.0):
+        self.path = path
+        self.interval = interval
+        self.ready = False
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_created = False
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._http: Optional[httpx.Client] = None
+        self._tombstones_available = True
+
+    # ---- storage ----
+
+    def _connection(self) -> sqlite3.Connection:
+        """SQLite connection of the current thread (connections can't be shared)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.create_function('pg_like', 3, _pg_like, deterministic=True)
+            self._create_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_created:
+                return
+            statements = ['CREATE TABLE IF NOT EXISTS replica_state (key TEXT PRIMARY KEY, value TEXT)']
+            for table in REPLICATED_TABLES:
+                statements.append(f'CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+                for column in INDEXED_COLUMNS[table]:
+                    suffix = ', id' if column == 'created_at' else ''
+                    statements.append(
+                        f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({_column(column)}{suffix})'
+                    )
+            for statement in statements:
+                connection.execute(statement)
+            self._schema_created = True
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self._connection().execute('SELECT value FROM replica_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, connection: sqlite3.Connection, key: str, value: Optional[str]) -> None:
+        connection.execute(
+            'INSERT INTO replica_state (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value', (key, value)
+        )
+
+    def _upsert(self, connection: sqlite3.Connection, table: str, rows: List[Dict[str, Any]]) -> int:
+        """Store rows, returning how many were new or different."""
+        before = connection.total_changes
+        connection.executemany(
+            f'INSERT INTO {table} (id, data) VALUES (?, ?) '
+            f'ON CONFLICT(id) DO UPDATE SET data = excluded.data WHERE data <> excluded.data',
+            [(row['id'], json.dumps(row)) for row in rows if row.get('id')],
+        )
+        return connection.total_changes - before
+
+    def _delete(self, connection: sqlite3.Connection, table: str, ids: List[str]) -> Set[str]:
+        """
+        Delete rows and apply the ON DELETE actions of the rows referencing them.
+
+        'restrict' and 'no action' columns are left alone: Supabase already
+        rejected any delete they would have blocked.
+
+        Returns:
+            Tables that changed
+        """
+        changed: Set[str] = set()
+        pending = [(table, ids)]
+        while pending:
+            table, ids = pending.pop()
+            deleted = []
+            for chunk in _chunks(ids):
+                placeholders = ', '.join('?' * len(chunk))
+                deleted += [r[0] for r in connection.execute(
+                    f'DELETE FROM {table} WHERE id IN ({placeholders}) RETURNING id', chunk
+                )]
+            if not deleted:
+                continue
+            changed.add(table)
+            for child, columns in FOREIGN_KEYS.items():
+                for column, (parent, action) in columns.items():
+                    if parent != table:
+                        continue
+                    for chunk in _chunks(deleted):
+                        placeholders = ', '.join('?' * len(chunk))
+                        where = f"{_column(column)} IN ({placeholders})"
+                        if action == 'cascade':
+                            child_ids = [r[0] for r in connection.execute(
+                                f'SELECT id FROM {child} WHERE {where}', chunk
+                            )]
+                            if child_ids:
+                                pending.append((child, child_ids))
+                        elif action == 'set null':
+                            cursor = connection.execute(
+                                f"UPDATE {child} SET data = json_set(data, '$.{column}', NULL) WHERE {where}", chunk
+                            )
+                            if cursor.rowcount:
+                                changed.add(child)
+        return changed
+
+    def reset(self) -> None:
+        """Drop every replicated row and watermark (the next sync is a full one)."""
+        connection = self._connection()
+        with self._sync_lock:
+            connection.execute('BEGIN IMMEDIATE')
+            for table in REPLICATED_TABLES:
+                connection.execute(f'DELETE FROM {table}')
+            connection.execute('DELETE FROM replica_state')
+            connection.execute('COMMIT')
+            self.ready = False
+
+    # ---- reads ----
+
+    def _read(self, table: str, fields: Iterable[_Field], query: str, params: Iterable[Any],
+              extra: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+        """
+        Run `SELECT <row> FROM table <query>`, decoding only the columns fields need.
+
+        Args:
+            fields: Select clause the rows will be projected with
+            query: WHERE / ORDER BY / LIMIT part of the statement
+            extra: Columns needed besides the ones of fields
+        """
+        columns = _stored_columns(table, fields, extra)
+        if columns is None:
+            expression = 'data'
+        elif len(columns) == 1:
+            expression = f"json_array(data -> '$.{columns[0]}')"
+        else:
+            # One JSON parse per row: with several paths json_extract returns an array
+            paths = ', '.join(f"'$.{column}'" for column in columns)
+            expression = f"json_extract(data, {paths})"
+        cursor = self._connection().execute(f'SELECT {expression} FROM {table} {query}', list(params))
+        if columns is None:
+            return [json.loads(r[0]) for r in cursor]
+        return [dict(zip(columns, json.loads(r[0]))) for r in cursor]
+
+    def _rows_where(self, table: str, column: str, values: Iterable[Any],
+                    fields: Iterable[_Field]) -> List[Dict[str, Any]]:
+        rows = []
+        for chunk in _chunks(list(values)):
+            placeholders = ', '.join('?' * len(chunk))
+            rows += self._read(table, fields, f'WHERE {_column(column)} IN ({placeholders})', chunk,
+                               extra=('id', column))
+        return rows
+
+    def _counts(self, table: str, column: str, values: List[Any]) -> Dict[Any, int]:
+        connection = self._connection()
+        counts: Dict[Any, int] = {}
+        target = _column(column)
+        for chunk in _chunks(values):
+            placeholders = ', '.join('?' * len(chunk))
+            counts.update(connection.execute(
+                f'SELECT {target}, COUNT(*) FROM {table} WHERE {target} IN ({placeholders}) GROUP BY 1', chunk
+            ).fetchall())
+        return counts
+
+    def _project(self, table: str, rows: List[Dict[str, Any]],
+                 fields: Iterable[_Field]) -> List[Dict[str, Any]]:
+        """Apply a select clause to stored rows, resolving embedded relations."""
+        embedded: Dict[str, List[Any]] = {}
+        for field in fields:
+            if field.children is None:
+                continue
+            column, to_one = _relation(table, field)
+            if to_one:
+                related = self._rows_where(field.name, 'id', {row.get(column) for row in rows} - {None},
+                                           field.children)
+                projected = dict(zip(
+                    (r['id'] for r in related), self._project(field.name, related, field.children)
+                ))
+                embedded[field.alias] = [projected.get(row.get(column)) for row in rows]
+            elif [child.name for child in field.children] == ['count']:
+                counts = self._counts(field.name, column, [row['id'] for row in rows])
+                embedded[field.alias] = [[{'count': counts.get(row['id'], 0)}] for row in rows]
+            else:
+                related = self._rows_where(field.name, column, [row['id'] for row in rows], field.children)
+                by_parent: Dict[Any, List[Dict[str, Any]]] = {}
+                for parent_id, item in zip((r.get(column) for r in related),
+                                           self._project(field.name, related, field.children)):
+                    by_parent.setdefault(parent_id, []).append(item)
+                embedded[field.alias] = [by_parent.get(row['id'], []) for row in rows]
+
+        output = []
+        for index, row in enumerate(rows):
+            item: Dict[str, Any] = {}
+            for field in fields:
+                if field.children is not None:
+                    item[field.alias] = embedded[field.alias][index]
+                elif field.name == '*':
+                    item.update(row)
+                else:
+                    item[field.alias] = row.get(field.name)
+            output.append(item)
+        return output
+
+    def serve(self, table: str, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a PostgREST GET on a replicated table.
+
+        Raises:
+            Unsupported: The request needs Supabase (exact counts, single
+                object responses, embedded filters, unknown operators...)
+        """
+        if 'count=' in request.headers.get('prefer', '') or 'vnd.pgrst' in request.headers.get('accept', ''):
+            raise Unsupported("count or single object response")
+
+        fields, clauses, params = _parse_select('*'), [], []
+        order, limit, offset = None, None, None
+        for key, value in request.url.params.multi_items():
+            if key == 'select':
+                fields = _parse_select(value)
+            elif key == 'order':
+                order = _order(value)
+            elif key in ('limit', 'offset'):
+                if not value.isdigit():
+                    raise Unsupported(f"{key}={value}")
+                limit, offset = (int(value), offset) if key == 'limit' else (limit, int(value))
+            elif key in ('or', 'and', 'not.or', 'not.and'):
+                sql, clause_params = _logic(value, key.rpartition('.')[2])
+                clauses.append(f"NOT ({sql})" if key.startswith('not.') else f"({sql})")
+                params.extend(clause_params)
+            else:
+                sql, clause_params = _condition(key, value)
+                clauses.append(sql)
+                params.extend(clause_params)
+
+        query = ""
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        if order:
+            query += f" ORDER BY {order}"
+        if limit is not None or offset is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset or 0]
+
+        if len(fields) == 1 and fields[0].name == '*' and fields[0].children is None:
+            # Rows are returned as stored, without decoding them
+            stored = [r[0] for r in self._connection().execute(f"SELECT data FROM {table}{query}", params)]
+            return _response(request, f"[{','.join(stored)}]", len(stored))
+        rows = self._project(table, self._read(table, fields, query, params), fields)
+        return _response(request, json.dumps(rows), len(rows))
+
+    def dashboard_stats(self, request: httpx.Request) -> httpx.Response:
+        """Answer the get_dashboard_stats RPC (migrations/002_dashboard_stats.sql) locally."""
+        today = json.loads(request.content or b'{}').get('p_today') or datetime.now().date().isoformat()
+        status, priority = _column('status'), _column('priority')
+        row = self._connection().execute(f"""
+            SELECT
+              (SELECT COUNT(*) FROM projects),
+              (SELECT COUNT(*) FROM projects WHERE {status} = 'active'),
+              (SELECT COUNT(*) FROM subprojects),
+              COUNT(*),
+              COUNT(*) FILTER (WHERE {status} = 'done'),
+              COUNT(*) FILTER (WHERE {status} = 'in-progress'),
+              COUNT(*) FILTER (WHERE {status} = 'todo'),
+              COUNT(*) FILTER (WHERE {priority} = 'high'),
+              COUNT(*) FILTER (WHERE {priority} = 'urgent'),
+              COUNT(*) FILTER (WHERE substr({_column('due_date')}, 1, 10) < ? AND {status} <> 'done')
+            FROM tasks
+        """, (today,)).fetchone()
+        keys = ('total_projects', 'active_projects', 'total_subprojects', 'total_tasks', 'completed_tasks',
+                'in_progress_tasks', 'todo_tasks', 'high_priority_tasks', 'urgent_priority_tasks', 'overdue_tasks')
+        stats: Dict[str, Any] = dict(zip(keys, row))
+        stats['completion_rate'] = stats['completed_tasks'] * 100.0 / stats['total_tasks'] if stats['total_tasks'] else 0
+        return _response(request, json.dumps([stats]), 1)
+
+    # ---- writes made by this process ----
+
+    def apply_write(self, table: str, request: httpx.Request, response: httpx.Response) -> None:
+        """
+        Reflect a successful insert/update/delete before the next sync.
+
+        The rows returned by the write (Prefer: return=representation) are
+        stored or removed right away, so the next read sees them; without
+        them the background sync is woken up.
+        """
+        try:
+            rows = response.json() if response.content else None
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list):
+            self.request_sync()
+            return
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if request.method == 'DELETE':
+                changed = self._delete(connection, table, [row['id'] for row in rows if row.get('id')])
+            else:
+                changed = {table} if self._upsert(connection, table, rows) else set()
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        # The caller invalidated the table it wrote to; cascades may reach others
+        changed.discard(table)
+        if changed:
+            query_cache.invalidate(*changed)
+
+    # ---- sync ----
+
+    def start(self, transport: httpx.BaseTransport, base_url: str, headers: Dict[str, str],
+              repoint: bool = False) -> None:
+        """
+        Point the sync at Supabase through transport and start the sync thread (once).
+
+        Later calls (e.g. from other pooled clients) keep the first sync
+        client, unless repoint is set for a different backend.
+        """
+        if self._http is not None:
+            if not repoint:
+                return
+            self._http.close()
+        self._http = httpx.Client(base_url=base_url, headers=headers, transport=transport, timeout=60)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def request_sync(self) -> None:
+        """Run the background sync now instead of at the next interval."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                # Reads keep being served from the last synced copy
+                logger.warning(f"Replica sync failed: {str(e)}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _get_pages(self, path: str, params: Dict[str, str], key: str = 'id') -> List[Dict[str, Any]]:
+        """Read every row matching params, SYNC_PAGE_SIZE at a time (keyset on key)."""
+        rows: List[Dict[str, Any]] = []
+        last = None
+        while True:
+            page_params = {**params, 'order': f'{key}.asc', 'limit': str(SYNC_PAGE_SIZE)}
+            if last is not None:
+                page_params[key] = f'gt.{last}'
+            response = self._http.get(path, params=page_params)
+            response.raise_for_status()
+            page = response.json()
+            rows += page
+            if len(page) < SYNC_PAGE_SIZE:
+                return rows
+            last = page[-1][key]
+
+    @staticmethod
+    def _latest(rows: List[Dict[str, Any]], column: str, current: Optional[str]) -> Optional[str]:
+        stamps = [row[column] for row in rows if row.get(column)]
+        if current:
+            stamps.append(current)
+        return max(stamps, key=_parse_timestamp) if stamps else None
+
+    def sync(self) -> Set[str]:
+        """
+        Bring the copy up to date with Supabase (full reload when due).
+
+        Returns:
+            Tables that changed
+        """
+        if self._http is None:
+            raise RuntimeError("Replica sync not started")
+
+        with self._sync_lock:
+            full_sync_at = self._state('full_sync_at')
+            full = full_sync_at is None or datetime.now() - datetime.fromisoformat(full_sync_at) > FULL_RESYNC_AFTER
+
+            # Rows are read before the write transaction, so local reads aren't blocked meanwhile
+            fetched: Dict[str, List[Dict[str, Any]]] = {}
+            watermarks: Dict[str, Optional[str]] = {}
+            for table in REPLICATED_TABLES:
+                params = {'select': '*'}
+                watermark = None if full else self._state(f'{table}.watermark')
+                if watermark:
+                    params['updated_at'] = f'gt.{(_parse_timestamp(watermark) - SYNC_OVERLAP).isoformat()}'
+                fetched[table] = self._get_pages(f'/{table}', params)
+                watermarks[table] = self._latest(fetched[table], 'updated_at', watermark)
+
+            tombstones: List[Dict[str, Any]] = []
+            tombstone_watermark = self._state('tombstones.watermark')
+            if not full and self._tombstones_available:
+                tombstones = self._fetch_tombstones(tombstone_watermark)
+            if full:
+                tombstone_watermark = max(filter(None, watermarks.values()), key=_parse_timestamp, default=None)
+            else:
+                tombstone_watermark = self._latest(tombstones, 'deleted_at', tombstone_watermark)
+
+            connection = self._connection()
+            changed: Set[str] = set()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                for table in REPLICATED_TABLES:
+                    if full:
+                        changed.add(table)
+                        connection.execute(f'DELETE FROM {table}')
+                    if self._upsert(connection, table, fetched[table]):
+                        changed.add(table)
+                    self._set_state(connection, f'{table}.watermark', watermarks[table])
+                for table in REPLICATED_TABLES:
+                    ids = [t['row_id'] for t in tombstones if t['table_name'] == table]
+                    if ids:
+                        changed |= self._delete(connection, table, ids)
+                self._set_state(connection, 'tombstones.watermark', tombstone_watermark)
+                if full:
+                    self._set_state(connection, 'full_sync_at', datetime.now().isoformat())
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+        self.ready = True
+        if changed:
+            query_cache.invalidate(*changed)
+        logger.debug(f"Replica {'full' if full else 'delta'} sync: changed {sorted(changed) or 'nothing'}")
+        return changed
+
+    def _fetch_tombstones(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        params = {
+            'select': 'id, table_name, row_id, deleted_at',
+            'table_name': f"in.({','.join(REPLICATED_TABLES)})",
+        }
+        if since:
+            params['deleted_at'] = f'gt.{(_parse_timestamp(since) - SYNC_OVERLAP).isoformat()}'
+        try:
+            return self._get_pages('/deleted_rows', params)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            self._tombstones_available = False
+            logger.warning("deleted_rows is missing (migrations/006_incremental_sync.sql): "
+                           "deletions reach the replica only on full resyncs")
+            return []
+
+
+# Process-wide instance shared by all sessions
+replica = Replica(
+    os.getenv("REPLICA_PATH", "nikaia_replica.db"),
+    interval=_env_float("REPLICA_SYNC_INTERVAL", 15),
+)
+
+
+# =====================================================
+# TRANSPORT
+# =====================================================
+
+class ReplicaTransport(httpx.BaseTransport):
+    """
+    httpx transport serving reads from the replica and sending writes to Supabase.
+
+    GETs on the replicated tables (and the get_dashboard_stats RPC) are
+    answered locally once the replica is ready; anything else, including the
+    full-text search RPC, goes through the wrapped transport. Successful
+    writes to replicated tables are applied to the replica immediately.
+
+    Attributes:
+        transport: Wrapped transport to Supabase
+        replica: Replica answering the reads
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, replica: Replica):
+        self.transport = transport
+        self.replica = replica
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        name = path.rsplit('/', 1)[-1]
+        table = name if '/rpc/' not in path and name in REPLICATED_TABLES else None
+
+        if self.replica.ready:
+            try:
+                if request.method == 'GET' and table:
+                    return self.replica.serve(table, request)
+                if request.method == 'POST' and path.endswith('/rpc/get_dashboard_stats'):
+                    request.read()
+                    return self.replica.dashboard_stats(request)
+            except Unsupported as e:
+                logger.debug(f"Replica can't serve {request.method} {path}: {str(e)}")
+
+        response = self.transport.handle_request(request)
+        if table and request.method in ('POST', 'PATCH', 'PUT', 'DELETE') and response.status_code < 300:
+            response.read()
+            try:
+                self.replica.apply_write(table, request, response)
+            except Exception as e:
+                logger.warning(f"Could not apply write to the replica, waiting for the next sync: {str(e)}")
+                self.replica.request_sync()
+        return response
+
+
+def replica_transport(transport: httpx.BaseTransport, base_url: str,
+                      headers: Dict[str, str], repoint: bool = False) -> httpx.BaseTransport:
+    """Wrap a transport with the process-wide replica (and start its sync thread, see Replica.start)."""
+    replica.start(transport, base_url, headers, repoint)
+    return ReplicaTransport(transport, replica)
@@ -0,0 +1,679 @@
+"""
+Repository Module
+Interface d'accès aux données par entité (list/get/create/update/delete/aggregate),
+avec une implémentation Supabase (PostgREST) et une implémentation en mémoire.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .pagination import Cursor, or_filter, split_page
+from .supabase_client import get_supabase_client
+from .sync import incremental_sync, incremental_sync_enabled
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# ENTITIES
+# =====================================================
+
+class Relation:
+    """Row of another table embedded in each row, through a foreign key of the row."""
+
+    __slots__ = ('alias', 'table', 'column', 'fields', 'relations')
+
+    def __init__(self, alias: str, table: str, column: str, fields: str,
+                 relations: Tuple['Relation', ...] = ()):
+        self.alias = alias
+        self.table = table
+        self.column = column
+        self.fields = fields
+        self.relations = relations
+
+
+class Entity:
+    """
+    A table as the application reads it.
+
+    Attributes:
+        table: Table name
+        projections: Column sets by name ('summary' and 'detail' default to every column)
+        relations: Rows embedded in each row (many-to-one)
+        counts: Embedded row counts, alias -> (table, foreign key column)
+        order: Default order, (column, descending) pairs
+        incremental: Full-table reads may use utils/sync.py (updated_at and tombstones)
+    """
+
+    __slots__ = ('table', 'projections', 'relations', 'counts', 'order', 'incremental')
+
+    def __init__(self, table: str, projections: Optional[Dict[str, str]] = None,
+                 relations: Tuple[Relation, ...] = (), counts: Optional[Dict[str, Tuple[str, str]]] = None,
+                 order: Tuple[Tuple[str, bool], ...] = (('created_at', True),), incremental: bool = False):
+        self.table = table
+        self.projections = {'all': '*', 'summary': '*', 'detail': '*', 'id': 'id', **(projections or {})}
+        self.relations = relations
+        self.counts = counts or {}
+        self.order = order
+        self.incremental = incremental
+
+
+USER_FIELDS = 'id, name, email'
+
+# Column sets ("projections"): list views don't show the long text fields
+TASK_SUMMARY_COLUMNS = (
+    'id, subproject_id, title, assignee_id, status, priority, start_date, due_date, '
+    'estimated_hours, actual_hours, created_at, updated_at'
+)
+
+# search_vector (a large tsvector only used by search_experiments) is never selected
+EXPERIMENT_SUMMARY_COLUMNS = (
+    'id, title, objective, subproject_id, responsible_user_id, status, priority, '
+    'planned_date, start_date, completion_date, deadline, '
+    'estimated_duration_hours, actual_duration_hours, tags, '
+    'created_at, updated_at, created_by'
+)
+
+SUBPROJECT_WITH_PROJECT = Relation(
+    'subproject', 'subprojects', 'subproject_id', 'id, name, project_id',
+    (Relation('project', 'projects', 'project_id', 'id, name'),)
+)
+
+USERS = Entity('users', order=(('name', False),))
+PROJECTS = Entity(
+    'projects',
+    relations=(Relation('lead', 'users', 'lead_id', USER_FIELDS),),
+    incremental=True,
+)
+SUBPROJECTS = Entity(
+    'subprojects',
+    relations=(
+        Relation('project', 'projects', 'project_id', 'id, name'),
+        Relation('lead', 'users', 'lead_id', USER_FIELDS),
+    ),
+    incremental=True,
+)
+TASKS = Entity(
+    'tasks',
+    projections={'summary': TASK_SUMMARY_COLUMNS, 'detail': f'{TASK_SUMMARY_COLUMNS}, description'},
+    relations=(SUBPROJECT_WITH_PROJECT, Relation('assignee', 'users', 'assignee_id', USER_FIELDS)),
+    counts={'comment_count': ('comments', 'task_id')},
+    incremental=True,
+)
+EXPERIMENTS = Entity(
+    'experiments',
+    projections={
+        'summary': EXPERIMENT_SUMMARY_COLUMNS,
+        'detail': f'{EXPERIMENT_SUMMARY_COLUMNS}, '
+                  'description, protocol, conditions, observations, results_summary',
+    },
+    relations=(
+        SUBPROJECT_WITH_PROJECT,
+        Relation('responsible', 'users', 'responsible_user_id', USER_FIELDS),
+        Relation('creator', 'users', 'created_by', USER_FIELDS),
+    ),
+    counts={'comment_count': ('comments', 'experiment_id')},
+    incremental=True,
+)
+COMMENTS = Entity('comments', relations=(Relation('user', 'users', 'user_id', USER_FIELDS),))
+
+# Foreign keys between tables: column -> (referenced table, ON DELETE action).
+# 'no action' (no ON DELETE clause) rejects the delete like 'restrict'.
+FOREIGN_KEYS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    'users': {},
+    'projects': {'lead_id': ('users', 'set null')},
+    'subprojects': {'project_id': ('projects', 'cascade'), 'lead_id': ('users', 'set null')},
+    'tasks': {'subproject_id': ('subprojects', 'cascade'), 'assignee_id': ('users', 'set null')},
+    'experiments': {
+        'subproject_id': ('subprojects', 'cascade'),
+        'responsible_user_id': ('users', 'restrict'),
+        # migrations/001_create_experiments.sql declares no ON DELETE action
+        'created_by': ('users', 'no action'),
+    },
+    'comments': {
+        'task_id': ('tasks', 'cascade'),
+        'experiment_id': ('experiments', 'cascade'),
+        'user_id': ('users', 'cascade'),
+    },
+}
+
+# Column defaults of schema.sql applied on insert
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    'projects': {'status': 'planning'},
+    'subprojects': {'status': 'not-started'},
+    'tasks': {'status': 'todo', 'priority': 'medium'},
+    'experiments': {'status': 'planned', 'priority': 'medium'},
+}
+
+# Column weights of the experiments search (title first, as search_vector)
+SEARCH_WEIGHTS = (
+    ('title', 1.0), ('objective', 0.4), ('description', 0.4), ('protocol', 0.2),
+    ('conditions', 0.2), ('observations', 0.2), ('results_summary', 0.2),
+)
+
+# Newest first, ties broken on id: the order keyset pages follow
+KEYSET_ORDER = (('created_at', True), ('id', True))
+
+
+# =====================================================
+# FILTERS
+# =====================================================
+
+class AnyOf(tuple):
+    """Conditions of which at least one must hold (OR)."""
+
+    def __new__(cls, *conditions):
+        return super().__new__(cls, conditions)
+
+
+class AllOf(tuple):
+    """Conditions that must all hold (AND), e.g. inside an AnyOf."""
+
+    def __new__(cls, *conditions):
+        return super().__new__(cls, conditions)
+
+
+# (column, operator, value). Operators: eq, neq, gt, gte, lt, lte, like, ilike,
+# in (None in the values matches NULL) and is (None, True or False), each
+# optionally prefixed with 'not.'
+Condition = Union[Tuple[str, str, Any], AnyOf, AllOf]
+
+
+def keyset_condition(cursor: Cursor) -> Condition:
+    """Rows after a (created_at, id) cursor in KEYSET_ORDER."""
+    created_at, row_id = cursor
+    return AnyOf(('created_at', 'lt', created_at),
+                 AllOf(('created_at', 'eq', created_at), ('id', 'lt', row_id)))
+
+
+# =====================================================
+# INTERFACE
+# =====================================================
+
+class Repository(ABC):
+    """
+    Data access for the entities of the application.
+
+    Rows are plain dictionaries: the columns of the projection, each
+    relation of the entity under its alias, and with counts=True each
+    count of the entity as an int. Methods raise on backend errors; the
+    CRUD modules report them. Backends implement list, create, update,
+    delete and aggregate; get and page are built on list.
+    """
+
+    @abstractmethod
+    def list(self, entity: Entity, filters: Sequence[Condition] = (), projection: str = 'summary',
+             order: Optional[Sequence[Tuple[str, bool]]] = None, limit: Optional[int] = None,
+             relations: bool = True, counts: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get the rows matching every filter.
+
+        Args:
+            entity: Entity to read
+            filters: Conditions (see Condition)
+            projection: Name of a column set of the entity
+            order: (column, descending) pairs, entity.order if None
+            limit: Maximum number of rows
+            relations: Embed the related rows of the entity
+            counts: Embed the row counts of the entity (e.g. comment_count)
+        """
+
+    def get(self, entity: Entity, row_id: str, projection: str = 'detail') -> Optional[Dict[str, Any]]:
+        """Get one row (with its relations) by id, None if it doesn't exist."""
+        rows = self.list(entity, [('id', 'eq', row_id)], projection, order=())
+        return rows[0] if rows else None
+
+    def page(self, entity: Entity, filters: Sequence[Condition] = (), page_size: int = 25,
+             cursor: Optional[Cursor] = None, projection: str = 'summary',
+             counts: bool = False) -> Dict[str, Any]:
+        """
+        Get one page of rows, newest first, using keyset pagination on (created_at, id).
+
+        Returns:
+            Dictionary with 'items' and 'next_cursor' (see pagination.split_page)
+        """
+        conditions = list(filters)
+        if cursor:
+            conditions.append(keyset_condition(cursor))
+        # One extra row tells whether a next page exists
+        rows = self.list(entity, conditions, projection, order=KEYSET_ORDER,
+                         limit=page_size + 1, counts=counts)
+        return split_page(rows, page_size)
+
+    @abstractmethod
+    def create(self, entity: Entity, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert a row, returning it as stored (defaults, id and timestamps filled in)."""
+
+    @abstractmethod
+    def update(self, entity: Entity, filters: Sequence[Condition], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update the rows matching filters, returning the updated rows."""
+
+    @abstractmethod
+    def delete(self, entity: Entity, filters: Sequence[Condition]) -> List[Dict[str, Any]]:
+        """Delete the rows matching filters (ON DELETE actions apply), returning them."""
+
+    @abstractmethod
+    def aggregate(self, name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run a named aggregate (a database function), e.g. get_dashboard_stats.
+
+        Raises:
+            NotImplementedError: The backend doesn't provide this aggregate
+        """
+
+
+# =====================================================
+# SUPABASE
+# =====================================================
+
+def _embed(owner: str, relation: Relation) -> str:
+    """PostgREST embed of a relation, with the foreign key named to avoid ambiguity."""
+    inner = ', '.join([relation.fields] + [_embed(relation.table, r) for r in relation.relations])
+    return f'{relation.alias}:{relation.table}!{owner}_{relation.column}_fkey({inner})'
+
+
+def select_clause(entity: Entity, projection: str, relations: bool = True, counts: bool = False) -> str:
+    """PostgREST select clause of a projection of entity."""
+    parts = [entity.projections[projection]]
+    if relations:
+        parts += [_embed(entity.table, relation) for relation in entity.relations]
+    if counts:
+        parts += [f'{alias}:{table}!{table}_{column}_fkey(count)'
+                  for alias, (table, column) in entity.counts.items()]
+    return ', '.join(parts)
+
+
+def _literal(value: Any) -> str:
+    """Filter operand, quoted when it contains PostgREST reserved characters."""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    text = str(value)
+    if any(char in text for char in ',.:()" '):
+        escaped = text.replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{escaped}"'
+    return text
+
+
+def _in_with_null(condition: Tuple[str, str, Any]) -> Optional[Condition]:
+    """Rewrite `column in (.., None)` as `column is null OR column in (..)`."""
+    column, operator, values = condition
+    if operator != 'in' or None not in values:
+        return None
+    others = [value for value in values if value is not None]
+    if not others:
+        return (column, 'is', None)
+    return AnyOf((column, 'is', None), (column, 'in', others))
+
+
+def _render(condition: Condition) -> str:
+    """A condition in the syntax of or=(...) / and=(...)."""
+    if isinstance(condition, (AnyOf, AllOf)):
+        keyword = 'or' if isinstance(condition, AnyOf) else 'and'
+        return f"{keyword}({','.join(_render(item) for item in condition)})"
+    rewritten = _in_with_null(condition)
+    if rewritten is not None:
+        return _render(rewritten)
+    column, operator, value = condition
+    base = operator[4:] if operator.startswith('not.') else operator
+    if base == 'in':
+        return f"{column}.{operator}.({','.join(_literal(item) for item in value)})"
+    return f"{column}.{operator}.{_literal(value)}"
+
+
+def apply_filters(query, filters: Sequence[Condition]):
+    """Add conditions to a postgrest-py filter builder."""
+    for condition in filters:
+        if isinstance(condition, AllOf):
+            query = apply_filters(query, condition)
+            continue
+        if not isinstance(condition, AnyOf):
+            condition = _in_with_null(condition) or condition
+        if isinstance(condition, (AnyOf, AllOf)):
+            query = or_filter(query, ','.join(_render(item) for item in condition))
+            continue
+
+        column, operator, value = condition
+        if operator.startswith('not.'):
+            query, operator = query.not_, operator[4:]
+        if operator == 'in':
+            query = query.in_(column, list(value))
+        elif operator == 'is':
+            query = query.is_(column, _literal(value))
+        else:
+            query = query.filter(column, operator, value)
+    return query
+
+
+def _order_param(order: Sequence[Tuple[str, bool]]) -> str:
+    return ','.join(f"{column}.desc" if desc else column for column, desc in order)
+
+
+def _flatten_counts(entity: Entity, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn embedded counts ([{'count': n}]) into ints."""
+    for row in rows:
+        for alias in entity.counts:
+            embedded = row.get(alias)
+            if isinstance(embedded, list):
+                row[alias] = embedded[0]['count'] if embedded else 0
+    return rows
+
+
+class SupabaseRepository(Repository):
+    """
+    Repository reading and writing through the Supabase REST API (PostgREST).
+
+    Relations and counts are embedded in the same request. Unfiltered
+    full-table reads of incremental entities go through utils/sync.py
+    when SYNC_MODE=incremental (they then carry no counts). Connection
+    pooling, retries and the local replica apply at the HTTP level (see
+    utils/supabase_client.py).
+    """
+
+    def list(self, entity, filters=(), projection='summary', order=None, limit=None,
+             relations=True, counts=False):
+        order = entity.order if order is None else order
+        if (entity.incremental and incremental_sync_enabled() and not filters and limit is None
+                and tuple(order) == entity.order):
+            return incremental_sync.fetch(entity.table, select_clause(entity, projection, relations))
+
+        client = get_supabase_client()
+        query = apply_filters(
+            client.table(entity.table).select(select_clause(entity, projection, relations, counts)), filters
+        )
+        if order:
+            # PostgREST expects a single `order` parameter listing every sort column
+            query.params = query.params.add('order', _order_param(order))
+        if limit is not None:
+            query = query.limit(limit)
+        rows = query.execute().data or []
+        return _flatten_counts(entity, rows) if counts else rows
+
+    def create(self, entity, data):
+        response = get_supabase_client().table(entity.table).insert(data).execute()
+        return response.data[0] if response.data else None
+
+    def update(self, entity, filters, data):
+        query = get_supabase_client().table(entity.table).update(data)
+        return apply_filters(query, filters).execute().data or []
+
+    def delete(self, entity, filters):
+        query = get_supabase_client().table(entity.table).delete()
+        return apply_filters(query, filters).execute().data or []
+
+    def aggregate(self, name, params):
+        return get_supabase_client().rpc(name, params).execute().data or []
+
+
+# =====================================================
+# IN MEMORY
+# =====================================================
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=256)
+def like_regex(pattern: str, case_sensitive: bool) -> 're.Pattern':
+    """Regex of a LIKE/ILIKE pattern with PostgreSQL semantics ('%' or '*' for any text, '_' for one character)."""
+    parts = [re.escape(part).replace('_', '.') for part in re.split(r'[*%]', pattern)]
+    flags = re.DOTALL if case_sensitive else re.IGNORECASE | re.DOTALL
+    return re.compile('^' + '.*'.join(parts) + '$', flags)
+
+
+def _predicate(condition: Condition):
+    """Row predicate of a condition (NULL never matches a comparison, as in SQL)."""
+    if isinstance(condition, (AnyOf, AllOf)):
+        predicates = [_predicate(item) for item in condition]
+        if isinstance(condition, AnyOf):
+            return lambda row: any(p(row) for p in predicates)
+        return lambda row: all(p(row) for p in predicates)
+
+    column, operator, value = condition
+    negate = operator.startswith('not.')
+    operator = operator[4:] if negate else operator
+
+    if operator == 'is':
+        test = lambda v: v is value if value is None else v == value  # noqa: E731
+        return (lambda row: not test(row.get(column))) if negate else (lambda row: test(row.get(column)))
+    if operator == 'in':
+        values = set(value)
+        matches_null = None in values
+        test = lambda v: v in values  # noqa: E731
+    elif operator in ('like', 'ilike'):
+        regex = like_regex(value, operator == 'like')
+        matches_null = False
+        test = lambda v: regex.match(str(v)) is not None  # noqa: E731
+    else:
+        compare = {
+            'eq': lambda v: v == value, 'neq': lambda v: v != value,
+            'gt': lambda v: v > value, 'gte': lambda v: v >= value,
+            'lt': lambda v: v < value, 'lte': lambda v: v <= value,
+        }[operator]
+        matches_null = False
+        test = compare
+
+    def predicate(row):
+        v = row.get(column)
+        if v is None:
+            return matches_null and not negate
+        return test(v) != negate
+    return predicate
+
+
+def _columns(row: Dict[str, Any], fields: str) -> Dict[str, Any]:
+    if fields.strip() == '*':
+        return dict(row)
+    return {name: row.get(name) for name in (f.strip() for f in fields.split(','))}
+
+
+def _sort(rows: List[Dict[str, Any]], order: Sequence[Tuple[str, bool]]) -> None:
+    """Sort in place, NULLs last ascending and first descending (as PostgreSQL)."""
+    for column, desc in reversed(order):
+        rows.sort(key=lambda row: (row.get(column) is None, row.get(column) if row.get(column) is not None else 0),
+                  reverse=desc)
+
+
+class MemoryRepository(Repository):
+    """
+    Repository keeping every table in process memory.
+
+    Meant for running the application offline (DATA_BACKEND=memory, rows
+    loaded from MEMORY_DATA_FILE, e.g. written by
+    `python -m benchmarks.datagen --target json`) and for benchmarks. It
+    applies the schema defaults and ON DELETE actions but no CHECK
+    constraints. Nothing is persisted.
+
+    Attributes:
+        tables: Rows by id, per table
+    """
+
+    def __init__(self, data: Optional[Dict[str, Iterable[Dict[str, Any]]]] = None):
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {table: {} for table in FOREIGN_KEYS}
+        self._lock = threading.RLock()
+        for table, rows in (data or {}).items():
+            if table in self.tables:
+                self.tables[table].update((row['id'], dict(row)) for row in rows)
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> 'MemoryRepository':
+        """Load the tables from a JSON file ({table: [rows]}), empty if path is None."""
+        if not path:
+            return cls()
+        with open(path, encoding='utf-8') as handle:
+            return cls(json.load(handle))
+
+    def _related(self, relation: Relation, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        target = self.tables[relation.table].get(row.get(relation.column))
+        if target is None:
+            return None
+        embedded = _columns(target, relation.fields)
+        for child in relation.relations:
+            embedded[child.alias] = self._related(child, target)
+        return embedded
+
+    def _matching(self, entity: Entity, filters: Sequence[Condition]) -> List[Dict[str, Any]]:
+        predicates = [_predicate(condition) for condition in filters]
+        return [row for row in self.tables[entity.table].values() if all(p(row) for p in predicates)]
+
+    def list(self, entity, filters=(), projection='summary', order=None, limit=None,
+             relations=True, counts=False):
+        with self._lock:
+            rows = self._matching(entity, filters)
+            _sort(rows, entity.order if order is None else order)
+            if limit is not None:
+                rows = rows[:limit]
+
+            tallies = {}
+            if counts:
+                for alias, (table, column) in entity.counts.items():
+                    tallies[alias] = Counter(child.get(column) for child in self.tables[table].values())
+
+            output = []
+            for row in rows:
+                item = _columns(row, entity.projections[projection])
+                if relations:
+                    for relation in entity.relations:
+                        item[relation.alias] = self._related(relation, row)
+                for alias, tally in tallies.items():
+                    item[alias] = tally.get(row['id'], 0)
+                output.append(item)
+            return output
+
+    def create(self, entity, data):
+        now = _now()
+        row = {**DEFAULTS.get(entity.table, {}), 'created_at': now, 'updated_at': now, **data}
+        row.setdefault('id', str(uuid.uuid4()))
+        with self._lock:
+            if row['id'] in self.tables[entity.table]:
+                raise ValueError(f'duplicate key value violates unique constraint "{entity.table}_pkey"')
+            self.tables[entity.table][row['id']] = row
+        return dict(row)
+
+    def update(self, entity, filters, data):
+        with self._lock:
+            updated = []
+            for row in self._matching(entity, filters):
+                row.update(data, updated_at=_now())
+                updated.append(dict(row))
+            return updated
+
+    def delete(self, entity, filters):
+        with self._lock:
+            rows = self._matching(entity, filters)
+            self._delete(entity.table, [row['id'] for row in rows])
+            return rows
+
+    def _delete(self, table: str, ids: List[str]) -> None:
+        """Delete rows of table and apply the ON DELETE action of every referencing column."""
+        deleted = set(ids)
+        for child, columns in FOREIGN_KEYS.items():
+            for column, (parent, action) in columns.items():
+                if parent != table:
+                    continue
+                referencing = [row for row in self.tables[child].values() if row.get(column) in deleted]
+                if referencing and action in ('restrict', 'no action'):
+                    raise ValueError(f'update or delete on table "{table}" violates foreign key '
+                                     f'constraint "{child}_{column}_fkey" on table "{child}"')
+                if action == 'cascade':
+                    self._delete(child, [row['id'] for row in referencing])
+                elif action == 'set null':
+                    for row in referencing:
+                        row[column] = None
+        for row_id in ids:
+            self.tables[table].pop(row_id, None)
+
+    def aggregate(self, name, params):
+        with self._lock:
+            if name == 'get_dashboard_stats':
+                return [self._dashboard_stats(params.get('p_today') or datetime.now().date().isoformat())]
+            if name == 'search_experiments':
+                return self._search_experiments(params['search_query'], params.get('max_results', 200))
+        raise NotImplementedError(f"Aggregate {name} is not available in memory")
+
+    def _dashboard_stats(self, today: str) -> Dict[str, Any]:
+        """Same figures as get_dashboard_stats (migrations/002_dashboard_stats.sql)."""
+        projects, tasks = self.tables['projects'].values(), list(self.tables['tasks'].values())
+        statuses = Counter(task.get('status') for task in tasks)
+        priorities = Counter(task.get('priority') for task in tasks)
+        total = len(tasks)
+        return {
+            'total_projects': len(projects),
+            'active_projects': sum(1 for p in projects if p.get('status') == 'active'),
+            'total_subprojects': len(self.tables['subprojects']),
+            'total_tasks': total,
+            'completed_tasks': statuses['done'],
+            'in_progress_tasks': statuses['in-progress'],
+            'todo_tasks': statuses['todo'],
+            'completion_rate': statuses['done'] * 100.0 / total if total else 0,
+            'high_priority_tasks': priorities['high'],
+            'urgent_priority_tasks': priorities['urgent'],
+            'overdue_tasks': sum(1 for t in tasks if t.get('due_date') and t['due_date'][:10] < today
+                                 and t.get('status') != 'done'),
+        }
+
+    def _search_experiments(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """Simplified search_experiments (migrations/004_experiments_search.sql): weighted word-prefix matching."""
+        words = re.findall(r'\w+', (query or '').lower())
+        if not words:
+            return []
+        matches = []
+        for row in self.tables['experiments'].values():
+            rank = 0.0
+            for column, weight in SEARCH_WEIGHTS:
+                tokens = re.findall(r'\w+', (row.get(column) or '').lower())
+                rank += weight * sum(1 for word in words if any(token.startswith(word) for token in tokens))
+            if rank:
+                matches.append((rank, row.get('created_at') or '', row['id']))
+        matches.sort(reverse=True)
+        return [{'id': row_id, 'rank': rank} for rank, _, row_id in matches[:max_results]]
+
+
+# =====================================================
+# BACKEND SELECTION
+# =====================================================
+
+_repository: Optional[Repository] = None
+_repository_lock = threading.Lock()
+
+
+def data_backend() -> str:
+    """DATA_BACKEND setting: supabase, replica (Supabase with a local read replica) or memory."""
+    return os.getenv("DATA_BACKEND", "supabase").lower()
+
+
+def get_repository() -> Repository:
+    """
+    Get the process-wide repository for DATA_BACKEND.
+
+    Returns:
+        MemoryRepository with DATA_BACKEND=memory, SupabaseRepository otherwise
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                if data_backend() == 'memory':
+                    _repository = MemoryRepository.from_file(os.getenv("MEMORY_DATA_FILE"))
+                    logger.info("Using the in-memory data backend")
+                else:
+                    _repository = SupabaseRepository()
+    return _repository
+
+
+def set_repository(repository: Repository) -> Repository:
+    """Make get_repository() return repository, for the whole process (benchmarks, offline runs)."""
+    global _repository
+    with _repository_lock:
+        _repository = repository
+    return repository
@@ -0,0 +1,234 @@
+"""
+Resilience Module
+Relances avec backoff exponentiel (lectures idempotentes) et disjoncteur autour
+des appels HTTP vers Supabase, avec compteurs pour le suivi.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Responses meaning the gateway or the database is briefly unavailable
+UNAVAILABLE_STATUS = {429, 502, 503, 504}
+
+# Idempotent requests are also retried on a plain 500 (transient database
+# error, e.g. during a failover). PostgREST answers 500 to some persistent
+# query errors too, so a 500 left after the retries is returned as is (the
+# caller sees the API error) instead of being reported as an outage.
+RETRYABLE_STATUS = UNAVAILABLE_STATUS | {500}
+
+# POST /rpc/<name> calls that only read data, safe to send twice
+IDEMPOTENT_RPCS = {'get_dashboard_stats', 'search_experiments'}
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class BackendUnavailableError(Exception):
+    """Supabase could not be reached or kept failing after the retries."""
+
+
+class CircuitOpenError(BackendUnavailableError):
+    """The circuit breaker is open: the request was not sent."""
+
+
+def is_backend_unavailable(error: BaseException) -> bool:
+    """True for errors meaning the backend is down (not a bad query)."""
+    return isinstance(error, (BackendUnavailableError, httpx.TransportError))
+
+
+class ResilienceMetrics:
+    """
+    Thread-safe counters of the resilient transport.
+
+    Attributes:
+        requests: Requests sent (attempts included)
+        retries: Attempts repeated after a transient failure
+        failures: Requests that failed after every attempt
+        circuit_opened: Number of times the circuit opened
+        short_circuited: Requests refused while the circuit was open
+        stale_served: Cache reads answered with last-known data
+    """
+
+    FIELDS = ('requests', 'retries', 'failures', 'circuit_opened', 'short_circuited', 'stale_served')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {name: 0 for name in self.FIELDS}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """Current value of every counter."""
+        with self._lock:
+            return dict(self._counts)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing backend for a while.
+
+    closed: requests go through; after failure_threshold consecutive
+    failures the circuit opens. open: requests fail immediately until
+    reset_seconds have passed. half_open: one trial request is let through;
+    its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 metrics: Optional[ResilienceMetrics] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.metrics = metrics
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = 'half_open'
+                self._trial_running = False
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != 'closed':
+                logger.info("Supabase circuit closed")
+            self.state = 'closed'
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self._failures >= self.failure_threshold:
+                if self.state != 'open' and self.metrics:
+                    self.metrics.increment('circuit_opened')
+                if self.state != 'open':
+                    logger.warning(f"Supabase circuit opened after {self._failures} failure(s)")
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """
+    httpx transport adding retries and a circuit breaker to another transport.
+
+    Only idempotent requests are retried (GET/HEAD, and POSTs to the
+    read-only RPCs in IDEMPOTENT_RPCS), with exponential backoff and full
+    jitter. Writes are sent once.
+
+    Attributes:
+        transport: Wrapped transport doing the actual I/O
+        breaker: Shared CircuitBreaker
+        max_attempts: Attempts per idempotent request
+        base_delay / max_delay: Backoff bounds in seconds
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, breaker: CircuitBreaker,
+                 metrics: ResilienceMetrics, max_attempts: int = 3,
+                 base_delay: float = 0.2, max_delay: float = 2.0):
+        self.transport = transport
+        self.breaker = breaker
+        self.metrics = metrics
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_idempotent(request: httpx.Request) -> bool:
+        if request.method in ('GET', 'HEAD'):
+            return True
+        if request.method == 'POST' and '/rpc/' in request.url.path:
+            return request.url.path.rsplit('/', 1)[-1] in IDEMPOTENT_RPCS
+        return False
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            self.metrics.increment('short_circuited')
+            raise CircuitOpenError("Supabase is unavailable (circuit open), retry later")
+
+        attempts = self.max_attempts if self.is_idempotent(request) else 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            self.metrics.increment('requests')
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError:
+                if last_attempt:
+                    self.metrics.increment('failures')
+                    self.breaker.record_failure()
+                    raise
+            else:
+                status = response.status_code
+                if status not in RETRYABLE_STATUS or (last_attempt and status not in UNAVAILABLE_STATUS):
+                    if status >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+                if last_attempt:
+                    self.metrics.increment('failures')
+                    self.breaker.record_failure()
+                    response.close()
+                    raise BackendUnavailableError(f"Supabase answered HTTP {status}")
+                response.close()
+
+            self.metrics.increment('retries')
+            time.sleep(self._backoff(attempt))
+
+        raise BackendUnavailableError("Supabase request failed")  # not reached
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def resilience_enabled() -> bool:
+    """False when RESILIENCE_ENABLED is set to false."""
+    return os.getenv("RESILIENCE_ENABLED", "true").lower() != "false"
+
+
+# Process-wide state shared by every client and thread
+metrics = ResilienceMetrics()
+breaker = CircuitBreaker(
+    failure_threshold=int(_env_number("CIRCUIT_FAILURE_THRESHOLD", 5)),
+    reset_seconds=_env_number("CIRCUIT_RESET_SECONDS", 30),
+    metrics=metrics,
+)
+
+
+def resilient_transport(transport: httpx.BaseTransport) -> httpx.BaseTransport:
+    """Wrap a transport with the process-wide retry policy and circuit breaker."""
+    return ResilientTransport(
+        transport,
+        breaker,
+        metrics,
+        max_attempts=int(_env_number("RETRY_MAX_ATTEMPTS", 3)),
+        base_delay=_env_number("RETRY_BASE_DELAY", 0.2),
+        max_delay=_env_number("RETRY_MAX_DELAY", 2.0),
+    )
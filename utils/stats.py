@@ -0,0 +1,242 @@
+"""
+Stats Module
+Statistiques du dashboard calculées de façon vectorisée : les lignes sont
+chargées une seule fois dans des DataFrames typés (dates parsées, statuts et
+priorités catégoriels) puis KPIs, comptages et échéances sont calculés en bloc.
+"""
+
+from datetime import date, datetime
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Values allowed by the CHECK constraints (schema.sql, migrations/001_create_experiments.sql),
+# in display order
+PROJECT_STATUSES = ('planning', 'active', 'on-hold', 'completed', 'archived')
+TASK_STATUSES = ('todo', 'in-progress', 'review', 'done')
+EXPERIMENT_STATUSES = ('planned', 'in_progress', 'completed', 'validated', 'cancelled')
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+
+# Days ahead covered by upcoming_deadlines()
+UPCOMING_DAYS = 7
+
+
+# =====================================================
+# FRAMES
+# =====================================================
+
+class _Codes(dict):
+    """Value -> code of a column, a new code for each value not seen yet (None is -1, missing)."""
+
+    def __init__(self, known: Sequence[Any]):
+        super().__init__({None: -1})
+        self.values = list(known)
+        self.update((value, code) for code, value in enumerate(self.values))
+
+    def __missing__(self, value: Any) -> int:
+        code = self[value] = len(self.values)
+        self.values.append(value)
+        return code
+
+
+def _column(rows: Sequence[Dict[str, Any]], column: str, known: Sequence[Any] = ()) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Read a column of rows as codes in a single pass.
+
+    Returns:
+        Code of each row (-1 when empty) and the value of each code: known
+        first, then the other values in order of appearance
+    """
+    codes = _Codes(known)
+    values = map(dict.get, rows, repeat(column))
+    return np.fromiter(map(codes.__getitem__, values), dtype=np.int64, count=len(rows)), codes.values
+
+
+def _categorical(rows: Sequence[Dict[str, Any]], column: str, categories: Sequence[str]) -> pd.Categorical:
+    """Column as a categorical; values outside categories are kept as extra categories."""
+    codes, values = _column(rows, column, categories)
+    if len(values) == len(categories):
+        return pd.Categorical.from_codes(codes, categories=values)
+    categories = list(categories) + sorted(values[len(categories):], key=str)
+    position = {value: index for index, value in enumerate(categories)}
+    # Code of each value, plus -1 (missing) for the -1 code of empty values
+    recode = np.array([position[value] for value in values] + [-1], dtype=np.int64)
+    return pd.Categorical.from_codes(recode[codes], categories=categories)
+
+
+def _parse_distinct(values: Sequence[Any]) -> np.ndarray:
+    """Distinct values parsed as dates (datetime64), NaT when invalid, plus a trailing NaT."""
+    parsed = pd.to_datetime(pd.Series(values, dtype=object).str[:10], format='%Y-%m-%d', errors='coerce')
+    return np.append(parsed.to_numpy(), np.datetime64('NaT'))
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    ISO date or timestamp strings as dates (datetime64), NaT when empty or invalid.
+
+    Each distinct value is parsed once, on its first 10 characters: timestamps
+    give their date as written, like datetime.fromisoformat(value).date().
+    """
+    codes, uniques = pd.factorize(values)
+    # Code -1 (empty value) picks the trailing NaT
+    return pd.Series(_parse_distinct(uniques)[codes], index=values.index)
+
+
+def _dates(rows: Sequence[Dict[str, Any]], column: str) -> np.ndarray:
+    """Column of ISO date or timestamp strings as datetime64, parsed like parse_dates()."""
+    codes, values = _column(rows, column)
+    return _parse_distinct(values)[codes]
+
+
+def _values(rows: Sequence[Dict[str, Any]], column: str) -> np.ndarray:
+    """Column of rows as is (object array, None where missing)."""
+    return np.fromiter(map(dict.get, rows, repeat(column)), dtype=object, count=len(rows))
+
+
+def rows_frame(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Columns of rows as a frame, values as is.
+
+    Values are read with dict.get rather than through pd.DataFrame(rows),
+    which copies every row that isn't a plain dict, such as the read-only
+    rows of the query cache.
+    """
+    return pd.DataFrame({column: _values(rows, column) for column in columns}, columns=list(columns))
+
+
+def _frame(rows: Sequence[Dict[str, Any]], categories: Dict[str, Sequence[str]],
+           dates: Sequence[str] = (), others: Sequence[str] = ()) -> pd.DataFrame:
+    """Read the columns of rows once each, typed (categorical, datetime64, as is; see rows_frame)."""
+    return pd.DataFrame({
+        **{column: _categorical(rows, column, known) for column, known in categories.items()},
+        **{column: _dates(rows, column) for column in dates},
+        **{column: _values(rows, column) for column in others},
+    }, columns=[*categories, *dates, *others])
+
+
+def projects_frame(projects: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Projects as a frame: status (categorical)."""
+    return _frame(projects, {'status': PROJECT_STATUSES})
+
+
+def tasks_frame(tasks: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Tasks as a frame, one row per task in the same order.
+
+    Columns: status and priority (categorical), due_date (datetime64, NaT
+    when missing) and assignee_id.
+    """
+    return _frame(tasks, {'status': TASK_STATUSES, 'priority': PRIORITIES}, ['due_date'], ['assignee_id'])
+
+
+def experiments_frame(experiments: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Experiments as a frame: status and priority (categorical)."""
+    return _frame(experiments, {'status': EXPERIMENT_STATUSES, 'priority': PRIORITIES})
+
+
+def _today(today: Optional[date]) -> np.datetime64:
+    return np.datetime64(today or datetime.now().date(), 'D')
+
+
+# =====================================================
+# AGGREGATES
+# =====================================================
+
+def count_by(frame: pd.DataFrame, column: str) -> Dict[str, int]:
+    """Rows per value of a categorical column, in category order (values with no rows left out)."""
+    counts = frame[column].value_counts(sort=False)
+    return {value: int(count) for value, count in counts.items() if count}
+
+
+def dashboard_stats(projects: pd.DataFrame, subproject_count: int, tasks: pd.DataFrame,
+                    today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Task and project KPIs (same figures as the get_dashboard_stats RPC).
+
+    Args:
+        projects: Frame from projects_frame()
+        subproject_count: Number of subprojects
+        tasks: Frame from tasks_frame()
+        today: Reference date for overdue tasks (default: today)
+    """
+    statuses = tasks['status'].value_counts(sort=False)
+    priorities = tasks['priority'].value_counts(sort=False)
+    total_tasks = len(tasks)
+    completed = int(statuses.get('done', 0))
+
+    overdue = (tasks['due_date'] < _today(today)) & (tasks['status'] != 'done')
+
+    return {
+        'total_projects': len(projects),
+        'active_projects': int((projects['status'] == 'active').sum()),
+        'total_subprojects': subproject_count,
+        'total_tasks': total_tasks,
+        'completed_tasks': completed,
+        'in_progress_tasks': int(statuses.get('in-progress', 0)),
+        'todo_tasks': int(statuses.get('todo', 0)),
+        'completion_rate': (completed / total_tasks * 100) if total_tasks > 0 else 0,
+        'high_priority_tasks': int(priorities.get('high', 0)),
+        'urgent_priority_tasks': int(priorities.get('urgent', 0)),
+        'overdue_tasks': int(overdue.sum()),
+    }
+
+
+def experiment_stats(experiments: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Experiment KPIs.
+
+    Args:
+        experiments: Frame from experiments_frame()
+
+    Returns:
+        Dictionary with the total, the count of each status, and by_status /
+        by_priority counts
+    """
+    by_status = count_by(experiments, 'status')
+    return {
+        'total': len(experiments),
+        **{status: by_status.get(status, 0) for status in EXPERIMENT_STATUSES},
+        'by_status': by_status,
+        'by_priority': count_by(experiments, 'priority'),
+    }
+
+
+# =====================================================
+# SELECTIONS
+# =====================================================
+
+def upcoming_deadlines(frame: pd.DataFrame, tasks: Sequence[Dict[str, Any]], days: int = UPCOMING_DAYS,
+                       today: Optional[date] = None) -> pd.DataFrame:
+    """
+    Open tasks due between today and today + days, soonest first.
+
+    Args:
+        frame: tasks_frame(tasks)
+        tasks: Task rows (with their assignee)
+        days: Window length
+        today: Start of the window (default: today)
+
+    Returns:
+        Frame with title, due_date (ISO string), priority and assignee (name)
+    """
+    start = _today(today)
+    due = frame['due_date']
+    mask = (due >= start) & (due <= start + np.timedelta64(days, 'D')) & (frame['status'] != 'done')
+    positions = due[mask].sort_values(kind='stable').index
+
+    selected = [tasks[position] for position in positions]
+    return pd.DataFrame({
+        'title': [task['title'] for task in selected],
+        'due_date': due[positions].dt.strftime('%Y-%m-%d').to_numpy(),
+        'priority': [task.get('priority', 'medium') for task in selected],
+        'assignee': [(task.get('assignee') or {}).get('name', 'Unassigned') for task in selected],
+    }, columns=['title', 'due_date', 'priority', 'assignee'])
+
+
+def tasks_of(frame: pd.DataFrame, tasks: Sequence[Dict[str, Any]], assignee_id: str) -> List[Dict[str, Any]]:
+    """Tasks assigned to assignee_id, by due date (tasks without one last)."""
+    due = frame['due_date'][frame['assignee_id'] == assignee_id]
+    return [tasks[position] for position in due.sort_values(kind='stable', na_position='last').index]
+
@@ -3,27 +3,141 @@ Supabase Client Configuration
 Gère la connexion à Supabase et fournit le client pour toute l'application.
 """
 
+import itertools
+import logging
 import os
-from typing import Optional
+import threading
+from typing import Dict, List, Optional, Union
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient
+from supabase import Client
+from supabase.lib.client_options import ClientOptions
 import streamlit as st
+from .instrumentation import MeteredTransport, metrics_port, start_metrics_server
+from .realtime import realtime_enabled, start_change_feed
+from .resilience import resilience_enabled, resilient_transport
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a number from the environment, falling back to default."""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a true/false setting from the environment."""
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+def http_limits() -> httpx.Limits:
+    """
+    Connection pool settings shared by every request to the REST API.
+
+    - SUPABASE_POOL_SIZE: Maximum open connections (concurrent requests)
+    - SUPABASE_POOL_KEEPALIVE: Idle connections kept open for reuse
+    - SUPABASE_KEEPALIVE_EXPIRY: Seconds an idle connection is kept
+    """
+    return httpx.Limits(
+        max_connections=int(_env_float("SUPABASE_POOL_SIZE", 20)),
+        max_keepalive_connections=int(_env_float("SUPABASE_POOL_KEEPALIVE", 10)),
+        keepalive_expiry=_env_float("SUPABASE_KEEPALIVE_EXPIRY", 30),
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    """
+    Request timeouts (seconds): SUPABASE_CONNECT_TIMEOUT and SUPABASE_READ_TIMEOUT
+    (the read timeout also bounds writes and waiting for a free connection).
+    """
+    read = _env_float("SUPABASE_READ_TIMEOUT", 10)
+    return httpx.Timeout(read, connect=_env_float("SUPABASE_CONNECT_TIMEOUT", 5))
+
+
+def http2_enabled() -> bool:
+    """SUPABASE_HTTP2=true multiplexes requests over one connection (needs the h2 package)."""
+    if not _env_flag("SUPABASE_HTTP2"):
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("SUPABASE_HTTP2 is set but the h2 package is missing, using HTTP/1.1")
+        return False
+
+
+def client_count() -> int:
+    """SUPABASE_CLIENT_COUNT: clients (each with its own pool) created at startup, at least 1."""
+    return max(1, int(_env_float("SUPABASE_CLIENT_COUNT", 1)))
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """
+    PostgREST client whose HTTP session uses the pool settings from .env.
+
+    Requests go through the retrying, circuit-breaking transport of
+    utils/resilience.py unless RESILIENCE_ENABLED=false, and every attempt
+    is counted by utils/instrumentation.py. With DATA_BACKEND=replica, reads
+    are served by the local replica of utils/replica.py.
+    """
+
+    def create_session(self, base_url: str, headers: Dict[str, str],
+                       timeout: Union[int, float, httpx.Timeout]) -> SyncClient:
+        # A custom transport owns the pool: limits and http2 are set on it
+        transport: httpx.BaseTransport = MeteredTransport(
+            httpx.HTTPTransport(limits=http_limits(), http2=http2_enabled())
+        )
+        if resilience_enabled():
+            transport = resilient_transport(transport)
+        # Imported here: utils/replica.py depends on utils/sync.py, which imports this module
+        from .replica import replica_enabled, replica_transport
+        if replica_enabled():
+            transport = replica_transport(transport, base_url, headers)
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=transport,
+        )
+
+
+class PooledClient(Client):
+    """Supabase client creating its PostgREST client with PooledPostgrestClient."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url: str, headers: Dict[str, str], schema: str,
+                               timeout: Union[int, float, httpx.Timeout] = 5) -> SyncPostgrestClient:
+        return PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
 
 class SupabaseClient:
     """
     Singleton class for Supabase client management.
 
+    One client (and connection pool) is shared by all threads, since httpx
+    clients are thread-safe. SUPABASE_CLIENT_COUNT > 1 creates that many
+    clients once, at startup, and hands them out in turn: Streamlit runs
+    each rerun on a new thread, so clients are never tied to a thread.
+
     Attributes:
         _instance: Singleton instance
-        _client: Supabase client instance
+        _client: Supabase client instance (the first of _clients)
+        _clients: Every client handed out (SUPABASE_CLIENT_COUNT)
     """
 
     _instance: Optional['SupabaseClient'] = None
     _client: Optional[Client] = None
+    _clients: List[Client] = []
+    _turn = itertools.count()
+    _init_lock = threading.Lock()
 
     def __new__(cls) -> 'SupabaseClient':
         """Create singleton instance."""
@@ -34,7 +148,10 @@ class SupabaseClient:
     def __init__(self):
         """Initialize Supabase client if not already initialized."""
         if self._client is None:
-            self._initialize_client()
+            # Concurrent first calls (parallel fetches) must not each create the clients
+            with self._init_lock:
+                if self._client is None:
+                    self._initialize_client()
 
     def _initialize_client(self) -> None:
         """
@@ -52,12 +169,29 @@ class SupabaseClient:
                     "❌ SUPABASE_URL et SUPABASE_KEY doivent être définis dans .env"
                 )
 
-            self._client = create_client(supabase_url, supabase_key)
+            self._client = self._create_client(supabase_url, supabase_key)
+            SupabaseClient._clients = [self._client] + [
+                self._create_client(supabase_url, supabase_key) for _ in range(client_count() - 1)
+            ]
+
+            # Keep the shared query cache up to date from database changes
+            if realtime_enabled():
+                start_change_feed(supabase_url, supabase_key)
+
+            port = metrics_port()
+            if port:
+                start_metrics_server(port)
 
         except Exception as e:
             st.error(f"❌ Erreur de connexion Supabase: {str(e)}")
             raise
 
+    @staticmethod
+    def _create_client(supabase_url: str, supabase_key: str) -> Client:
+        """Create a Supabase client using the pool and timeout settings from .env."""
+        options = ClientOptions(postgrest_client_timeout=http_timeout())
+        return PooledClient(supabase_url, supabase_key, options)
+
     @property
     def client(self) -> Client:
         """
@@ -71,6 +205,10 @@ class SupabaseClient:
         """
         if self._client is None:
             raise RuntimeError("Supabase client not initialized")
+
+        if len(self._clients) > 1:
+            return self._clients[next(self._turn) % len(self._clients)]
+
         return self._client
 
 
@@ -0,0 +1,183 @@
+"""
+Incremental Sync Module
+Synchronisation incrémentale des tables : seules les lignes modifiées depuis le
+dernier passage (filigrane updated_at) et les suppressions (tombstones) sont lues.
+"""
+
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .cache import TABLE_DEPENDENTS, query_cache
+from .supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Rows are re-read this far behind the watermark: updated_at is set when a
+# transaction starts, so a slow transaction can commit an older timestamp
+SYNC_OVERLAP = timedelta(seconds=float(os.getenv("SYNC_OVERLAP_SECONDS", "60")))
+
+# Tombstones are kept about this long (see migrations/006_incremental_sync.sql)
+FULL_RESYNC_AFTER = timedelta(days=7)
+
+
+def incremental_sync_enabled() -> bool:
+    """True when SYNC_MODE is set to incremental."""
+    return os.getenv("SYNC_MODE", "full").lower() == "incremental"
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a PostgREST timestamp (fractional seconds may have 1 to 6 digits)."""
+    value = value.replace('Z', '+00:00')
+    match = re.match(r'^(.*\.)(\d+)(.*)$', value)
+    if match:
+        value = f"{match.group(1)}{match.group(2)[:6].ljust(6, '0')}{match.group(3)}"
+    return datetime.fromisoformat(value)
+
+
+def _parents(table: str) -> Tuple[str, ...]:
+    """Tables whose rows are embedded (directly or not) in the rows of table."""
+    return tuple(sorted(parent for parent, dependents in TABLE_DEPENDENTS.items() if table in dependents))
+
+
+class _TableState:
+    """Synced copy of one query: rows by id plus the watermarks."""
+
+    __slots__ = ('rows', 'watermark', 'tombstone_watermark', 'synced_at', 'parent_versions')
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.watermark: Optional[datetime] = None
+        self.tombstone_watermark: Optional[datetime] = None
+        self.synced_at: datetime = datetime.now()
+        self.parent_versions: Tuple = ()
+
+
+class IncrementalSync:
+    """
+    Keeps a synced copy of table queries and refreshes it with deltas.
+
+    The first call for a (table, select) pair loads every row. Later calls
+    only read rows with updated_at past the watermark, plus the ids recorded
+    in deleted_rows since the last sync.
+
+    Rows embed their parents (subproject name, assignee...), so a query is
+    reloaded in full when one of its parent tables changed: written in this
+    process (query cache invalidation) or found changed by its own sync.
+
+    Attributes:
+        _states: Synced copy per (table, select)
+        _changes: Number of syncs that found changes, per table
+    """
+
+    def __init__(self):
+        self._states: Dict[Hashable, _TableState] = {}
+        self._changes: Dict[str, int] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, table: str, select: str, order_by: str = 'created_at',
+              desc: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get every row of a table, reading only what changed since the last call.
+
+        Args:
+            table: Table name (must have updated_at and the deleted_rows trigger)
+            select: PostgREST select clause (embedded relations allowed)
+            order_by: Column the returned list is sorted on (then id)
+            desc: Sort descending
+
+        Returns:
+            List of rows
+        """
+        key = (table, select)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            state = self._states.get(key)
+            if state is None or self._needs_full_sync(table, state):
+                state = self._full_sync(table, select)
+                self._states[key] = state
+            else:
+                self._delta_sync(table, select, state)
+            rows = list(state.rows.values())
+
+        rows.sort(key=lambda row: (row.get(order_by) or '', row.get('id') or ''), reverse=desc)
+        return rows
+
+    def reset(self, *tables: str) -> None:
+        """Forget the synced copies of the given tables (all if none given)."""
+        with self._lock:
+            for key in [k for k in self._states if not tables or k[0] in tables]:
+                del self._states[key]
+
+    def _parent_versions(self, table: str) -> Tuple:
+        return tuple(
+            (parent, query_cache.generation(parent), self._changes.get(parent, 0))
+            for parent in _parents(table)
+        )
+
+    def _needs_full_sync(self, table: str, state: _TableState) -> bool:
+        return (
+            state.watermark is None or
+            datetime.now() - state.synced_at > FULL_RESYNC_AFTER or
+            state.parent_versions != self._parent_versions(table)
+        )
+
+    def _full_sync(self, table: str, select: str) -> _TableState:
+        state = _TableState()
+        state.parent_versions = self._parent_versions(table)
+
+        client = get_supabase_client()
+        response = client.table(table).select(select).execute()
+        for row in response.data or []:
+            state.rows[row['id']] = row
+
+        state.watermark = self._max_updated_at(state.rows.values())
+        state.tombstone_watermark = state.watermark
+        logger.debug(f"Full sync of {table}: {len(state.rows)} rows")
+        return state
+
+    def _delta_sync(self, table: str, select: str, state: _TableState) -> None:
+        client = get_supabase_client()
+        since = (state.watermark - SYNC_OVERLAP).isoformat()
+        changed = client.table(table).select(select).gt('updated_at', since).execute().data or []
+
+        tombstones_since = (state.tombstone_watermark - SYNC_OVERLAP).isoformat()
+        tombstones = client.table('deleted_rows').select('row_id, deleted_at').eq(
+            'table_name', table
+        ).gt('deleted_at', tombstones_since).execute().data or []
+
+        modified = False
+        for row in changed:
+            if state.rows.get(row['id']) != row:
+                state.rows[row['id']] = row
+                modified = True
+        for tombstone in tombstones:
+            if state.rows.pop(tombstone['row_id'], None) is not None:
+                modified = True
+
+        state.watermark = max(state.watermark, self._max_updated_at(changed) or state.watermark)
+        if tombstones:
+            latest = max(_parse_timestamp(t['deleted_at']) for t in tombstones)
+            state.tombstone_watermark = max(state.tombstone_watermark, latest)
+        state.synced_at = datetime.now()
+
+        if modified:
+            # Tables embedding this one must reload their rows in full
+            with self._lock:
+                self._changes[table] = self._changes.get(table, 0) + 1
+        logger.debug(f"Delta sync of {table}: {len(changed)} changed, {len(tombstones)} deleted")
+
+    @staticmethod
+    def _max_updated_at(rows) -> Optional[datetime]:
+        stamps = [_parse_timestamp(row['updated_at']) for row in rows if row.get('updated_at')]
+        return max(stamps) if stamps else None
+
+
+# Process-wide instance shared by all sessions
+incremental_sync = IncrementalSync()